@@ -0,0 +1,205 @@
+"""Импорт истории статусов для новых арендаторов перед началом опроса.
+
+Запуск для арендаторов из TENANTS_FILE без сохранённой отметки:
+
+    python backfill.py
+
+Тот же импорт выполняет `engine.py --backfill` перед запуском опроса.
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+import checkpoints
+import dedup
+import exeptions
+import history
+import homework
+import settings  # noqa: F401
+import streaming
+import tenants
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_CONCURRENCY = int(os.getenv('BACKFILL_CONCURRENCY', 16))
+BACKFILL_RATE_LIMIT = float(os.getenv('BACKFILL_RATE_LIMIT', 20))
+BACKFILL_FROM_DATE = int(os.getenv('BACKFILL_FROM_DATE', 0))
+
+
+def import_tenant(tenant, from_date=BACKFILL_FROM_DATE):
+    """Загрузка истории арендатора без отправки уведомлений.
+
+    Ответ проходит `check_response` и проверку статусов, работы
+    пишутся в HISTORY и отмечаются доставленными в DELIVERED, чтобы
+    опрос не прислал уведомления о давних проверках. `current_date`
+    ответа становится отметкой арендатора. Потоковый ответ
+    (STREAM_RESPONSES) разбирается по одной работе. Возвращает число
+    работ.
+    """
+    response = homework.fetch_statuses(tenant.headers, from_date)
+    if isinstance(response, streaming.StreamedAnswer):
+        count, current_date = import_stream(tenant, response)
+    else:
+        homeworks = homework.check_response(response)
+        for item in homeworks:
+            import_homework(tenant, item)
+        tenant.observe(homeworks)
+        count, current_date = len(homeworks), response['current_date']
+    tenant.current_timestamp = current_date
+    if homework.CHECKPOINTS is not None:
+        homework.CHECKPOINTS.save(tenant.name, tenant.current_timestamp)
+    return count
+
+
+def import_stream(tenant, answer):
+    """Импорт работ потокового ответа; возвращает число и `current_date`."""
+    import requests
+
+    try:
+        for item in answer:
+            if answer.count == 1:
+                tenant.observe([item])
+            import_homework(tenant, item)
+        current_date = answer.finish()
+    except (ValueError, requests.RequestException) as error:
+        raise exeptions.GetApiAnswerError(
+            f'Ошибка при чтении ответа API: {error}'
+        )
+    finally:
+        answer.close()
+    return answer.count, current_date
+
+
+def import_homework(tenant, item):
+    """Запись работы в историю и в доставленные без уведомления."""
+    record = homework.homework_record(item)
+    if homework.HISTORY is not None:
+        homework.HISTORY.add(tenant.name, record)
+    if homework.DELIVERED is not None:
+        homework.DELIVERED.add(dedup.delivery_key(tenant.name, record))
+
+
+async def backfill(tenant_list, concurrency=BACKFILL_CONCURRENCY,
+                   rate_limit=BACKFILL_RATE_LIMIT,
+                   from_date=BACKFILL_FROM_DATE, executor=None):
+    """Параллельный импорт истории арендаторов в рамках бюджета запросов.
+
+    Не больше `concurrency` запросов одновременно и `rate_limit` в
+    секунду без всплесков. Каждый ответ обрабатывается и освобождается
+    сразу, поэтому память ограничена `concurrency` ответами, а не
+    размером когорты.
+    Арендаторы с ошибкой остаются без отметки. Возвращает словарь
+    арендатор -> число работ или исключение.
+    """
+    import asyncio
+
+    from ratelimit import TokenBucket
+
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    budget = TokenBucket(rate_limit, 1)
+
+    async def run(tenant):
+        async with semaphore:
+            await budget.acquire()
+            try:
+                return await loop.run_in_executor(
+                    executor, import_tenant, tenant, from_date
+                )
+            except Exception as error:
+                logger.error(
+                    f'Не удалось загрузить историю {tenant.name}: {error}'
+                )
+                return error
+
+    results = await asyncio.gather(*map(run, tenant_list))
+    return {
+        tenant.name: result for tenant, result in zip(tenant_list, results)
+    }
+
+
+def pending_tenants(tenant_list):
+    """Новые арендаторы; продолжающим выставляется сохранённая отметка."""
+    fresh = []
+    for tenant in tenant_list:
+        saved = homework.CHECKPOINTS.load(tenant.name)
+        if saved is None:
+            fresh.append(tenant)
+        else:
+            tenant.current_timestamp = saved
+    return fresh
+
+
+def run_backfill(tenant_list, concurrency=BACKFILL_CONCURRENCY,
+                 rate_limit=BACKFILL_RATE_LIMIT):
+    """Импорт истории новых арендаторов с итогом в логе.
+
+    Арендаторы, чью историю загрузить не удалось, начинают опрос с
+    текущего момента, как без импорта.
+    """
+    import asyncio
+
+    fresh = pending_tenants(tenant_list)
+    if not fresh:
+        return {}
+    started = time.monotonic()
+    results = asyncio.run(backfill(fresh, concurrency, rate_limit))
+    failed = [
+        tenant for tenant in fresh
+        if isinstance(results[tenant.name], Exception)
+    ]
+    now = int(time.time())
+    for tenant in failed:
+        tenant.current_timestamp = now
+    imported = sum(
+        result for result in results.values()
+        if not isinstance(result, Exception)
+    )
+    logger.info(
+        f'История загружена для {len(fresh) - len(failed)} из {len(fresh)} '
+        f'арендаторов: {imported} работ за '
+        f'{time.monotonic() - started:.1f} с'
+    )
+    homework.CHECKPOINTS.flush()
+    return results
+
+
+def main(argv=None):
+    """Импорт истории для арендаторов из TENANTS_FILE."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--tenants-file', default=os.getenv('TENANTS_FILE', 'tenants.json')
+    )
+    parser.add_argument(
+        '--concurrency', type=int, default=BACKFILL_CONCURRENCY
+    )
+    parser.add_argument(
+        '--rate-limit', type=float, default=BACKFILL_RATE_LIMIT
+    )
+    args = parser.parse_args(argv)
+    homework.load_json_backend()
+    tenant_list = tenants.load_tenants(args.tenants_file)
+    homework.CHECKPOINTS = checkpoints.CheckpointStore(
+        before_flush=homework.flush_journals
+    )
+    homework.DELIVERED = dedup.DeliveredIndex(dedup.DEDUP_DB)
+    homework.HISTORY = history.HistoryStore()
+    homework.exit_on_sigterm()
+    try:
+        results = run_backfill(
+            tenant_list, args.concurrency, args.rate_limit
+        )
+    finally:
+        homework.CHECKPOINTS.close()
+        homework.DELIVERED.close()
+        homework.HISTORY.close()
+    return int(any(
+        isinstance(result, Exception) for result in results.values()
+    ))
+
+
+if __name__ == '__main__':
+    homework.configure_logging()
+    sys.exit(main())
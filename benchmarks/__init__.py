@@ -0,0 +1 @@
+"""Бенчмарки бота на локальных заменителях внешних API."""
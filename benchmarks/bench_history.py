@@ -0,0 +1,122 @@
+"""Бенчмарк истории статусов на синтетических данных.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.bench_history --rows 1000000
+
+Заполняет временную базу через `HistoryStore.add` (по три статуса на
+работу: reviewing, вердикт, иногда повторная проверка) и замеряет
+запись, поиск последнего статуса и перцентили времени проверки за
+последние 30 дней. Печатает строку JSON.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import history
+import homework
+import records
+from benchmarks.bench_pipeline import git_revision
+
+DAY = 86400
+STATUSES = homework.HomeworkStatus
+
+
+def generate(store, rows, tenant_count, seed):
+    """Запись `rows` статусов; возвращает список (арендатор, работа)."""
+    rng = random.Random(seed)
+    now = int(time.time())
+    homeworks = []
+    written = 0
+    while written < rows:
+        tenant = f't{rng.randrange(tenant_count)}'
+        name = f'hw{len(homeworks)}'
+        homeworks.append((tenant, name))
+        at = now - rng.randrange(365 * DAY)
+        chain = [STATUSES.REVIEWING, rng.choice(
+            (STATUSES.APPROVED, STATUSES.REJECTED)
+        )]
+        if chain[-1] is STATUSES.REJECTED:
+            chain += [STATUSES.REVIEWING, STATUSES.APPROVED]
+        for status in chain:
+            store.add(tenant, records.HomeworkRecord(
+                name, name, status, history.format_date(at) + 'Z'
+            ))
+            at += rng.randrange(3600, 3 * DAY)
+            written += 1
+    store.flush()
+    return homeworks
+
+
+def timed(function, *args):
+    """Время вызова в миллисекундах."""
+    started = time.perf_counter()
+    function(*args)
+    return (time.perf_counter() - started) * 1000
+
+
+def run(rows, tenant_count, queries, seed):
+    """Заполнение базы и замеры запросов."""
+    with tempfile.TemporaryDirectory() as workdir:
+        store = history.HistoryStore(
+            os.path.join(workdir, 'history.sqlite3'),
+            flush_every=10000, flush_interval=3600,
+        )
+        started = time.perf_counter()
+        homeworks = generate(store, rows, tenant_count, seed)
+        ingest = time.perf_counter() - started
+        rng = random.Random(seed)
+        sample = [rng.choice(homeworks) for _ in range(queries)]
+        latest = [timed(store.latest, *key) for key in sample]
+        since = int(time.time()) - 30 * DAY
+        month = [
+            timed(store.review_durations, since) for _ in range(5)
+        ]
+        tenant_month = [
+            timed(store.review_durations, since, None, key[0])
+            for key in sample[:5]
+        ]
+        reviews = len(store.review_durations(since))
+        store.close()
+    return {
+        'benchmark': 'history',
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'rows': rows,
+        'tenants': tenant_count,
+        'ingest_rows_per_s': round(rows / ingest),
+        'latest_ms_p50': round(statistics.median(latest), 4),
+        'latest_ms_max': round(max(latest), 4),
+        'reviews_last_30d': reviews,
+        'month_percentiles_ms_p50': round(statistics.median(month), 2),
+        'tenant_month_percentiles_ms_p50': round(
+            statistics.median(tenant_month), 3
+        ),
+    }
+
+
+def main(argv=None):
+    """Разбор аргументов и печать результата в формате JSON Lines."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--tenants', type=int, default=1000)
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='файл для дозаписи результатов')
+    args = parser.parse_args(argv)
+    result = run(args.rows, args.tenants, args.queries, args.seed)
+    line = json.dumps(result, ensure_ascii=False)
+    print(line, flush=True)
+    if args.output:
+        with open(args.output, 'a', encoding='utf-8') as output:
+            output.write(line + '\n')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
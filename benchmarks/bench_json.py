@@ -0,0 +1,89 @@
+"""Время разбора ответа API каждым установленным декодером JSON.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.bench_json --homeworks 0 10 1000
+
+Для каждого размера ответа и декодера из `jsonbackend.FACTORIES`
+печатает строку JSON с медианой времени разбора одного ответа.
+Неустановленные декодеры пропускаются.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+
+import exeptions
+import jsonbackend
+from benchmarks.bench_pipeline import git_revision
+from benchmarks.bench_stream import make_body
+
+
+class Body:
+    """Ответ с готовым телом, как у requests после чтения."""
+
+    __slots__ = ('content',)
+
+    def __init__(self, content):
+        self.content = content
+
+    def json(self):
+        """Разбор stdlib json, как `requests.Response.json`."""
+        return json.loads(self.content)
+
+
+def timings(backend, response, repeat):
+    """Время разбора одного ответа в микросекундах, `repeat` замеров."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        backend.decode(response)
+        samples.append((time.perf_counter() - started) * 1e6)
+    return samples
+
+
+def run(count, repeat):
+    """Замеры всех установленных декодеров на ответе с `count` работами."""
+    response = Body(make_body(count))
+    results = []
+    for name in jsonbackend.FACTORIES:
+        try:
+            backend = jsonbackend.load_backend(name)
+        except exeptions.JsonBackendError:
+            continue
+        samples = timings(backend, response, repeat)
+        results.append({
+            'benchmark': 'json',
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'backend': name,
+            'homeworks': count,
+            'body_bytes': len(response.content),
+            'decode_us_p50': round(statistics.median(samples), 2),
+            'decode_us_min': round(min(samples), 2),
+        })
+    return results
+
+
+def main(argv=None):
+    """Разбор аргументов и печать результатов в формате JSON Lines."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--homeworks', type=int, nargs='+', default=[0, 10, 1000]
+    )
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--output', help='файл для дозаписи результатов')
+    args = parser.parse_args(argv)
+    for count in args.homeworks:
+        for result in run(count, args.repeat):
+            line = json.dumps(result, ensure_ascii=False)
+            print(line, flush=True)
+            if args.output:
+                with open(args.output, 'a', encoding='utf-8') as output:
+                    output.write(line + '\n')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
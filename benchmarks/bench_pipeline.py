@@ -0,0 +1,172 @@
+"""Бенчмарк конвейера опроса на локальных заменителях API.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.bench_pipeline --tenants 1 100 10000
+
+Для каждого числа арендаторов печатает строку JSON с пропускной
+способностью, задержкой уведомлений и ресурсами на арендатора.
+Заменители API работают в том же процессе, поэтому CPU и RSS
+включают и их долю: сравнивайте результаты между коммитами, а не
+с продакшеном.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+import telegram
+from telegram.utils.request import Request
+
+import circuit
+import engine
+import homework
+import tenants
+import transport
+from benchmarks.standins import PracticumStandIn, TelegramStandIn
+
+
+def rss_bytes():
+    """Текущий RSS процесса."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def cpu_seconds():
+    """Процессорное время процесса (user + sys)."""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def percentile(values, share):
+    """Перцентиль по ближайшему рангу."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(int(round(share * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def git_revision():
+    """Текущий коммит для сравнения результатов."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(tenant_count, cycles, concurrency, change_rate, api_latency,
+        api_failure_rate, telegram_latency, telegram_failure_rate):
+    """Прогон `cycles` циклов опроса для `tenant_count` арендаторов."""
+    practicum = PracticumStandIn(
+        change_rate=change_rate, latency=api_latency,
+        failure_rate=api_failure_rate, seed=tenant_count,
+    )
+    bot_api = TelegramStandIn(
+        latency=telegram_latency, failure_rate=telegram_failure_rate,
+        seed=tenant_count,
+    )
+    with practicum, bot_api:
+        homework.ENDPOINT = practicum.url
+        homework.TRANSPORT = transport.Transport(pool_size=concurrency)
+        homework.BREAKER = circuit.CircuitBreaker()
+        bot = telegram.Bot(
+            token='123:bench', base_url=bot_api.url,
+            request=Request(con_pool_size=concurrency),
+        )
+        tenant_list = [
+            tenants.Tenant(f't{index}', f'token{index}', index, 0)
+            for index in range(tenant_count)
+        ]
+        polling = engine.PollingEngine(bot, tenant_list, concurrency)
+
+        async def poll_cycles():
+            for _ in range(cycles):
+                await asyncio.gather(*map(polling.poll, tenant_list))
+
+        rss_before = rss_bytes()
+        cpu_before = cpu_seconds()
+        started = time.perf_counter()
+        asyncio.run(poll_cycles())
+        elapsed = time.perf_counter() - started
+        cpu_used = cpu_seconds() - cpu_before
+        rss_after = rss_bytes()
+        transport_stats = homework.TRANSPORT.stats()
+        polling.executor.shutdown()
+        homework.TRANSPORT.close()
+
+    latencies = [
+        bot_api.received_at[name] - served
+        for name, served in practicum.served_at.items()
+        if name in bot_api.received_at
+    ]
+    tenant_cycles = tenant_count * cycles
+    return {
+        'benchmark': 'pipeline',
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'tenants': tenant_count,
+        'cycles': cycles,
+        'concurrency': concurrency,
+        'elapsed_s': round(elapsed, 4),
+        'tenant_cycles_per_s': round(tenant_cycles / elapsed, 2),
+        'cycles_per_s': round(cycles / elapsed, 4),
+        'api_requests': practicum.requests,
+        'notifications': len(latencies),
+        'latency_p50_ms': (
+            round(statistics.median(latencies) * 1000, 3)
+            if latencies else None
+        ),
+        'latency_p99_ms': (
+            round(percentile(latencies, 0.99) * 1000, 3)
+            if latencies else None
+        ),
+        'cpu_ms_per_tenant_cycle': round(cpu_used / tenant_cycles * 1000, 4),
+        'rss_bytes': rss_after,
+        'rss_bytes_per_tenant': round(
+            max(rss_after - rss_before, 0) / tenant_count, 1
+        ),
+        'transport': transport_stats,
+    }
+
+
+def main(argv=None):
+    """Разбор аргументов и печать результатов в формате JSON Lines."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tenants', type=int, nargs='+', default=[1, 100])
+    parser.add_argument('--cycles', type=int, default=3)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--change-rate', type=float, default=0.1)
+    parser.add_argument('--api-latency', type=float, default=0.0)
+    parser.add_argument('--api-failure-rate', type=float, default=0.0)
+    parser.add_argument('--telegram-latency', type=float, default=0.0)
+    parser.add_argument('--telegram-failure-rate', type=float, default=0.0)
+    parser.add_argument('--output', help='файл для дозаписи результатов')
+    args = parser.parse_args(argv)
+    for tenant_count in args.tenants:
+        result = run(
+            tenant_count, args.cycles, args.concurrency, args.change_rate,
+            args.api_latency, args.api_failure_rate,
+            args.telegram_latency, args.telegram_failure_rate,
+        )
+        line = json.dumps(result, ensure_ascii=False)
+        print(line, flush=True)
+        if args.output:
+            with open(args.output, 'a', encoding='utf-8') as output:
+                output.write(line + '\n')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
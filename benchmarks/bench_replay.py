@@ -0,0 +1,117 @@
+"""Прогон конвейера по записанной кассете API без сети.
+
+Запись кассеты в работающем боте: переменная окружения
+`CASSETTE_RECORD=api.cassette`. Прогон из корня репозитория:
+
+    python -m benchmarks.bench_replay api.cassette --speed 0
+
+Ответы из кассеты проходят `fetch_statuses` -> `check_response` ->
+`parse_status` -> `send_chat_message`, сообщения только считаются.
+При `--speed` > 0 сохраняются исходные интервалы, ускоренные в
+`speed` раз. Печатает строку JSON с пропускной способностью.
+"""
+import argparse
+import itertools
+import json
+import platform
+import sys
+import time
+
+import cassette
+import dedup
+import exeptions
+import fingerprint
+import homework
+import tenants
+from benchmarks.bench_pipeline import cpu_seconds, git_revision
+
+
+class CountingBot:
+    """Бот, который только считает сообщения."""
+
+    def __init__(self):
+        self.sent = 0
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        """Учёт сообщения без отправки."""
+        self.sent += 1
+
+
+def run(path, speed, tenant_count, fingerprints):
+    """Прогон всей кассеты по `tenant_count` арендаторам по кругу."""
+    replay = cassette.ReplayTransport(path, speed)
+    saved = (
+        homework.TRANSPORT, homework.FINGERPRINTS, homework.DELIVERED,
+        homework.CHECKPOINTS,
+    )
+    homework.TRANSPORT = replay
+    homework.FINGERPRINTS = (
+        fingerprint.FingerprintCache() if fingerprints else None
+    )
+    homework.DELIVERED = dedup.DeliveredIndex()
+    homework.CHECKPOINTS = None
+    bot = CountingBot()
+    tenant_list = [
+        tenants.Tenant(f't{index}', f'token{index}', index, 0)
+        for index in range(tenant_count)
+    ]
+    errors = 0
+    cpu_before = cpu_seconds()
+    started = time.perf_counter()
+    try:
+        for cycle in itertools.count():
+            tenant = tenant_list[cycle % tenant_count]
+            try:
+                homework.poll_tenant(bot, tenant)
+            except exeptions.CassetteExhausted:
+                break
+            except Exception:
+                errors += 1
+    finally:
+        elapsed = time.perf_counter() - started
+        cpu_used = cpu_seconds() - cpu_before
+        (
+            homework.TRANSPORT, homework.FINGERPRINTS, homework.DELIVERED,
+            homework.CHECKPOINTS,
+        ) = saved
+    interactions = replay.served
+    return {
+        'benchmark': 'replay',
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'cassette': str(path),
+        'speed': speed,
+        'tenants': tenant_count,
+        'interactions': interactions,
+        'messages': bot.sent,
+        'errors': errors,
+        'elapsed_s': round(elapsed, 4),
+        'interactions_per_s': round(interactions / elapsed, 2)
+        if elapsed else None,
+        'cpu_us_per_interaction': round(
+            cpu_used / max(interactions, 1) * 1e6, 2
+        ),
+    }
+
+
+def main(argv=None):
+    """Разбор аргументов и печать результата в формате JSON Lines."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('cassette')
+    parser.add_argument('--speed', type=float, default=0.0)
+    parser.add_argument('--tenants', type=int, default=1)
+    parser.add_argument('--no-fingerprints', action='store_true')
+    parser.add_argument('--output', help='файл для дозаписи результатов')
+    args = parser.parse_args(argv)
+    result = run(
+        args.cassette, args.speed, args.tenants, not args.no_fingerprints
+    )
+    line = json.dumps(result, ensure_ascii=False)
+    print(line, flush=True)
+    if args.output:
+        with open(args.output, 'a', encoding='utf-8') as output:
+            output.write(line + '\n')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""Бенчмарк холодного запуска бота.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.bench_startup --runs 10 --budget-ms 150
+
+Каждый замер — отдельный процесс: `import homework` под
+`-X importtime` и запуск `homework.py` без токенов, который должен
+завершиться до импорта тяжёлых зависимостей. Печатает строку JSON с
+медианами и завершается с кодом 1, если бюджет превышен или при
+импорте загрузились модули из HEAVY_MODULES.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_pipeline import git_revision
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('telegram', 'requests', 'asyncio', 'http.server')
+TOKEN_VARS = ('PRACTICUM_TOKEN', 'TELEGRAM_TOKEN', 'TELEGRAM_CHAT_ID')
+PROBE = (
+    'import sys, homework; '
+    f'print(",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))'
+)
+
+
+def environ(tokens):
+    """Окружение с токенами или без них."""
+    env = {key: value for key, value in os.environ.items()
+           if key not in TOKEN_VARS}
+    if tokens:
+        env.update(dict.fromkeys(TOKEN_VARS, 'bench'))
+    env['PYTHONPATH'] = ROOT
+    return env
+
+
+def import_time(workdir):
+    """Время `import homework` по -X importtime и тяжёлые модули в памяти."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE],
+        cwd=workdir, env=environ(tokens=True), capture_output=True,
+        text=True, check=True,
+    )
+    cumulative = None
+    for line in result.stderr.splitlines():
+        fields = line.split('|')
+        if len(fields) == 3 and fields[2].strip() == 'homework':
+            cumulative = int(fields[1]) / 1000
+    heavy = [name for name in result.stdout.strip().split(',') if name]
+    return cumulative, heavy
+
+
+def fail_fast_time(workdir):
+    """Время запуска `homework.py` без токенов до выхода с ошибкой."""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, os.path.join(ROOT, 'homework.py')],
+        cwd=workdir, env=environ(tokens=False), capture_output=True,
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode == 0:
+        raise RuntimeError('homework.py без токенов завершился без ошибки')
+    return elapsed * 1000
+
+
+def run(runs):
+    """`runs` замеров импорта и быстрого выхода."""
+    imports, exits, heavy = [], [], set()
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(runs):
+            cumulative, loaded = import_time(workdir)
+            imports.append(cumulative)
+            heavy.update(loaded)
+            exits.append(fail_fast_time(workdir))
+    return {
+        'benchmark': 'startup',
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'runs': runs,
+        'import_ms_p50': round(statistics.median(imports), 2),
+        'import_ms_max': round(max(imports), 2),
+        'fail_fast_ms_p50': round(statistics.median(exits), 2),
+        'heavy_modules': sorted(heavy),
+    }
+
+
+def main(argv=None):
+    """Замеры, печать в формате JSON Lines и проверка бюджета."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument(
+        '--budget-ms', type=float, default=150,
+        help='допустимая медиана времени import homework',
+    )
+    parser.add_argument('--output', help='файл для дозаписи результатов')
+    args = parser.parse_args(argv)
+    result = run(args.runs)
+    result['budget_ms'] = args.budget_ms
+    result['within_budget'] = (
+        result['import_ms_p50'] <= args.budget_ms
+        and not result['heavy_modules']
+    )
+    line = json.dumps(result, ensure_ascii=False)
+    print(line, flush=True)
+    if args.output:
+        with open(args.output, 'a', encoding='utf-8') as output:
+            output.write(line + '\n')
+    return 0 if result['within_budget'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
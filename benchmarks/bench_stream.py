@@ -0,0 +1,115 @@
+"""Сравнение разбора большого ответа API целиком и потоком.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.bench_stream --homeworks 1000 100000
+
+Для каждого размера печатает строку JSON: время до первой работы,
+общее время и пик памяти (tracemalloc) при `json.loads` всего тела
+и при `streaming.StreamedAnswer` по кускам STREAM_CHUNK_SIZE.
+Тело уже лежит в памяти, поэтому в пик входит только разбор.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import homework
+import streaming
+from benchmarks.bench_pipeline import git_revision
+
+
+def make_body(count):
+    """Тело ответа с `count` работами."""
+    return json.dumps({
+        'homeworks': [
+            {
+                'id': index,
+                'homework_name': f'username__hw{index}.zip',
+                'status': 'approved',
+                'date_updated': '2020-02-13T14:40:57Z',
+                'lesson_name': 'Итоговый проект',
+                'reviewer_comment': 'Всё отлично, так держать!',
+            }
+            for index in range(count)
+        ],
+        'current_date': 1581604970,
+    }, ensure_ascii=False).encode()
+
+
+def chunks(body, size):
+    """Тело кусками, как `iter_content`."""
+    view = memoryview(body)
+    for start in range(0, len(body), size):
+        yield bytes(view[start:start + size])
+
+
+def measure(consume):
+    """Время до первой работы, общее время и пик памяти `consume`."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    first = None
+    for _ in consume():
+        if first is None:
+            first = time.perf_counter() - started
+    total = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first, total, peak
+
+
+def run(count, chunk_size):
+    """Замеры для ответа с `count` работами."""
+    body = make_body(count)
+
+    def whole():
+        return homework.check_response(json.loads(body))
+
+    def streamed():
+        answer = streaming.StreamedAnswer(
+            chunks(body, chunk_size), homework.check_response
+        )
+        yield from answer
+        answer.finish()
+
+    loads_first, loads_total, loads_peak = measure(whole)
+    stream_first, stream_total, stream_peak = measure(streamed)
+    return {
+        'benchmark': 'stream',
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'homeworks': count,
+        'body_bytes': len(body),
+        'chunk_bytes': chunk_size,
+        'loads_first_ms': round(loads_first * 1000, 3),
+        'loads_total_ms': round(loads_total * 1000, 3),
+        'loads_peak_bytes': loads_peak,
+        'stream_first_ms': round(stream_first * 1000, 3),
+        'stream_total_ms': round(stream_total * 1000, 3),
+        'stream_peak_bytes': stream_peak,
+    }
+
+
+def main(argv=None):
+    """Разбор аргументов и печать результатов в формате JSON Lines."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--homeworks', type=int, nargs='+', default=[1000, 100000]
+    )
+    parser.add_argument(
+        '--chunk-size', type=int, default=streaming.STREAM_CHUNK_SIZE
+    )
+    parser.add_argument('--output', help='файл для дозаписи результатов')
+    args = parser.parse_args(argv)
+    for count in args.homeworks:
+        line = json.dumps(run(count, args.chunk_size), ensure_ascii=False)
+        print(line, flush=True)
+        if args.output:
+            with open(args.output, 'a', encoding='utf-8') as output:
+                output.write(line + '\n')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,467 @@
+"""Генератор нагрузки: заменитель API Практикума с потоком проверок.
+
+Поиск числа арендаторов, при котором бот перестаёт успевать по
+расписанию опросов на этой машине (запуск из корня репозитория):
+
+    python -m benchmarks.loadgen capacity --tenants 100 --search
+
+Отдельный сервер для внешних прогонов:
+
+    python -m benchmarks.loadgen serve --port 8080
+
+У каждого арендатора (ключ — заголовок Authorization) работы
+сдаются пуассоновским потоком `submit_rate` в час, через
+`review_delay` секунд переходят из `reviewing` в `approved` или
+`rejected`, а отклонённые сдаются повторно через `resubmit_delay`.
+Ответ содержит работы, изменившиеся с `from_date`, и `current_date`
+по модельным часам, которые идут в `time_scale` раз быстрее
+настоящих. Параметры арендаторов задаются файлом `--profiles`
+(`{"OAuth <токен>": {...}}`) или разбросом `--rate-spread`; доля
+ошибок каждого вида — `--error KIND=SHARE`.
+"""
+import argparse
+import asyncio
+import functools
+import heapq
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, urlparse
+
+import telegram
+from telegram.utils.request import Request
+
+import circuit
+import engine
+import homework
+import scheduler
+import tenants
+import transport
+from benchmarks.bench_pipeline import cpu_seconds, git_revision, percentile
+from benchmarks.standins import PracticumStandIn, StandIn, TelegramStandIn
+
+DISTRIBUTIONS = ('exponential', 'uniform', 'fixed')
+ERROR_KINDS = ('server', 'throttle', 'slow', 'garbage', 'schema')
+COMMENT = 'Хорошая работа, но стоит вынести константы. '
+
+
+class Profile:
+    """Параметры потока сдачи и проверки работ одного арендатора."""
+
+    __slots__ = (
+        'submit_rate', 'review_delay', 'resubmit_delay', 'approve_share',
+        'distribution',
+    )
+
+    def __init__(self, submit_rate=1.0, review_delay=3600.0,
+                 resubmit_delay=7200.0, approve_share=0.6,
+                 distribution='exponential'):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(
+                f'Неизвестное распределение {distribution}, '
+                f'допустимы {DISTRIBUTIONS}'
+            )
+        self.submit_rate = submit_rate
+        self.review_delay = review_delay
+        self.resubmit_delay = resubmit_delay
+        self.approve_share = approve_share
+        self.distribution = distribution
+
+    def delay(self, rng, mean):
+        """Случайная задержка со средним `mean` по `distribution`."""
+        if self.distribution == 'exponential':
+            return rng.expovariate(1 / mean) if mean > 0 else 0.0
+        if self.distribution == 'uniform':
+            return rng.uniform(0, 2 * mean)
+        return mean
+
+    def scaled(self, factor):
+        """Копия профиля с частотой сдачи, умноженной на `factor`."""
+        return Profile(
+            self.submit_rate * factor, self.review_delay,
+            self.resubmit_delay, self.approve_share, self.distribution,
+        )
+
+
+def iso_date(timestamp):
+    """Дата в формате `date_updated` API Практикума."""
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime(
+        '%Y-%m-%dT%H:%M:%SZ'
+    )
+
+
+class TenantSim:
+    """Модель работ одного арендатора, продвигаемая по запросам.
+
+    События (сдача и смена статуса) обрабатываются лениво при каждом
+    запросе до текущего модельного времени, поэтому простаивающие
+    арендаторы ничего не стоят.
+    """
+
+    def __init__(self, profile, rng, now, history=0, comment=''):
+        self.profile = profile
+        self.random = rng
+        self.comment = comment
+        self.homeworks = {}
+        self._events = []
+        self._counter = 0
+        rate = profile.submit_rate / 3600
+        self._rate = rate
+        self.next_submit = now + rng.expovariate(rate) if rate else math.inf
+        for _ in range(history):
+            self._add(now - 30 * 86400, 'approved')
+
+    def _add(self, at, status):
+        self._counter += 1
+        homework = {
+            'id': self._counter,
+            'homework_name': f'hw{self._counter}',
+            'status': status,
+            'date_updated': iso_date(at),
+            'lesson_name': f'Спринт {self._counter}',
+            'reviewer_comment': self.comment,
+        }
+        self.homeworks[self._counter] = [at, homework]
+        return self._counter
+
+    def _review(self, at, homework_id):
+        status = (
+            'approved'
+            if self.random.random() < self.profile.approve_share
+            else 'rejected'
+        )
+        due = at + self.profile.delay(self.random, self.profile.review_delay)
+        heapq.heappush(self._events, (due, homework_id, status))
+
+    def advance(self, now):
+        """Обработка сдач и проверок до момента `now`."""
+        while True:
+            event_at = self._events[0][0] if self._events else math.inf
+            if self.next_submit <= min(now, event_at):
+                at = self.next_submit
+                self._review(at, self._add(at, 'reviewing'))
+                self.next_submit = at + self.random.expovariate(self._rate)
+            elif event_at <= now:
+                at, homework_id, status = heapq.heappop(self._events)
+                entry = self.homeworks[homework_id]
+                entry[0] = at
+                entry[1]['status'] = status
+                entry[1]['date_updated'] = iso_date(at)
+                if status == 'rejected':
+                    heapq.heappush(self._events, (
+                        at + self.profile.delay(
+                            self.random, self.profile.resubmit_delay
+                        ),
+                        homework_id, 'reviewing',
+                    ))
+                elif status == 'reviewing':
+                    self._review(at, homework_id)
+            else:
+                return
+
+    def changed_since(self, from_date):
+        """Работы, изменившиеся не раньше `from_date`, новые первыми."""
+        changed = [
+            entry for entry in self.homeworks.values()
+            if entry[0] >= from_date
+        ]
+        changed.sort(key=lambda entry: entry[0], reverse=True)
+        return [dict(homework) for _, homework in changed]
+
+
+class PracticumLoad(StandIn):
+    """Заменитель ENDPOINT с моделью проверок и внедрением ошибок.
+
+    Виды ошибок в `errors` (доля запросов каждого вида):
+    `server` — ответ 500, `throttle` — 429 с Retry-After,
+    `slow` — ответ с задержкой `slow_delay`, `garbage` — тело не JSON,
+    `schema` — ответ без ключа `homeworks`.
+    """
+
+    path = PracticumStandIn.path
+
+    def __init__(self, profile=None, profiles=None, rate_spread=0.0,
+                 time_scale=1.0, history=0, comment_bytes=0, errors=None,
+                 slow_delay=5.0, **kwargs):
+        super().__init__(**kwargs)
+        unknown = set(errors or ()) - set(ERROR_KINDS)
+        if unknown:
+            raise ValueError(
+                f'Неизвестные виды ошибок {sorted(unknown)}, '
+                f'допустимы {ERROR_KINDS}'
+            )
+        self.profile = profile or Profile()
+        self.profiles = profiles or {}
+        self.rate_spread = rate_spread
+        self.time_scale = time_scale
+        self.history = history
+        self.comment = (COMMENT * (comment_bytes // len(COMMENT) + 1))[
+            :comment_bytes
+        ]
+        self.errors = dict(errors or {})
+        self.slow_delay = slow_delay
+        self.injected = dict.fromkeys(ERROR_KINDS, 0)
+        self.homeworks_served = 0
+        self.sims = {}
+        self._epoch = time.time()
+        self._started = time.monotonic()
+
+    def now(self):
+        """Модельное время в секундах Unix."""
+        return self._epoch + (
+            time.monotonic() - self._started
+        ) * self.time_scale
+
+    def _sim(self, key, now):
+        sim = self.sims.get(key)
+        if sim is None:
+            profile = self.profiles.get(key)
+            if profile is None:
+                profile = self.profile
+                if self.rate_spread:
+                    profile = profile.scaled(
+                        self.random.lognormvariate(0, self.rate_spread)
+                    )
+            sim = self.sims[key] = TenantSim(
+                profile, self.random, now, self.history, self.comment
+            )
+        return sim
+
+    def _error(self):
+        draw = self.random.random()
+        for kind, share in self.errors.items():
+            if draw < share:
+                self.injected[kind] += 1
+                return kind
+            draw -= share
+        return None
+
+    def handle_get(self, request):
+        """Ответ в формате API Практикума с учётом `from_date`."""
+        query = parse_qs(urlparse(request.path).query)
+        try:
+            from_date = int(query['from_date'][0])
+        except (KeyError, ValueError):
+            return 400, b'{"code": "UnknownError"}'
+        key = request.headers.get('Authorization', '')
+        if not key.startswith('OAuth '):
+            return 401, b'{"code": "not_authenticated"}'
+        with self.lock:
+            error = self._error()
+            now = self.now()
+            if error == 'server':
+                return 500, b'{"code": "UnknownError"}'
+            if error == 'throttle':
+                return 429, b'{"code": "throttled"}', {'Retry-After': '1'}
+            if error == 'garbage':
+                return 200, b'<html>502 Bad Gateway</html>'
+            if error == 'schema':
+                return 200, json.dumps({'current_date': int(now)}).encode()
+            sim = self._sim(key, now)
+            sim.advance(now)
+            homeworks = sim.changed_since(from_date)
+            self.homeworks_served += len(homeworks)
+        if error == 'slow':
+            time.sleep(self.slow_delay)
+        body = {'homeworks': homeworks, 'current_date': int(now)}
+        return 200, json.dumps(body, ensure_ascii=False).encode()
+
+
+class LagRecorder(scheduler.PollScheduler):
+    """Расписание опросов, запоминающее отставание каждого опроса."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lags = []
+
+    async def next_due(self):
+        """Очередной арендатор с записью отставания от расписания."""
+        tenant = await super().next_due()
+        self.lags.append(self.lag)
+        return tenant
+
+
+def load_profiles(path):
+    """Профили арендаторов из JSON: {"OAuth <токен>": {параметры}}."""
+    with open(path, encoding='utf-8') as file:
+        data = json.load(file)
+    return {key: Profile(**params) for key, params in data.items()}
+
+
+def capacity(tenant_count, duration, concurrency, min_interval, rate_limit,
+             max_lag, **load):
+    """Опрос `tenant_count` арендаторов движком в течение `duration` секунд.
+
+    Арендатор отстаёт, если опрос начался позже назначенного; прогон
+    считается неуспевающим, если p95 отставания больше `max_lag`.
+    """
+    practicum = PracticumLoad(**load)
+    bot_api = TelegramStandIn()
+    saved = (homework.ENDPOINT, homework.TRANSPORT, homework.BREAKER)
+    with practicum, bot_api:
+        homework.ENDPOINT = practicum.url
+        homework.TRANSPORT = transport.Transport(pool_size=concurrency)
+        homework.BREAKER = circuit.CircuitBreaker()
+        bot = telegram.Bot(
+            token='123:bench', base_url=bot_api.url,
+            request=Request(con_pool_size=concurrency),
+        )
+        tenant_list = [
+            tenants.Tenant(f't{index}', f'token{index}', index, 0)
+            for index in range(tenant_count)
+        ]
+        poll_scheduler = LagRecorder(
+            rate_limit=rate_limit,
+            interval=functools.partial(
+                scheduler.poll_interval, min_interval=min_interval,
+                default_interval=min_interval,
+                max_interval=min_interval * 10,
+            ),
+        )
+        polling = engine.PollingEngine(
+            bot, tenant_list, concurrency, retry_time=min_interval,
+            poll_scheduler=poll_scheduler,
+        )
+
+        async def scenario():
+            try:
+                await asyncio.wait_for(polling.run(), duration)
+            except asyncio.TimeoutError:
+                pass
+
+        cpu_before = cpu_seconds()
+        started = time.perf_counter()
+        try:
+            asyncio.run(scenario())
+            polling.executor.shutdown(wait=True)
+        finally:
+            elapsed = time.perf_counter() - started
+            cpu_used = cpu_seconds() - cpu_before
+            homework.TRANSPORT.close()
+            homework.ENDPOINT, homework.TRANSPORT, homework.BREAKER = saved
+    lags = poll_scheduler.lags
+    lag_p95 = percentile(lags, 0.95)
+    return {
+        'benchmark': 'loadgen',
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'tenants': tenant_count,
+        'duration_s': round(elapsed, 2),
+        'concurrency': concurrency,
+        'min_interval_s': min_interval,
+        'polls': len(lags),
+        'polls_per_s': round(len(lags) / elapsed, 2),
+        'api_requests': practicum.requests,
+        'homeworks_served': practicum.homeworks_served,
+        'injected_errors': practicum.injected,
+        'notifications': bot_api.messages,
+        'lag_p50_ms': round(statistics.median(lags) * 1000, 2)
+        if lags else None,
+        'lag_p95_ms': round(lag_p95 * 1000, 2) if lags else None,
+        'lag_max_ms': round(max(lags) * 1000, 2) if lags else None,
+        'cpu_ms_per_poll': round(cpu_used / max(len(lags), 1) * 1000, 4),
+        'behind': not lags or lag_p95 > max_lag,
+    }
+
+
+def error_share(value):
+    """Разбор аргумента KIND=SHARE."""
+    kind, _, share = value.partition('=')
+    if kind not in ERROR_KINDS:
+        raise argparse.ArgumentTypeError(
+            f'вид ошибки должен быть одним из {ERROR_KINDS}'
+        )
+    return kind, float(share)
+
+
+def main(argv=None):
+    """Запуск сервера или поиск предельного числа арендаторов."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('mode', choices=('capacity', 'serve'))
+    parser.add_argument('--profiles', help='JSON с профилями арендаторов')
+    parser.add_argument('--submit-rate', type=float, default=1.0,
+                        help='сдач работ в час на арендатора')
+    parser.add_argument('--review-delay', type=float, default=3600)
+    parser.add_argument('--resubmit-delay', type=float, default=7200)
+    parser.add_argument('--approve-share', type=float, default=0.6)
+    parser.add_argument('--distribution', choices=DISTRIBUTIONS,
+                        default='exponential')
+    parser.add_argument('--rate-spread', type=float, default=1.0,
+                        help='sigma логнормального разброса частоты сдач')
+    parser.add_argument('--time-scale', type=float, default=60,
+                        help='во сколько раз модельные часы быстрее')
+    parser.add_argument('--history', type=int, default=0,
+                        help='старых работ в первом ответе')
+    parser.add_argument('--comment-bytes', type=int, default=0)
+    parser.add_argument('--error', type=error_share, action='append',
+                        default=[], metavar='KIND=SHARE')
+    parser.add_argument('--slow-delay', type=float, default=5.0)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--tenants', type=int, default=100)
+    parser.add_argument('--search', action='store_true',
+                        help='удваивать число арендаторов, пока бот успевает')
+    parser.add_argument('--max-tenants', type=int, default=100000)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--min-interval', type=float, default=5,
+                        help='минимальная пауза между опросами арендатора')
+    parser.add_argument('--rate-limit', type=float, default=1000,
+                        help='запросов к API в секунду')
+    parser.add_argument('--max-lag', type=float, default=1.0,
+                        help='допустимое p95 отставания опроса, с')
+    parser.add_argument('--output', help='файл для дозаписи результатов')
+    args = parser.parse_args(argv)
+    load = {
+        'profile': Profile(
+            args.submit_rate, args.review_delay, args.resubmit_delay,
+            args.approve_share, args.distribution,
+        ),
+        'profiles': load_profiles(args.profiles) if args.profiles else None,
+        'rate_spread': args.rate_spread,
+        'time_scale': args.time_scale,
+        'history': args.history,
+        'comment_bytes': args.comment_bytes,
+        'errors': dict(args.error),
+        'slow_delay': args.slow_delay,
+        'latency': args.latency,
+        'seed': args.seed,
+    }
+    if args.mode == 'serve':
+        with PracticumLoad(port=args.port, **load) as practicum:
+            print(f'Заменитель API: {practicum.url}', flush=True)
+            try:
+                practicum.thread.join()
+            except KeyboardInterrupt:
+                pass
+        return 0
+    tenant_count = args.tenants
+    supported = None
+    while tenant_count <= args.max_tenants:
+        result = capacity(
+            tenant_count, args.duration, args.concurrency, args.min_interval,
+            args.rate_limit, args.max_lag, **load,
+        )
+        line = json.dumps(result, ensure_ascii=False)
+        print(line, flush=True)
+        if args.output:
+            with open(args.output, 'a', encoding='utf-8') as output:
+                output.write(line + '\n')
+        if result['behind'] or not args.search:
+            break
+        supported = tenant_count
+        tenant_count *= 2
+    if args.search:
+        print(json.dumps({
+            'benchmark': 'loadgen', 'supported_tenants': supported,
+        }), flush=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
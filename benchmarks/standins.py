@@ -0,0 +1,162 @@
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+HOMEWORK_NAME = re.compile(r'работы "([^"]+)"')
+
+
+class StandIn:
+    """HTTP-сервер в фоновом потоке с задержкой и долей отказов."""
+
+    path = '/'
+
+    def __init__(self, latency=0.0, failure_rate=0.0, seed=None, port=0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(
+            ('127.0.0.1', port), self._handler()
+        )
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(
+            target=self.httpd.serve_forever, daemon=True
+        )
+
+    @property
+    def url(self):
+        """Базовый адрес заменителя."""
+        return f'http://127.0.0.1:{self.httpd.server_port}{self.path}'
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _reply(self, method):
+                with standin.lock:
+                    standin.requests += 1
+                    failed = standin.random.random() < standin.failure_rate
+                if standin.latency:
+                    time.sleep(standin.latency)
+                headers = {}
+                if failed:
+                    self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                    status, body = 500, b'{"error": "injected failure"}'
+                else:
+                    status, body, *extra = method(self)
+                    if extra:
+                        headers = extra[0]
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                self._reply(standin.handle_get)
+
+            def do_POST(self):
+                self._reply(standin.handle_post)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def handle_get(self, request):
+        """Ответ на GET-запрос: (код, тело[, заголовки])."""
+        return 405, b'{}'
+
+    def handle_post(self, request):
+        """Ответ на POST-запрос: (код, тело[, заголовки])."""
+        return 405, b'{}'
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class PracticumStandIn(StandIn):
+    """Заменитель ENDPOINT: с вероятностью `change_rate` отдаёт новую работу.
+
+    Время выдачи каждой работы запоминается в `served_at` по её имени,
+    чтобы считать задержку до получения уведомления в Telegram.
+    """
+
+    path = '/api/user_api/homework_statuses/'
+    statuses = ('reviewing', 'rejected', 'approved')
+
+    def __init__(self, change_rate=0.1, **kwargs):
+        super().__init__(**kwargs)
+        self.change_rate = change_rate
+        self.served_at = {}
+        self._counter = 0
+
+    def handle_get(self, request):
+        """Ответ в формате API Практикума с учётом `from_date`."""
+        query = parse_qs(urlparse(request.path).query)
+        if 'from_date' not in query:
+            return 400, b'{"code": "UnknownError"}'
+        if not request.headers.get('Authorization', '').startswith('OAuth '):
+            return 401, b'{"code": "not_authenticated"}'
+        homeworks = []
+        with self.lock:
+            if self.random.random() < self.change_rate:
+                self._counter += 1
+                name = f'hw{self._counter}'
+                homeworks.append({
+                    'id': self._counter,
+                    'homework_name': name,
+                    'status': self.random.choice(self.statuses),
+                    'date_updated': '2020-02-13T14:40:57Z',
+                    'lesson_name': 'Итоговый проект',
+                    'reviewer_comment': '',
+                })
+                self.served_at[name] = time.perf_counter()
+        body = {'homeworks': homeworks, 'current_date': int(time.time())}
+        return 200, json.dumps(body).encode()
+
+
+class TelegramStandIn(StandIn):
+    """Заменитель Telegram Bot API: принимает sendMessage.
+
+    Время получения сообщения запоминается по имени работы из текста.
+    """
+
+    path = '/bot'
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.received_at = {}
+        self.messages = 0
+
+    def handle_post(self, request):
+        """Ответ на sendMessage в формате Bot API."""
+        length = int(request.headers.get('Content-Length', 0))
+        data = json.loads(request.rfile.read(length) or b'{}')
+        received = time.perf_counter()
+        match = HOMEWORK_NAME.search(data.get('text', ''))
+        with self.lock:
+            self.messages += 1
+            if match:
+                self.received_at[match.group(1)] = received
+        result = {
+            'message_id': self.messages,
+            'date': int(time.time()),
+            'chat': {'id': int(data.get('chat_id', 0)), 'type': 'private'},
+            'text': data.get('text', ''),
+        }
+        return 200, json.dumps({'ok': True, 'result': result}).encode()
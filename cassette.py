@@ -0,0 +1,245 @@
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+
+import exeptions
+import settings  # noqa: F401
+
+CASSETTE_RECORD = os.getenv('CASSETTE_RECORD')
+CASSETTE_LEVEL = int(os.getenv('CASSETTE_LEVEL', 6))
+MAGIC = b'HWCASS1\n'
+LENGTH = struct.Struct('>I')
+KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+def tenant_key(headers):
+    """Обезличенный ключ арендатора: токен в кассету не пишется."""
+    return hashlib.blake2b(
+        headers.get('Authorization', '').encode(), digest_size=8
+    ).hexdigest()
+
+
+class Interaction:
+    """Один записанный запрос к API и ответ на него."""
+
+    __slots__ = (
+        'offset', 'tenant', 'params', 'status', 'elapsed', 'headers',
+        'error', 'body',
+    )
+
+    def __init__(self, offset, tenant, params, status=None, elapsed=0.0,
+                 headers=None, error=None, body=b''):
+        self.offset = offset
+        self.tenant = tenant
+        self.params = params
+        self.status = status
+        self.elapsed = elapsed
+        self.headers = headers or {}
+        self.error = error
+        self.body = body
+
+    def encode(self, level=CASSETTE_LEVEL):
+        """Запись с префиксом длины: сжатые метаданные JSON и тело."""
+        meta = json.dumps({
+            'offset': self.offset, 'tenant': self.tenant,
+            'params': self.params, 'status': self.status,
+            'elapsed': self.elapsed, 'headers': self.headers,
+            'error': self.error,
+        }, separators=(',', ':')).encode()
+        payload = zlib.compress(meta + b'\n' + self.body, level)
+        return LENGTH.pack(len(payload)) + payload
+
+    @classmethod
+    def decode(cls, payload):
+        """Запись из сжатых данных без префикса длины."""
+        meta, body = zlib.decompress(payload).split(b'\n', 1)
+        return cls(body=body, **json.loads(meta))
+
+
+class CassetteWriter:
+    """Дозапись взаимодействий с API в файл кассеты.
+
+    Каждая запись сбрасывается в файл сразу, поэтому при падении
+    процесса теряется не больше одной, а обрезанный хвост пропускается
+    при чтении.
+    """
+
+    def __init__(self, path, level=CASSETTE_LEVEL):
+        self.level = level
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+        self._lock = threading.Lock()
+        self._started = time.time()
+        self.written = 0
+
+    def write(self, interaction):
+        """Дозапись одного взаимодействия."""
+        data = interaction.encode(self.level)
+        with self._lock:
+            self._file.write(data)
+            self._file.flush()
+            self.written += 1
+
+    def offset(self):
+        """Секунды с начала записи."""
+        return time.time() - self._started
+
+    def close(self):
+        """Закрытие файла."""
+        with self._lock:
+            self._file.close()
+
+
+def read_cassette(path):
+    """Взаимодействия из кассеты по порядку записи."""
+    with open(path, 'rb') as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise exeptions.CassetteError(f'{path} не является кассетой')
+        offset = 0.0
+        while True:
+            prefix = file.read(LENGTH.size)
+            if len(prefix) < LENGTH.size:
+                return
+            payload = file.read(LENGTH.unpack(prefix)[0])
+            try:
+                interaction = Interaction.decode(payload)
+            except (zlib.error, ValueError):
+                return
+            # Несколько запусков записи в один файл идут друг за другом.
+            if interaction.offset < offset:
+                interaction.offset = offset
+            offset = interaction.offset
+            yield interaction
+
+
+class RecordingTransport:
+    """Обёртка над `transport.Transport`, пишущая запросы в кассету."""
+
+    def __init__(self, inner, writer):
+        self.inner = inner
+        self.writer = writer
+
+    def get(self, url, headers=None, params=None, **kwargs):
+        """Запрос через исходный транспорт с записью ответа или ошибки."""
+        headers = headers or {}
+        offset = self.writer.offset()
+        started = time.monotonic()
+        try:
+            response = self.inner.get(
+                url, headers=headers, params=params, **kwargs
+            )
+        except Exception as error:
+            self.writer.write(Interaction(
+                offset, tenant_key(headers), params,
+                elapsed=time.monotonic() - started,
+                error=type(error).__name__,
+            ))
+            raise
+        self.writer.write(Interaction(
+            offset, tenant_key(headers), params, response.status_code,
+            time.monotonic() - started,
+            {
+                name: response.headers[name] for name in KEPT_HEADERS
+                if name in response.headers
+            },
+            body=response.content,
+        ))
+        return response
+
+    def stats(self):
+        """Статистика исходного транспорта."""
+        return self.inner.stats()
+
+    def close(self):
+        """Закрытие транспорта и кассеты."""
+        self.inner.close()
+        self.writer.close()
+
+
+class ReplayResponse:
+    """Ответ API из кассеты с интерфейсом ответа requests."""
+
+    __slots__ = ('status_code', 'headers', 'content')
+
+    def __init__(self, interaction):
+        self.status_code = interaction.status
+        self.headers = interaction.headers
+        self.content = interaction.body
+
+    def json(self):
+        """Разбор тела ответа."""
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size=1):
+        """Тело ответа кусками, как при `stream=True`."""
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        """Совместимость с ответом requests."""
+
+
+class ReplayTransport:
+    """Выдача ответов из кассеты вместо запросов к API.
+
+    Ответы выдаются по порядку записи независимо от арендатора.
+    При `speed` > 0 соблюдаются исходные интервалы и задержки ответов,
+    ускоренные в `speed` раз, при 0 ответы выдаются без пауз. Когда
+    кассета закончилась, бросается `CassetteExhausted`.
+    """
+
+    def __init__(self, path, speed=0.0):
+        self.speed = speed
+        self.served = 0
+        self._interactions = read_cassette(path)
+        self._lock = threading.Lock()
+        self._started = None
+
+    def get(self, url, **kwargs):
+        """Следующий записанный ответ."""
+        with self._lock:
+            interaction = next(self._interactions, None)
+            if interaction is None:
+                raise exeptions.CassetteExhausted('Кассета закончилась')
+            if self._started is None:
+                self._started = time.monotonic() - (
+                    interaction.offset / self.speed if self.speed else 0
+                )
+            self.served += 1
+        if self.speed:
+            delay = (
+                self._started
+                + (interaction.offset + interaction.elapsed) / self.speed
+                - time.monotonic()
+            )
+            if delay > 0:
+                time.sleep(delay)
+        if interaction.error is not None:
+            import requests
+
+            raise requests.RequestException(
+                f'Записанная ошибка {interaction.error}'
+            )
+        return ReplayResponse(interaction)
+
+    def stats(self):
+        """Статистика в формате `transport.Transport.stats`."""
+        return {
+            'requests': self.served, 'handshakes': 0,
+            'open_connections': 0, 'reuse_rate': 0.0,
+        }
+
+    def close(self):
+        """Совместимость с `transport.Transport`."""
+
+
+def recording(inner, path=CASSETTE_RECORD):
+    """Транспорт с записью в кассету `path`, если она задана."""
+    if not path:
+        return inner
+    return RecordingTransport(inner, CassetteWriter(path))
@@ -0,0 +1,139 @@
+import os
+import sqlite3
+import threading
+import time
+
+import settings  # noqa: F401
+
+CHECKPOINT_DB = os.getenv('CHECKPOINT_DB', 'homework_bot.sqlite3')
+CHECKPOINT_FLUSH_EVERY = int(os.getenv('CHECKPOINT_FLUSH_EVERY', 100))
+CHECKPOINT_FLUSH_INTERVAL = float(os.getenv('CHECKPOINT_FLUSH_INTERVAL', 5))
+
+
+def connect(path):
+    """Подключение к SQLite в режиме WAL для работы из нескольких потоков."""
+    conn = sqlite3.connect(
+        path, check_same_thread=False, isolation_level=None, timeout=30,
+    )
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=FULL')
+    return conn
+
+
+def start_timer(interval, function):
+    """Однократный вызов `function` из фонового потока через `interval` с."""
+    timer = threading.Timer(interval, function)
+    timer.daemon = True
+    timer.start()
+    return timer
+
+
+class CheckpointStore:
+    """Хранилище последнего подтверждённого `current_date` арендаторов.
+
+    Записи накапливаются в памяти и сбрасываются на диск одной транзакцией
+    (один fsync) каждые `flush_every` сохранений или фоновым таймером не
+    позже чем через `flush_interval` секунд после первой несброшенной.
+    При сбое теряется только несброшенный хвост: бот продолжит с более
+    ранней отметки и повторно запросит небольшой интервал.
+    `before_flush` вызывается перед каждой записью: так журнал исходящих
+    сообщений и доставленные ключи попадают на диск раньше отметки,
+    которая их покрывает.
+    """
+
+    def __init__(self, path=CHECKPOINT_DB, flush_every=CHECKPOINT_FLUSH_EVERY,
+                 flush_interval=CHECKPOINT_FLUSH_INTERVAL, before_flush=None):
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.before_flush = before_flush
+        self._conn = connect(path)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS checkpoints ('
+            ' tenant TEXT PRIMARY KEY,'
+            ' from_date INTEGER NOT NULL,'
+            ' updated_at REAL NOT NULL)'
+        )
+        self._last_date, = self._conn.execute(
+            'SELECT MAX(from_date) FROM checkpoints'
+        ).fetchone()
+        self._pending = {}
+        self._dirty_since = None
+        self._flushed_at = time.monotonic()
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def load(self, tenant_name, default=None):
+        """Последняя сохранённая отметка арендатора."""
+        with self._lock:
+            if tenant_name in self._pending:
+                return self._pending[tenant_name][0]
+            row = self._conn.execute(
+                'SELECT from_date FROM checkpoints WHERE tenant = ?',
+                (tenant_name,),
+            ).fetchone()
+        return default if row is None else row[0]
+
+    def save(self, tenant_name, current_date):
+        """Сохранение подтверждённой отметки арендатора."""
+        with self._lock:
+            if not self._pending:
+                self._dirty_since = time.time()
+            self._pending[tenant_name] = (current_date, time.time())
+            self._last_date = current_date
+            if (
+                len(self._pending) >= self.flush_every
+                or time.monotonic() - self._flushed_at >= self.flush_interval
+            ):
+                self._flush()
+            elif self._timer is None:
+                self._timer = start_timer(self.flush_interval, self.flush)
+
+    def flush(self):
+        """Запись накопленных отметок на диск."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._flushed_at = time.monotonic()
+        if not self._pending:
+            return
+        if self.before_flush is not None:
+            self.before_flush()
+        rows = [
+            (name, current_date, updated_at)
+            for name, (current_date, updated_at) in self._pending.items()
+        ]
+        self._conn.execute('BEGIN')
+        try:
+            self._conn.executemany(
+                'INSERT INTO checkpoints (tenant, from_date, updated_at) '
+                'VALUES (?, ?, ?) ON CONFLICT(tenant) DO UPDATE SET '
+                'from_date = excluded.from_date, '
+                'updated_at = excluded.updated_at',
+                rows,
+            )
+        except sqlite3.Error:
+            self._conn.execute('ROLLBACK')
+            raise
+        self._conn.execute('COMMIT')
+        self._pending.clear()
+        self._dirty_since = None
+
+    def age(self):
+        """Сколько секунд самая старая отметка ждёт записи на диск."""
+        dirty_since = self._dirty_since
+        return 0.0 if dirty_since is None else time.time() - dirty_since
+
+    def current_age(self):
+        """Сколько секунд прошло с `current_date` последней отметки."""
+        last_date = self._last_date
+        return 0.0 if last_date is None else time.time() - last_date
+
+    def close(self):
+        """Сброс накопленных отметок и закрытие базы."""
+        with self._lock:
+            self._flush()
+            self._conn.close()
@@ -0,0 +1,109 @@
+import os
+import random
+import threading
+import time
+
+import settings  # noqa: F401
+
+BREAKER_FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', 3))
+BREAKER_BASE_DELAY = float(os.getenv('BREAKER_BASE_DELAY', 30))
+BREAKER_MAX_DELAY = float(os.getenv('BREAKER_MAX_DELAY', 1800))
+BREAKER_JITTER = float(os.getenv('BREAKER_JITTER', 0.5))
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitBreaker:
+    """Предохранитель для запросов к API Практикума.
+
+    После `failure_threshold` сбоев подряд запросы не выполняются, пока
+    не истечёт пауза. Пауза удваивается с каждым повторным размыканием
+    (не больше `max_delay`) и случайно укорачивается на долю `jitter`,
+    чтобы воркеры не возвращались к API одновременно. По истечении паузы
+    пропускается один пробный запрос: успех замыкает цепь, сбой снова
+    размыкает её.
+    """
+
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD,
+                 base_delay=BREAKER_BASE_DELAY, max_delay=BREAKER_MAX_DELAY,
+                 jitter=BREAKER_JITTER):
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.state = CLOSED
+        self.failures = 0
+        self._trips = 0
+        self._reopen_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Можно ли сейчас выполнить запрос."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() >= self._reopen_at:
+                self.state = HALF_OPEN
+                return True
+            return False
+
+    def retry_after(self):
+        """Сколько секунд осталось до пробного запроса."""
+        with self._lock:
+            if self.state == CLOSED:
+                return 0.0
+            return max(self._reopen_at - time.monotonic(), 0.0)
+
+    def record_success(self):
+        """Учёт успешного запроса."""
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._trips = 0
+
+    def record_failure(self):
+        """Учёт неудачного запроса.
+
+        Сбои запросов, начатых до размыкания и завершившихся, пока цепь
+        разомкнута, не учитываются и не удлиняют паузу.
+        """
+        with self._lock:
+            if self.state == OPEN:
+                return
+            self.failures += 1
+            if (
+                self.state == HALF_OPEN
+                or self.failures >= self.failure_threshold
+            ):
+                delay = min(self.max_delay, self.base_delay * 2 ** self._trips)
+                delay *= random.uniform(1 - self.jitter, 1)
+                self._trips += 1
+                self._reopen_at = time.monotonic() + delay
+                self.state = OPEN
+
+
+class AlertDeduplicator:
+    """Одно оповещение на каждый класс ошибки до восстановления работы."""
+
+    def __init__(self):
+        self._active = set()
+        self._lock = threading.Lock()
+
+    def should_alert(self, error):
+        """Нужно ли оповещать об ошибке: не было ли такой уже."""
+        key = type(error).__name__
+        with self._lock:
+            if key in self._active:
+                return False
+            self._active.add(key)
+            return True
+
+    def recovered(self):
+        """Были ли активные ошибки до успешного цикла; сбрасывает их."""
+        with self._lock:
+            if not self._active:
+                return False
+            self._active.clear()
+            return True
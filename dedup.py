@@ -0,0 +1,143 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import checkpoints
+import settings  # noqa: F401
+
+DEDUP_DB = os.getenv('DEDUP_DB', checkpoints.CHECKPOINT_DB)
+DEDUP_MAX_SIZE = int(os.getenv('DEDUP_MAX_SIZE', 200_000))
+DEDUP_TTL = float(os.getenv('DEDUP_TTL', 30 * 24 * 60 * 60))
+DEDUP_FLUSH_EVERY = int(os.getenv('DEDUP_FLUSH_EVERY', 100))
+DEDUP_FLUSH_INTERVAL = float(os.getenv('DEDUP_FLUSH_INTERVAL', 5))
+
+
+def delivery_key(tenant_name, record):
+    """Ключ доставленного перехода: арендатор, работа, статус и дата.
+
+    Ключ хранится как 64-битный хеш: на диске это целочисленный
+    первичный ключ, в памяти индекс занимает около 170 байт на ключ
+    (около 33 МБ при DEDUP_MAX_SIZE по умолчанию).
+    """
+    raw = '\x1f'.join(map(str, (
+        tenant_name, record.id, record.status, record.date_updated,
+    )))
+    digest = hashlib.blake2b(raw.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+class DeliveredIndex:
+    """Ограниченный индекс уже отправленных уведомлений.
+
+    LRU по доступу с вытеснением по `max_size` и сроку жизни `ttl`.
+    Если указан `path`, ключи дописываются в SQLite пачками по
+    `flush_every` или не позже чем через `flush_interval` секунд после
+    первого несброшенного ключа и подгружаются при запуске.
+    `before_flush` вызывается перед записью ключей: так сообщения outbox
+    попадают на диск раньше отметки об их доставке, и после сбоя
+    недоставленное уведомление не пропускается как уже отправленное.
+    """
+
+    def __init__(self, path=None, max_size=DEDUP_MAX_SIZE, ttl=DEDUP_TTL,
+                 flush_every=DEDUP_FLUSH_EVERY,
+                 flush_interval=DEDUP_FLUSH_INTERVAL, before_flush=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.before_flush = before_flush
+        self._entries = OrderedDict()
+        self._pending = []
+        self._timer = None
+        self._lock = threading.Lock()
+        self._conn = None
+        if path is not None:
+            self._conn = checkpoints.connect(path)
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS delivered ('
+                ' key INTEGER PRIMARY KEY,'
+                ' delivered_at REAL NOT NULL)'
+            )
+            self._load()
+
+    def _load(self):
+        rows = self._conn.execute(
+            'SELECT key, delivered_at FROM delivered WHERE delivered_at > ? '
+            'ORDER BY delivered_at DESC LIMIT ?',
+            (time.time() - self.ttl, self.max_size),
+        ).fetchall()
+        for key, delivered_at in reversed(rows):
+            self._entries[key] = delivered_at
+
+    def __len__(self):
+        return len(self._entries)
+
+    def seen(self, key):
+        """Проверка, было ли уведомление уже доставлено."""
+        with self._lock:
+            delivered_at = self._entries.get(key)
+            if delivered_at is None:
+                return False
+            if time.time() - delivered_at > self.ttl:
+                del self._entries[key]
+                return False
+            self._entries.move_to_end(key)
+            return True
+
+    def add(self, key):
+        """Отметка уведомления как доставленного."""
+        now = time.time()
+        with self._lock:
+            self._entries[key] = now
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            if self._conn is not None:
+                self._pending.append((key, now))
+                if len(self._pending) >= self.flush_every:
+                    self._flush()
+                elif self._timer is None:
+                    self._timer = checkpoints.start_timer(
+                        self.flush_interval, self.flush
+                    )
+
+    def flush(self):
+        """Запись накопленных ключей на диск и удаление устаревших."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._conn is None:
+            return
+        if self._pending and self.before_flush is not None:
+            self.before_flush()
+        self._conn.execute('BEGIN')
+        try:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO delivered (key, delivered_at) '
+                'VALUES (?, ?)',
+                self._pending,
+            )
+            self._conn.execute(
+                'DELETE FROM delivered WHERE delivered_at <= ?',
+                (time.time() - self.ttl,),
+            )
+        except sqlite3.Error:
+            self._conn.execute('ROLLBACK')
+            raise
+        self._conn.execute('COMMIT')
+        self._pending.clear()
+
+    def close(self):
+        """Сброс накопленных ключей и закрытие базы."""
+        with self._lock:
+            if self._conn is not None:
+                self._flush()
+                self._conn.close()
+                self._conn = None
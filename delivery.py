@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import telegram
+
+import metrics
+import settings  # noqa: F401
+from ratelimit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+COALESCE_WINDOW = float(os.getenv('TELEGRAM_COALESCE_WINDOW', 2))
+CHAT_RATE_LIMIT = float(os.getenv('TELEGRAM_CHAT_RATE_LIMIT', 1))
+GLOBAL_RATE_LIMIT = float(os.getenv('TELEGRAM_GLOBAL_RATE_LIMIT', 30))
+DELIVERY_WORKERS = int(os.getenv('TELEGRAM_DELIVERY_WORKERS', 8))
+MESSAGE_LIMIT = 4096
+
+
+def coalesce(texts, limit=MESSAGE_LIMIT):
+    """Склейка сообщений одного чата в как можно меньшее число частей."""
+    parts = []
+    for text in texts:
+        if parts and len(parts[-1]) + 2 + len(text) <= limit:
+            parts[-1] = f'{parts[-1]}\n\n{text}'
+        else:
+            parts.append(text)
+    return parts
+
+
+class MessageQueue:
+    """Очередь исходящих сообщений Telegram, отвязанная от опроса API.
+
+    `send_message` можно вызывать из любого потока: он только ставит
+    сообщение в очередь, поэтому объект подставляется вместо бота в
+    `homework.send_chat_message`. Сообщения одного чата, пришедшие за
+    `coalesce_window` секунд в одном формате (`parse_mode`), склеиваются
+    в одно. Отправка ограничена
+    токен-бакетами на чат и на бота в целом, ответ 429 (`RetryAfter`)
+    приостанавливает отправку на указанное Telegram время.
+    `send_tracked` сообщает об итоге отправки через функцию обратного
+    вызова, которой пользуется outbox для подтверждения доставки.
+    """
+
+    def __init__(self, bot, coalesce_window=COALESCE_WINDOW,
+                 chat_rate=CHAT_RATE_LIMIT, global_rate=GLOBAL_RATE_LIMIT,
+                 workers=DELIVERY_WORKERS):
+        self.bot = bot
+        self.coalesce_window = coalesce_window
+        self.chat_rate = chat_rate
+        self.workers = workers
+        self.sent = 0
+        self._global = TokenBucket(global_rate)
+        self._chats = {}
+        self._pending = {}
+        self._depth = 0
+        self._callbacks = {}
+        self._inflight = set()
+        self._ready = None
+        self._loop = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='telegram'
+        )
+
+    @property
+    def depth(self):
+        """Число сообщений, ожидающих отправки.
+
+        Счётчик меняется только в потоке event loop, поэтому его можно
+        читать из других потоков, например из сервера метрик.
+        """
+        return self._depth
+
+    def send_message(self, chat_id=None, text=None, parse_mode=None,
+                     **kwargs):
+        """Потокобезопасная постановка сообщения в очередь."""
+        if self._loop is None:
+            raise RuntimeError('Очередь сообщений не запущена')
+        self._loop.call_soon_threadsafe(self.put, chat_id, text, parse_mode)
+
+    def send_tracked(self, chat_id, text, parse_mode, callback):
+        """Постановка в очередь с вызовом `callback(delivered)` после отправки.
+
+        `callback` вызывается в потоке event loop.
+        """
+        if self._loop is None:
+            raise RuntimeError('Очередь сообщений не запущена')
+        self._loop.call_soon_threadsafe(
+            self.put, chat_id, text, parse_mode, callback
+        )
+
+    def put(self, chat_id, text, parse_mode=None, callback=None):
+        """Постановка сообщения в очередь из потока event loop."""
+        key = (chat_id, parse_mode)
+        texts = self._pending.setdefault(key, [])
+        texts.append(text)
+        self._depth += 1
+        if callback is not None:
+            self._callbacks.setdefault(key, []).append(callback)
+        if len(texts) == 1:
+            self._loop.call_later(
+                self.coalesce_window, self._ready.put_nowait, key
+            )
+
+    def _bucket(self, chat_id):
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            bucket = self._chats[chat_id] = TokenBucket(self.chat_rate, 1)
+        return bucket
+
+    async def _deliver(self, key):
+        chat_id, parse_mode = key
+        if chat_id in self._inflight:
+            self._loop.call_later(
+                self.coalesce_window, self._ready.put_nowait, key
+            )
+            return
+        texts = self._pending.pop(key, None)
+        callbacks = self._callbacks.pop(key, ())
+        if not texts:
+            return
+        self._depth -= len(texts)
+        self._inflight.add(chat_id)
+        delivered = False
+        try:
+            delivered = await self._deliver_parts(
+                chat_id, coalesce(texts), parse_mode
+            )
+        finally:
+            self._inflight.discard(chat_id)
+            for callback in callbacks:
+                callback(delivered)
+
+    async def _deliver_parts(self, chat_id, parts, parse_mode=None):
+        """Отправка частей по порядку; истина, если дошли все."""
+        delivered = True
+        while parts:
+            await self._bucket(chat_id).acquire()
+            await self._global.acquire()
+            try:
+                await self._loop.run_in_executor(
+                    self._executor, self._send, chat_id, parts[0],
+                    parse_mode,
+                )
+            except telegram.error.RetryAfter as error:
+                logger.warning(
+                    f'Telegram просит подождать {error.retry_after} с '
+                    f'перед отправкой в чат {chat_id}'
+                )
+                self._global.pause(error.retry_after)
+                self._bucket(chat_id).pause(error.retry_after)
+                continue
+            except telegram.error.TelegramError as error:
+                logger.error(
+                    f'Ошибка {error} при отправке сообщения в чат {chat_id}'
+                )
+                delivered = False
+            else:
+                self.sent += 1
+                logger.info('Сообщение успешно отправлено')
+            parts.pop(0)
+        return delivered
+
+    def _send(self, chat_id, text, parse_mode=None):
+        kwargs = {} if parse_mode is None else {'parse_mode': parse_mode}
+        with metrics.TELEGRAM_DELIVERY_SECONDS.time():
+            self.bot.send_message(chat_id=chat_id, text=text, **kwargs)
+
+    async def _worker(self):
+        while True:
+            key = await self._ready.get()
+            try:
+                await self._deliver(key)
+            except Exception as error:
+                logger.error(f'Сбой при отправке сообщений: {error}')
+            finally:
+                self._ready.task_done()
+
+    async def run(self):
+        """Запуск обработчиков очереди в текущем event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._ready = asyncio.Queue()
+        try:
+            await asyncio.gather(*(
+                self._worker() for _ in range(self.workers)
+            ))
+        finally:
+            self._executor.shutdown(wait=False)
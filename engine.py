@@ -0,0 +1,209 @@
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import telegram
+from telegram.utils.request import Request
+
+import backfill
+import cassette
+import checkpoints
+import dedup
+import delivery
+import fingerprint
+import history
+import homework
+import ingest
+import metrics
+import outbox
+import scheduler
+import settings  # noqa: F401
+import supervisor
+import tenants
+import transport
+
+logger = logging.getLogger(__name__)
+
+TENANTS_FILE = os.getenv('TENANTS_FILE', 'tenants.json')
+MAX_CONCURRENCY = int(os.getenv('MAX_CONCURRENCY', 64))
+
+
+class PollingEngine:
+    """Конкурентный опрос API для множества арендаторов в одном процессе.
+
+    Каждый арендатор проходит тот же конвейер, что и в `homework.main()`:
+    `fetch_statuses` -> `check_response` -> `parse_status` ->
+    `send_chat_message`. Блокирующие вызовы выполняются в пуле потоков,
+    число одновременных циклов ограничено семафором, а время следующего
+    опроса каждого арендатора выбирает `PollScheduler`. Арендатор,
+    разбуженный во время собственного опроса, опрашивается повторно
+    сразу после него, а не параллельно.
+    """
+
+    def __init__(self, bot, tenant_list, concurrency=MAX_CONCURRENCY,
+                 retry_time=homework.RETRY_TIME, poll_scheduler=None):
+        self.bot = bot
+        self.tenants = tenant_list
+        self.concurrency = concurrency
+        self.retry_time = retry_time
+        if poll_scheduler is None:
+            poll_scheduler = scheduler.PollScheduler()
+        self.scheduler = poll_scheduler
+        self.executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix='poll'
+        )
+        self._semaphore = None
+        self._tasks = set()
+        self._active = set()
+        self._rewake = set()
+
+    @property
+    def semaphore(self):
+        """Семафор, ограничивающий число одновременных циклов."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    async def _cycle(self, tenant):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            self.executor, homework.run_cycle, self.bot, tenant
+        )
+
+    async def poll(self, tenant):
+        """Один цикл опроса арендатора в пуле потоков."""
+        async with self.semaphore:
+            await self._cycle(tenant)
+
+    async def _poll_due(self, tenant):
+        self._active.add(tenant.name)
+        try:
+            await self._cycle(tenant)
+        finally:
+            self._active.discard(tenant.name)
+            self.semaphore.release()
+            if tenant.name in self._rewake:
+                self._rewake.discard(tenant.name)
+                self.scheduler.wake(tenant)
+            self.scheduler.reschedule(tenant)
+
+    async def run(self):
+        """Запуск опроса всех арендаторов.
+
+        Первые запросы равномерно распределяются по RETRY_TIME, чтобы
+        не отправлять их к API одной пачкой. Очередной арендатор берётся
+        из расписания только когда освободился слот для опроса.
+        """
+        step = self.retry_time / max(len(self.tenants), 1)
+        now = time.monotonic()
+        for index, tenant in enumerate(self.tenants):
+            self.scheduler.schedule(tenant, now + index * step)
+        try:
+            while True:
+                await self.semaphore.acquire()
+                tenant = await self.scheduler.next_due()
+                metrics.SCHEDULER_LAG_SECONDS.set(self.scheduler.lag)
+                if tenant.name in self._active:
+                    self._rewake.add(tenant.name)
+                    self.semaphore.release()
+                    continue
+                task = asyncio.create_task(self._poll_due(tenant))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        finally:
+            self.executor.shutdown(wait=False)
+
+
+async def redeliver(queue, interval=outbox.OUTBOX_RETRY_INTERVAL):
+    """Периодическая повторная отправка сообщений из outbox."""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(interval)
+        await loop.run_in_executor(None, homework.redeliver, queue)
+
+
+async def serve(bot, tenant_list):
+    """Совместный запуск опроса API, очереди отправки и повторов outbox."""
+    queue = delivery.MessageQueue(bot)
+    metrics.QUEUE_DEPTH.set_function(lambda: queue.depth)
+    polling = PollingEngine(queue, tenant_list)
+    httpd = ingest.start_http_server(ingest.SchedulerWaker(
+        polling.scheduler, tenant_list, asyncio.get_running_loop()
+    ))
+    try:
+        await asyncio.gather(queue.run(), polling.run(), redeliver(queue))
+    finally:
+        if httpd is not None:
+            httpd.shutdown()
+
+
+def start(tenant_list, run_backfill=False):
+    """Загрузка отметок арендаторов и запуск опроса до остановки."""
+    homework.start_metrics_server()
+    homework.TRANSPORT = cassette.recording(
+        transport.Transport(pool_size=MAX_CONCURRENCY)
+    )
+    if run_backfill:
+        backfill.run_backfill(tenant_list)
+    now = int(time.time())
+    for tenant in tenant_list:
+        if tenant.current_timestamp is None:
+            tenant.current_timestamp = homework.CHECKPOINTS.load(
+                tenant.name, now
+            )
+    bot = telegram.Bot(
+        token=homework.TELEGRAM_TOKEN,
+        request=Request(con_pool_size=MAX_CONCURRENCY),
+    )
+    logger.info(f'Запуск опроса для {len(tenant_list)} арендаторов')
+    asyncio.run(serve(bot, tenant_list))
+
+
+def main(argv=None):
+    """Запуск бота для арендаторов из TENANTS_FILE или их шарда."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--shard', type=int, default=0)
+    parser.add_argument('--shards', type=int, default=1)
+    parser.add_argument(
+        '--backfill', action='store_true',
+        help='загрузить историю арендаторов без сохранённой отметки',
+    )
+    args = parser.parse_args(argv)
+    if not homework.TELEGRAM_TOKEN:
+        sys.exit('Ошибка в получении токенов')
+    homework.load_json_backend()
+    tenant_list = tenants.load_tenants(TENANTS_FILE)
+    if args.shards > 1:
+        tenant_list = supervisor.shard_tenants(
+            tenant_list, args.shard, args.shards
+        )
+    homework.MESSAGES = homework.load_messages()
+    homework.SUBSCRIPTIONS = homework.load_subscribers()
+    homework.OUTBOX = homework.load_outbox(
+        [tenant.name for tenant in tenant_list]
+    )
+    homework.CHECKPOINTS = checkpoints.CheckpointStore(
+        before_flush=homework.flush_journals
+    )
+    homework.DELIVERED = dedup.DeliveredIndex(
+        dedup.DEDUP_DB, before_flush=homework.OUTBOX.flush
+    )
+    homework.FINGERPRINTS = fingerprint.FingerprintCache()
+    homework.HISTORY = history.HistoryStore()
+    homework.exit_on_sigterm()
+    try:
+        start(tenant_list, args.backfill)
+    finally:
+        homework.CHECKPOINTS.close()
+        homework.OUTBOX.close()
+        homework.DELIVERED.close()
+        homework.HISTORY.close()
+
+
+if __name__ == '__main__':
+    homework.configure_logging()
+    main()
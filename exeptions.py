@@ -2,9 +2,37 @@ class GetApiAnswerError(Exception):
     pass
 
 
+class ApiUnavailableError(GetApiAnswerError):
+    pass
+
+
 class CheckResponseError(Exception):
     pass
 
 
 class SendMessageError(Exception):
     pass
+
+
+class TenantsConfigError(Exception):
+    pass
+
+
+class MessageCatalogError(Exception):
+    pass
+
+
+class SubscriptionsConfigError(Exception):
+    pass
+
+
+class CassetteError(Exception):
+    pass
+
+
+class CassetteExhausted(CassetteError):
+    pass
+
+
+class JsonBackendError(Exception):
+    pass
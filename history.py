@@ -0,0 +1,295 @@
+"""История статусов работ и запросы к ней из командной строки.
+
+Примеры (из корня репозитория):
+
+    python history.py latest hw_python_oop
+    python history.py timeline hw_python_oop --tenant default
+    python history.py reviews --since 2026-10-01 --percentiles 50 90 99
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+import checkpoints
+import settings  # noqa: F401
+
+HISTORY_DB = os.getenv('HISTORY_DB', checkpoints.CHECKPOINT_DB)
+HISTORY_FLUSH_EVERY = int(os.getenv('HISTORY_FLUSH_EVERY', 500))
+HISTORY_FLUSH_INTERVAL = float(os.getenv('HISTORY_FLUSH_INTERVAL', 5))
+REVIEWING = 'reviewing'
+
+
+def timestamp(date_updated, default=None):
+    """Секунды Unix из `date_updated` API в формате ISO 8601."""
+    if not date_updated:
+        return default
+    try:
+        moment = datetime.fromisoformat(date_updated.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return default
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp())
+
+
+def percentile(ordered, share):
+    """Перцентиль упорядоченного списка по ближайшему рангу."""
+    index = min(int(round(share * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+class HistoryStore:
+    """Журнал всех статусов работ из ответов API.
+
+    Строки `history` хранятся в порядке первичного ключа
+    (арендатор, работа, date_updated, статус), поэтому последний статус
+    и история работы читаются по индексу без сканирования таблицы.
+    Для каждой завершённой проверки при записи сохраняется строка
+    `reviews` с началом и концом проверки: перцентили времени проверки
+    за период читают только покрывающий индекс по дате окончания.
+    Повторы статусов из ответов API отбрасываются при вставке. Записи
+    копятся в памяти и пишутся одной транзакцией, как отметки опроса:
+    каждые `flush_every` записей, фоновым таймером не позже чем через
+    `flush_interval` секунд и перед записью отметок опроса.
+    """
+
+    def __init__(self, path=HISTORY_DB, flush_every=HISTORY_FLUSH_EVERY,
+                 flush_interval=HISTORY_FLUSH_INTERVAL):
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._pending = {}
+        self._flushed_at = time.monotonic()
+        self._timer = None
+        self._lock = threading.Lock()
+        self._conn = checkpoints.connect(path)
+        self._conn.executescript(
+            'CREATE TABLE IF NOT EXISTS history ('
+            ' tenant TEXT NOT NULL,'
+            ' homework TEXT NOT NULL,'
+            ' date_updated INTEGER NOT NULL,'
+            ' status TEXT NOT NULL,'
+            ' seen_at REAL NOT NULL,'
+            ' PRIMARY KEY (tenant, homework, date_updated, status)'
+            ') WITHOUT ROWID;'
+            'CREATE TABLE IF NOT EXISTS reviews ('
+            ' tenant TEXT NOT NULL,'
+            ' homework TEXT NOT NULL,'
+            ' finished INTEGER NOT NULL,'
+            ' started INTEGER NOT NULL,'
+            ' verdict TEXT NOT NULL,'
+            ' PRIMARY KEY (tenant, homework, finished)'
+            ') WITHOUT ROWID;'
+            'CREATE INDEX IF NOT EXISTS reviews_by_finished '
+            'ON reviews (finished, started);'
+            'CREATE INDEX IF NOT EXISTS reviews_by_tenant '
+            'ON reviews (tenant, finished, started);'
+        )
+
+    def add(self, tenant_name, record):
+        """Запись статуса работы из ответа API."""
+        seen_at = time.time()
+        row = (
+            tenant_name, str(record.name),
+            timestamp(record.date_updated, int(seen_at)),
+            str(record.status),
+        )
+        with self._lock:
+            self._pending.setdefault(row, seen_at)
+            if (
+                len(self._pending) >= self.flush_every
+                or time.monotonic() - self._flushed_at >= self.flush_interval
+            ):
+                self._flush()
+            elif self._timer is None:
+                self._timer = checkpoints.start_timer(
+                    self.flush_interval, self.flush
+                )
+
+    def flush(self):
+        """Запись накопленных статусов на диск."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._flushed_at = time.monotonic()
+        if not self._pending:
+            return
+        rows = [(*row, seen_at) for row, seen_at in self._pending.items()]
+        touched = {(tenant, homework) for tenant, homework, *_ in rows}
+        self._conn.execute('BEGIN')
+        try:
+            inserted = self._conn.total_changes
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO history '
+                '(tenant, homework, date_updated, status, seen_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                rows,
+            )
+            if self._conn.total_changes != inserted:
+                for tenant, homework in touched:
+                    self._rebuild_reviews(tenant, homework)
+        except sqlite3.Error:
+            self._conn.execute('ROLLBACK')
+            raise
+        self._conn.execute('COMMIT')
+        self._pending.clear()
+
+    def _rebuild_reviews(self, tenant, homework):
+        """Пересчёт проверок работы по её истории.
+
+        Проверка начинается с первого `reviewing` после предыдущего
+        вердикта и заканчивается следующим вердиктом. Истории одной
+        работы — единицы строк, поэтому пересчёт дешевле поиска места
+        для статуса, пришедшего не по порядку.
+        """
+        reviews = []
+        started = None
+        for date_updated, status in self._conn.execute(
+            'SELECT date_updated, status FROM history '
+            'WHERE tenant = ? AND homework = ? ORDER BY date_updated',
+            (tenant, homework),
+        ):
+            if status == REVIEWING:
+                if started is None:
+                    started = date_updated
+            elif started is not None:
+                reviews.append(
+                    (tenant, homework, date_updated, started, status)
+                )
+                started = None
+        self._conn.execute(
+            'DELETE FROM reviews WHERE tenant = ? AND homework = ?',
+            (tenant, homework),
+        )
+        self._conn.executemany(
+            'INSERT OR REPLACE INTO reviews '
+            '(tenant, homework, finished, started, verdict) '
+            'VALUES (?, ?, ?, ?, ?)',
+            reviews,
+        )
+
+    def latest(self, tenant, homework):
+        """Последний статус работы: (статус, date_updated) или None."""
+        self.flush()
+        return self._conn.execute(
+            'SELECT status, date_updated FROM history '
+            'WHERE tenant = ? AND homework = ? '
+            'ORDER BY date_updated DESC LIMIT 1',
+            (tenant, homework),
+        ).fetchone()
+
+    def timeline(self, tenant, homework):
+        """Все статусы работы по времени: [(date_updated, статус)]."""
+        self.flush()
+        return self._conn.execute(
+            'SELECT date_updated, status FROM history '
+            'WHERE tenant = ? AND homework = ? ORDER BY date_updated',
+            (tenant, homework),
+        ).fetchall()
+
+    def review_durations(self, since=0, until=None, tenant=None):
+        """Длительности проверок, законченных в [since, until), по порядку."""
+        self.flush()
+        until = 2 ** 62 if until is None else until
+        if tenant is None:
+            cursor = self._conn.execute(
+                'SELECT finished - started FROM reviews '
+                'INDEXED BY reviews_by_finished '
+                'WHERE finished >= ? AND finished < ?',
+                (since, until),
+            )
+        else:
+            cursor = self._conn.execute(
+                'SELECT finished - started FROM reviews '
+                'INDEXED BY reviews_by_tenant '
+                'WHERE tenant = ? AND finished >= ? AND finished < ?',
+                (tenant, since, until),
+            )
+        return sorted(duration for duration, in cursor)
+
+    def close(self):
+        """Сброс накопленных статусов и закрытие базы."""
+        with self._lock:
+            self._flush()
+            self._conn.close()
+
+
+def parse_date(value):
+    """Дата из аргумента командной строки: ГГГГ-ММ-ДД или ISO 8601."""
+    moment = timestamp(value)
+    if moment is None:
+        raise argparse.ArgumentTypeError(f'Неверная дата {value}')
+    return moment
+
+
+def format_date(value):
+    """Дата из секунд Unix для вывода."""
+    return datetime.fromtimestamp(value, timezone.utc).strftime(
+        '%Y-%m-%d %H:%M:%S'
+    )
+
+
+def format_duration(seconds):
+    """Длительность в часах и минутах."""
+    hours, minutes = divmod(int(seconds) // 60, 60)
+    return f'{hours} ч {minutes:02d} мин'
+
+
+def main(argv=None):
+    """Запросы к истории статусов из командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default=HISTORY_DB)
+    commands = parser.add_subparsers(dest='command', required=True)
+    for name in ('latest', 'timeline'):
+        command = commands.add_parser(name)
+        command.add_argument('homework')
+        command.add_argument('--tenant', default='default')
+    reviews = commands.add_parser('reviews')
+    reviews.add_argument('--tenant')
+    reviews.add_argument('--since', type=parse_date, default=0)
+    reviews.add_argument('--until', type=parse_date)
+    reviews.add_argument(
+        '--percentiles', type=float, nargs='+', default=[50, 90, 99]
+    )
+    args = parser.parse_args(argv)
+    store = HistoryStore(args.db)
+    try:
+        if args.command == 'latest':
+            row = store.latest(args.tenant, args.homework)
+            if row is None:
+                print(f'Работа {args.homework} не найдена')
+                return 1
+            status, date_updated = row
+            print(f'{args.homework}: {status} ({format_date(date_updated)})')
+        elif args.command == 'timeline':
+            rows = store.timeline(args.tenant, args.homework)
+            if not rows:
+                print(f'Работа {args.homework} не найдена')
+                return 1
+            for date_updated, status in rows:
+                print(f'{format_date(date_updated)} {status}')
+        else:
+            durations = store.review_durations(
+                args.since, args.until, args.tenant
+            )
+            print(f'Проверок: {len(durations)}')
+            for share in args.percentiles:
+                if durations:
+                    value = format_duration(
+                        percentile(durations, share / 100)
+                    )
+                    print(f'p{share:g}: {value}')
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,16 +1,30 @@
 import logging
 import os
+import signal
 import sys
 import time
 from http import HTTPStatus
 
-import requests
-import telegram
-from dotenv import load_dotenv
-
+import cassette
+import checkpoints
+import circuit
+import dedup
 import exeptions
+import fingerprint
+import history
+import jsonbackend
+import logpipeline
+import messages
+import metrics
+import outbox
+import records
+import scheduler
+import settings  # noqa: F401
+import streaming
+import subscriptions
+import tenants
+import transport
 
-load_dotenv()
 logger = logging.getLogger(__name__)
 
 PRACTICUM_TOKEN = os.getenv('PRACTICUM_TOKEN')
@@ -20,6 +34,14 @@ TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
 RETRY_TIME = 600
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
+TRANSPORT = transport.Transport()
+BREAKER = circuit.CircuitBreaker()
+CHECKPOINTS = None
+FINGERPRINTS = None
+DELIVERED = None
+SUBSCRIPTIONS = None
+OUTBOX = None
+HISTORY = None
 
 
 HOMEWORK_VERDICT = {
@@ -27,12 +49,40 @@ HOMEWORK_VERDICT = {
     'reviewing': 'Работа взята на проверку ревьюером.',
     'rejected': 'Работа проверена: у ревьюера есть замечания.'
 }
+RECOVERED_MESSAGE = 'Работа бота восстановлена.'
+MESSAGE_LOCALES = {
+    **messages.BUILTIN_LOCALES,
+    'ru': {
+        messages.TEXT:
+            'Изменился статус проверки работы "{homework_name}". {verdict}',
+        messages.MARKDOWN:
+            'Изменился статус проверки работы *{homework_name}*\\. '
+            '{verdict}',
+        messages.HTML:
+            'Изменился статус проверки работы <b>{homework_name}</b>. '
+            '{verdict}',
+        'verdicts': HOMEWORK_VERDICT,
+    },
+}
+MESSAGES = messages.MessageCatalog(MESSAGE_LOCALES)
+
+HomeworkStatus = records.status_enum(HOMEWORK_VERDICT, module=__name__)
+homework_record = records.compile_validator(HomeworkStatus)
 
 
 def send_message(bot, message):
     """Отправка сообщения в Telegram чат."""
+    send_chat_message(bot, TELEGRAM_CHAT_ID, message)
+
+
+def send_chat_message(bot, chat_id, message, parse_mode=None):
+    """Отправка сообщения в указанный Telegram чат."""
+    import telegram
+
+    kwargs = {} if parse_mode is None else {'parse_mode': parse_mode}
     try:
-        bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=message)
+        with metrics.SEND_MESSAGE_SECONDS.time():
+            bot.send_message(chat_id=chat_id, text=message, **kwargs)
     except telegram.error.TelegramError as error:
         raise exeptions.SendMessageError(
             f'Ошибка {error} при отправке сообщения {message}'
@@ -43,21 +93,78 @@ def send_message(bot, message):
 
 def get_api_answer(current_timestamp):
     """Отправка запроса к API."""
+    return fetch_statuses(HEADERS, current_timestamp)
+
+
+def fetch_statuses(headers, current_timestamp):
+    """Отправка запроса к API с заголовками арендатора."""
+    import requests
+
+    metrics.observe_first_request()
     params = {'from_date': current_timestamp}
+    if FINGERPRINTS is not None:
+        headers = {
+            **headers,
+            **FINGERPRINTS.conditional_headers(headers['Authorization']),
+        }
+    stream = streaming.STREAM_RESPONSES
     try:
-        response = requests.get(
-            ENDPOINT, headers=HEADERS, params=params,
-        )
+        with metrics.API_REQUEST_SECONDS.time():
+            response = TRANSPORT.get(
+                ENDPOINT, headers=headers, params=params,
+                **({'stream': True} if stream else {}),
+            )
+        if FINGERPRINTS is not None and not stream:
+            answer = unchanged_answer(headers, response, current_timestamp)
+            if answer is not None:
+                return answer
         if response.status_code != HTTPStatus.OK:
-            raise exeptions.GetApiAnswerError('Сбой при запросе к API')
-        return response.json()
-    except requests.exceptions.JSONDecodeError:
+            response.close()
+            raise api_error(response.status_code)
+        if stream:
+            return streaming.stream_answer(response, check_response)
+        return jsonbackend.decode(response)
+    except ValueError:
         raise exeptions.GetApiAnswerError(
             'Ошибка при запросе к API. Проверьте,'
             ' что ответ приходит в формате JSON'
         )
     except requests.RequestException:
-        raise exeptions.GetApiAnswerError('Ошибка при запросе к API')
+        raise exeptions.ApiUnavailableError('Ошибка при запросе к API')
+
+
+def api_error(status_code):
+    """Исключение для ответа API с кодом, отличным от 200.
+
+    5xx и 429 означают сбой самого API; остальные коды — ошибка запроса
+    арендатора (например, отозванный токен), и предохранитель их не
+    учитывает.
+    """
+    if (
+            status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+            or status_code == HTTPStatus.TOO_MANY_REQUESTS
+    ):
+        return exeptions.ApiUnavailableError('Сбой при запросе к API')
+    return exeptions.GetApiAnswerError('Сбой при запросе к API')
+
+
+def unchanged_answer(headers, response, current_timestamp):
+    """Ответ без новых работ, если тело можно не разбирать.
+
+    Для 304 Not Modified и для тела, совпадающего с предыдущим (без
+    учёта `current_date`), возвращается пустой список работ: всё из
+    него уже было обработано в прошлом цикле.
+    """
+    if response.status_code == HTTPStatus.NOT_MODIFIED:
+        current_date = current_timestamp
+    elif response.status_code == HTTPStatus.OK:
+        current_date = FINGERPRINTS.check(headers['Authorization'], response)
+    else:
+        return None
+    if current_date is None:
+        return None
+    metrics.UNCHANGED_RESPONSES.inc()
+    return {'homeworks': [], 'current_date': current_date}
 
 
 def check_response(response):
@@ -67,7 +174,7 @@ def check_response(response):
             f'Неверный тип данных. Type "homework_response":'
             f'{type(response)}. Ожидаемый тип dict'
         )
-    if 'homeworks' not in response.keys():
+    if 'homeworks' not in response:
         raise KeyError(
             'Ошибка словаря по ключу homeworks'
         )
@@ -77,7 +184,7 @@ def check_response(response):
             f'Неверный тип данных. Type "homework_response":'
             f'{type(homework_response)}. Ожидаемый тип list'
         )
-    if 'current_date' not in response.keys():
+    if 'current_date' not in response:
         raise exeptions.CheckResponseError(
             '"current_date" отсутствует в словаре'
         )
@@ -91,16 +198,24 @@ def check_response(response):
 
 def parse_status(homework):
     """Извлечение статуса из домашней работы."""
-    if 'status' not in homework.keys():
-        raise KeyError('В словаре homeworks отсутствует ключ "status"')
-    if 'homework_name' not in homework.keys():
-        raise KeyError('В словаре homeworks отсутствует ключ "homework_name"')
-    homework_status = homework.get('status')
-    homework_name = homework.get('homework_name')
-    if homework_status not in HOMEWORK_VERDICT:
-        raise KeyError(f'Статус {homework_status} не существует')
-    verdict = HOMEWORK_VERDICT[homework_status]
-    return f'Изменился статус проверки работы "{homework_name}". {verdict}'
+    return render_status(homework_record(homework))
+
+
+def render_status(record, locale=None, message_format=messages.TEXT):
+    """Сообщение об изменении статуса по записи о работе."""
+    return MESSAGES.render(locale, message_format, record.name, record.status)
+
+
+def load_messages():
+    """Каталог сообщений с языками из MESSAGES_FILE, если он задан.
+
+    Каждый язык проверяется на вердикты для всех статусов
+    HOMEWORK_VERDICT, поэтому пропуск обнаруживается при запуске.
+    """
+    locales = MESSAGE_LOCALES
+    if messages.MESSAGES_FILE:
+        locales = messages.load_locales(messages.MESSAGES_FILE, locales)
+    return messages.MessageCatalog(locales, statuses=HOMEWORK_VERDICT)
 
 
 def check_tokens():
@@ -108,47 +223,324 @@ def check_tokens():
     return all([PRACTICUM_TOKEN, TELEGRAM_TOKEN, TELEGRAM_CHAT_ID])
 
 
-def main():
-    """Основная логика работы бота."""
-    bot = telegram.Bot(token=TELEGRAM_TOKEN)
-    current_timestamp = int(time.time())
+def load_json_backend():
+    """Выбор декодера JSON при запуске; неверный JSON_BACKEND — выход."""
+    try:
+        return jsonbackend.backend()
+    except exeptions.JsonBackendError as error:
+        sys.exit(str(error))
 
-    if not check_tokens():
-        sys.exit('Ошибка в получении токенов')
 
-    while True:
+def poll_tenant(bot, tenant):
+    """Один цикл опроса API и отправки уведомлений арендатору.
+
+    Предохранитель размыкают только сбои самого API; ответ с ошибкой
+    арендатора (4xx) показывает, что API доступен.
+    """
+    try:
+        response = fetch_statuses(tenant.headers, tenant.current_timestamp)
+    except exeptions.ApiUnavailableError:
+        BREAKER.record_failure()
+        raise
+    except exeptions.GetApiAnswerError:
+        BREAKER.record_success()
+        raise
+    BREAKER.record_success()
+    try:
+        process_answer(bot, tenant, response)
+    except Exception:
+        if FINGERPRINTS is not None:
+            FINGERPRINTS.forget(tenant.headers['Authorization'])
+        raise
+
+
+def process_answer(bot, tenant, response):
+    """Проверка ответа API и отправка уведомлений о новых статусах."""
+    if isinstance(response, streaming.StreamedAnswer):
+        process_stream(bot, tenant, response)
+        return
+    homeworks = check_response(response)
+    metrics.HOMEWORKS_PER_CYCLE.observe(len(homeworks))
+    tenant.current_timestamp = response.get('current_date')
+    tenant.observe(homeworks)
+    for homework in homeworks:
+        process_homework(bot, tenant, homework)
+    if CHECKPOINTS is not None:
+        CHECKPOINTS.save(tenant.name, tenant.current_timestamp)
+
+
+def process_stream(bot, tenant, answer):
+    """Уведомления по работам потокового ответа по мере их разбора.
+
+    Отметка арендатора сдвигается только после того, как ответ
+    дочитан и прошёл проверки `check_response`.
+    """
+    import requests
+
+    try:
+        for homework in answer:
+            if answer.count == 1:
+                tenant.observe([homework])
+            process_homework(bot, tenant, homework)
+        current_date = answer.finish()
+    except (ValueError, requests.RequestException) as error:
+        raise exeptions.GetApiAnswerError(
+            f'Ошибка при чтении ответа API: {error}'
+        )
+    finally:
+        answer.close()
+    metrics.HOMEWORKS_PER_CYCLE.observe(answer.count)
+    tenant.current_timestamp = current_date
+    if CHECKPOINTS is not None:
+        CHECKPOINTS.save(tenant.name, tenant.current_timestamp)
+
+
+def process_homework(bot, tenant, homework):
+    """Запись статуса работы и уведомление, если оно ещё не отправлялось."""
+    record = homework_record(homework)
+    if HISTORY is not None:
+        HISTORY.add(tenant.name, record)
+    key = dedup.delivery_key(tenant.name, record)
+    if DELIVERED is not None and DELIVERED.seen(key):
+        logger.debug(f'Повторное уведомление пропущено: {record}')
+        return
+    message = render_status(record, tenant.locale, tenant.message_format)
+    notify(bot, tenant, record, message)
+    if DELIVERED is not None:
+        DELIVERED.add(key)
+
+
+def notify(bot, tenant, record, message):
+    """Отправка готового уведомления в чат арендатора и подписчикам.
+
+    Если включён outbox, уведомление сначала записывается в него, а
+    неудачная отправка не прерывает цикл: сообщение будет отправлено
+    повторно из `redeliver`.
+    """
+    parse_mode = messages.PARSE_MODES[tenant.message_format]
+    if SUBSCRIPTIONS is None:
+        chats = (tenant.chat_id,)
+    else:
+        chats = SUBSCRIPTIONS.chats_for(tenant, record)
+    if OUTBOX is not None:
+        entries = [
+            OUTBOX.put(tenant.name, chat_id, message, parse_mode)
+            for chat_id in chats
+        ]
+        failures = subscriptions.broadcast(
+            lambda entry: deliver(bot, entry),
+            [entry for entry in entries if entry.claimed],
+        )
+        for entry, error in failures:
+            metrics.ERRORS.inc(type=type(error).__name__)
+            logger.error(
+                f'Сообщение в чат {entry.chat_id} отложено до повтора: {error}'
+            )
+        return
+    if SUBSCRIPTIONS is None:
+        send_chat_message(bot, tenant.chat_id, message, parse_mode)
+        return
+    failures = subscriptions.broadcast(
+        lambda chat_id: send_chat_message(bot, chat_id, message, parse_mode),
+        chats,
+    )
+    if failures:
+        chats = ', '.join(str(chat_id) for chat_id, _ in failures)
+        raise exeptions.SendMessageError(
+            f'Сообщение не доставлено в чаты {chats}: {failures[0][1]}'
+        )
+
+
+def deliver(bot, entry):
+    """Отправка сообщения из outbox с подтверждением или переносом на повтор.
+
+    Очередь `delivery.MessageQueue` подтверждает сообщение сама после
+    фактической отправки, обычный бот — сразу после `send_message`.
+    """
+    send_tracked = getattr(bot, 'send_tracked', None)
+    if send_tracked is not None:
+        send_tracked(
+            entry.chat_id, entry.text, entry.parse_mode,
+            lambda delivered: OUTBOX.settle(entry, delivered),
+        )
+        return
+    try:
+        send_chat_message(bot, entry.chat_id, entry.text, entry.parse_mode)
+    except exeptions.SendMessageError:
+        OUTBOX.settle(entry, False)
+        raise
+    OUTBOX.settle(entry, True)
+
+
+def redeliver(bot):
+    """Повторная отправка сообщений из outbox, чей срок подошёл.
+
+    Сообщения чата отправляются по порядку; после первой неудачи
+    остальные сообщения этого чата ждут следующей попытки.
+    """
+    if OUTBOX is None:
+        return
+    for entries in OUTBOX.due():
+        for index, entry in enumerate(entries):
+            metrics.OUTBOX_REDELIVERIES.inc()
+            try:
+                deliver(bot, entry)
+            except exeptions.SendMessageError as error:
+                logger.error(f'Повторная отправка не удалась: {error}')
+                for rest in entries[index + 1:]:
+                    OUTBOX.release(rest)
+                break
+
+
+def load_outbox(tenant_names=None):
+    """Outbox в OUTBOX_DB с сообщениями указанных арендаторов."""
+    return outbox.Outbox(outbox.OUTBOX_DB, tenant_names)
+
+
+def flush_journals():
+    """Запись outbox, доставленных ключей и истории перед отметками."""
+    for store in (OUTBOX, DELIVERED, HISTORY):
+        if store is not None:
+            store.flush()
+
+
+def load_subscribers():
+    """Подписки из SUBSCRIPTIONS_FILE, если он задан."""
+    if not subscriptions.SUBSCRIPTIONS_FILE:
+        return None
+    return subscriptions.load_subscriptions(subscriptions.SUBSCRIPTIONS_FILE)
+
+
+def report_error(bot, tenant, error):
+    """Логирование сбоя и уведомление о нём в чат арендатора."""
+    metrics.ERRORS.inc(type=type(error).__name__)
+    if isinstance(
+            error, (exeptions.SendMessageError, exeptions.CheckResponseError)
+    ):
+        logger.error(f'Сбой в работе программы: {error}')
+        return
+    logger.error(f'Критический сбой в работе программы: {error}')
+    if not tenant.alerts.should_alert(error):
+        return
+    try:
+        send_chat_message(bot, tenant.chat_id, str(error))
+    except exeptions.SendMessageError:
+        logger.error(f'Сбой при отправке сообщения: {error}')
+
+
+def run_cycle(bot, tenant):
+    """Цикл опроса арендатора с обработкой сбоев.
+
+    Пока предохранитель API разомкнут, запрос не выполняется. Об ошибке
+    каждого класса арендатор узнаёт один раз, а после первого успешного
+    цикла получает сообщение о восстановлении.
+    """
+    if not BREAKER.allow():
+        logger.debug(
+            f'API недоступен, опрос {tenant.name} пропущен ещё на '
+            f'{BREAKER.retry_after():.0f} с'
+        )
+        return
+    with logpipeline.cycle_context(tenant.name):
         try:
-            response = get_api_answer(current_timestamp)
-            homeworks = check_response(response)
-            current_timestamp = response.get('current_date')
-            for homework in homeworks:
-                message = parse_status(homework)
-                send_message(bot, message)
-        except (
-                exeptions.SendMessageError, exeptions.CheckResponseError
-        ) as error:
-            logger.error(f'Сбой в работе программы: {error}')
+            poll_tenant(bot, tenant)
         except Exception as error:
-            logger.error(f'Критический сбой в работе программы: {error}')
+            report_error(bot, tenant, error)
+            return
+        if tenant.alerts.recovered():
             try:
-                send_message(bot, str(error))
-            except exeptions.SendMessageError:
+                send_chat_message(bot, tenant.chat_id, RECOVERED_MESSAGE)
+            except exeptions.SendMessageError as error:
                 logger.error(f'Сбой при отправке сообщения: {error}')
-        finally:
-            time.sleep(RETRY_TIME)
 
 
-if __name__ == '__main__':
-    logging.basicConfig(
-        level=logging.INFO,
-        filename='homework_bot.log',
-        filemode='w'
+def start_metrics_server():
+    """Подключение вычисляемых метрик и запуск сервера METRICS_PORT."""
+    metrics.HTTP_OPEN_CONNECTIONS.set_function(
+        lambda: TRANSPORT.stats()['open_connections']
+    )
+    metrics.HTTP_REUSE_RATIO.set_function(
+        lambda: TRANSPORT.stats()['reuse_rate']
+    )
+    metrics.API_BREAKER_OPEN.set_function(
+        lambda: int(BREAKER.state != circuit.CLOSED)
+    )
+    if CHECKPOINTS is not None:
+        metrics.CHECKPOINT_AGE_SECONDS.set_function(CHECKPOINTS.age)
+        metrics.CHECKPOINT_CURRENT_DATE_AGE_SECONDS.set_function(
+            CHECKPOINTS.current_age
+        )
+    if OUTBOX is not None:
+        metrics.OUTBOX_DEPTH.set_function(lambda: len(OUTBOX))
+    return metrics.start_http_server()
+
+
+def exit_on_sigterm():
+    """Завершение по SIGTERM через блоки finally с записью состояния."""
+    def stop(signum, frame):
+        logger.info('Получен SIGTERM, завершение работы')
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+
+
+def configure_logging():
+    """Настройка логирования в файл и stdout через фоновую очередь."""
+    return logpipeline.configure()
+
+
+def main():
+    """Основная логика работы бота."""
+    global CHECKPOINTS, DELIVERED, FINGERPRINTS, MESSAGES, TRANSPORT
+    global HISTORY, OUTBOX, SUBSCRIPTIONS
+    if not check_tokens():
+        sys.exit('Ошибка в получении токенов')
+    load_json_backend()
+
+    import telegram
+
+    import ingest
+
+    bot = telegram.Bot(token=TELEGRAM_TOKEN)
+    MESSAGES = load_messages()
+    SUBSCRIPTIONS = load_subscribers()
+    TRANSPORT = cassette.recording(TRANSPORT)
+
+    OUTBOX = load_outbox(['default'])
+    CHECKPOINTS = checkpoints.CheckpointStore(before_flush=flush_journals)
+    FINGERPRINTS = fingerprint.FingerprintCache()
+    DELIVERED = dedup.DeliveredIndex(
+        dedup.DEDUP_DB, before_flush=OUTBOX.flush
     )
-    handler = logging.StreamHandler(sys.stdout)
-    formatter = logging.Formatter(
-        '%(asctime)s, %(levelname)s, %(message)s, %(name)s'
+    HISTORY = history.HistoryStore()
+    start_metrics_server()
+    current_timestamp = CHECKPOINTS.load('default', int(time.time()))
+    tenant = tenants.Tenant(
+        'default', PRACTICUM_TOKEN, TELEGRAM_CHAT_ID, current_timestamp
     )
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+    waker = ingest.EventWaker([tenant.name])
+    ingest.start_http_server(waker)
+    exit_on_sigterm()
+    try:
+        while True:
+            run_cycle(bot, tenant)
+            deadline = time.monotonic() + max(
+                scheduler.poll_interval(tenant), BREAKER.retry_after()
+            )
+            while True:
+                redeliver(bot)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or waker.sleep(
+                        min(remaining, outbox.OUTBOX_RETRY_INTERVAL)
+                ):
+                    break
+    finally:
+        CHECKPOINTS.close()
+        OUTBOX.close()
+        DELIVERED.close()
+        HISTORY.close()
+
 
+if __name__ == '__main__':
+    configure_logging()
     main()
@@ -0,0 +1,109 @@
+import hmac
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+import metrics
+import settings  # noqa: F401
+
+INGEST_PORT = int(os.getenv('INGEST_PORT', 0))
+INGEST_ADDR = os.getenv('INGEST_ADDR', '127.0.0.1')
+INGEST_SECRET = os.getenv('INGEST_SECRET')
+INGEST_DEBOUNCE = float(os.getenv('INGEST_DEBOUNCE', 0.5))
+WAKE_PREFIX = '/wake/'
+
+
+class SchedulerWaker:
+    """Внеочередной опрос арендатора через `PollScheduler.wake`.
+
+    Опрос назначается через `debounce` секунд после первого сигнала;
+    сигналы, пришедшие до него, не добавляют новых запросов к API.
+    """
+
+    def __init__(self, poll_scheduler, tenant_list, loop,
+                 debounce=INGEST_DEBOUNCE):
+        self.scheduler = poll_scheduler
+        self.tenants = {tenant.name: tenant for tenant in tenant_list}
+        self.loop = loop
+        self.debounce = debounce
+
+    def wake(self, name):
+        """Потокобезопасное пробуждение арендатора; False — неизвестен."""
+        tenant = self.tenants.get(name)
+        if tenant is None:
+            return False
+        self.loop.call_soon_threadsafe(
+            self.scheduler.wake, tenant, self.debounce
+        )
+        return True
+
+
+class EventWaker:
+    """Внеочередной опрос для цикла `homework.main` на `threading.Event`."""
+
+    def __init__(self, names, debounce=INGEST_DEBOUNCE):
+        self.names = frozenset(names)
+        self.debounce = debounce
+        self.event = threading.Event()
+
+    def wake(self, name):
+        """Прерывание паузы основного цикла; False — неизвестен."""
+        if name not in self.names:
+            return False
+        self.event.set()
+        return True
+
+    def sleep(self, timeout):
+        """Пауза до следующего опроса или до сигнала плюс `debounce`.
+
+        Возвращает True, если пауза прервана сигналом.
+        """
+        if self.event.wait(timeout):
+            time.sleep(self.debounce)
+            self.event.clear()
+            return True
+        return False
+
+
+class IngestHandler(BaseHTTPRequestHandler):
+    """Приём сигналов об изменениях по POST /wake/<арендатор>."""
+
+    secret = INGEST_SECRET
+
+    def _reply(self, status):
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_POST(self):
+        """Пробуждение арендатора из пути запроса."""
+        path = self.path.split('?', 1)[0]
+        if not path.startswith(WAKE_PREFIX):
+            self._reply(404)
+            return
+        if self.secret and not hmac.compare_digest(
+                self.headers.get('X-Ingest-Secret', ''), self.secret
+        ):
+            self._reply(403)
+            return
+        if self.server.waker.wake(unquote(path[len(WAKE_PREFIX):])):
+            metrics.INGEST_WAKEUPS.inc()
+            self._reply(202)
+        else:
+            self._reply(404)
+
+    def log_message(self, *args):
+        """Сигналы не пишутся в лог."""
+
+
+def start_http_server(waker, port=INGEST_PORT, addr=INGEST_ADDR):
+    """Запуск приёма сигналов в фоновом потоке; порт 0 — выключен."""
+    if not port:
+        return None
+    httpd = ThreadingHTTPServer((addr, port), IngestHandler)
+    httpd.daemon_threads = True
+    httpd.waker = waker
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
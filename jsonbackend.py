@@ -0,0 +1,101 @@
+import functools
+import os
+
+import exeptions
+import settings  # noqa: F401
+
+JSON_BACKEND = os.getenv('JSON_BACKEND', 'auto')
+AUTO_ORDER = ('orjson', 'msgspec', 'ujson', 'stdlib')
+
+
+class Backend:
+    """Декодер JSON: функция разбора байтов и её исключения."""
+
+    __slots__ = ('name', 'loads', 'errors')
+
+    def __init__(self, name, loads, errors):
+        self.name = name
+        self.loads = loads
+        self.errors = errors
+
+    def decode(self, response):
+        """Разбор тела ответа; ошибки разбора приводятся к ValueError."""
+        if self.loads is None:
+            return response.json()
+        try:
+            return self.loads(response.content)
+        except self.errors as error:
+            raise ValueError(f'{self.name}: {error}') from error
+
+    def __repr__(self):
+        return f'Backend({self.name!r})'
+
+
+def _stdlib():
+    # Разбор через response.json(): как раньше, с определением кодировки.
+    return Backend('stdlib', None, (ValueError,))
+
+
+def _orjson():
+    import orjson
+
+    return Backend('orjson', orjson.loads, (orjson.JSONDecodeError,))
+
+
+def _msgspec():
+    import msgspec
+
+    return Backend('msgspec', msgspec.json.decode, (msgspec.DecodeError,))
+
+
+def _ujson():
+    import ujson
+
+    return Backend('ujson', ujson.loads, (ValueError,))
+
+
+FACTORIES = {
+    'stdlib': _stdlib,
+    'orjson': _orjson,
+    'msgspec': _msgspec,
+    'ujson': _ujson,
+}
+
+
+def register(name, factory):
+    """Добавление декодера: `factory()` возвращает Backend или ImportError."""
+    FACTORIES[name] = factory
+
+
+def load_backend(name=JSON_BACKEND):
+    """Декодер по имени; `auto` — первый установленный из AUTO_ORDER."""
+    if name == 'auto':
+        for candidate in AUTO_ORDER:
+            try:
+                return FACTORIES[candidate]()
+            except ImportError:
+                continue
+    try:
+        factory = FACTORIES[name]
+    except KeyError:
+        raise exeptions.JsonBackendError(
+            f'Неизвестный декодер JSON {name}, допустимы '
+            f'{sorted(FACTORIES)} и auto'
+        )
+    try:
+        return factory()
+    except ImportError as error:
+        raise exeptions.JsonBackendError(
+            f'Декодер JSON {name} не установлен: {error}'
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def backend():
+    """Декодер из JSON_BACKEND, выбранный при запуске бота."""
+    return load_backend(JSON_BACKEND)
+
+
+def decode(response):
+    """Разбор тела ответа выбранным декодером."""
+    return backend().decode(response)
@@ -0,0 +1,188 @@
+import atexit
+import contextvars
+import itertools
+import json
+import logging
+import os
+import queue
+import sys
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from logging.handlers import (
+    QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler,
+)
+
+import settings  # noqa: F401
+
+LOG_FILE = os.getenv('LOG_FILE', 'homework_bot.log')
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+LOG_ROTATE = os.getenv('LOG_ROTATE', 'size')
+LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', 10 * 1024 * 1024))
+LOG_ROTATE_WHEN = os.getenv('LOG_ROTATE_WHEN', 'midnight')
+LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', 5))
+LOG_SAMPLE_WINDOW = float(os.getenv('LOG_SAMPLE_WINDOW', 60))
+LOG_SAMPLE_BURST = int(os.getenv('LOG_SAMPLE_BURST', 5))
+
+STREAM_FORMAT = '%(asctime)s, %(levelname)s, %(message)s, %(name)s'
+
+CYCLE = contextvars.ContextVar('cycle', default=(None, None))
+_cycle_ids = itertools.count(1)
+
+
+@contextmanager
+def cycle_context(tenant_name):
+    """Метки арендатора и номера цикла для записей лога внутри блока."""
+    token = CYCLE.set((tenant_name, next(_cycle_ids)))
+    try:
+        yield
+    finally:
+        CYCLE.reset(token)
+
+
+class ContextQueueHandler(QueueHandler):
+    """Постановка записи в очередь с метками текущего цикла опроса."""
+
+    def prepare(self, record):
+        """Запись с метками `tenant` и `cycle` для фонового обработчика."""
+        record.tenant, record.cycle = CYCLE.get()
+        return super().prepare(record)
+
+
+class JsonFormatter(logging.Formatter):
+    """Запись лога одной строкой JSON."""
+
+    def format(self, record):
+        """Строка JSON с временем, уровнем, сообщением и метками цикла."""
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for field in ('tenant', 'cycle', 'repeated'):
+            value = getattr(record, field, None)
+            if value is not None:
+                data[field] = value
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class ErrorSampler:
+    """Прореживание повторяющихся предупреждений и ошибок.
+
+    Одинаковая запись уровня WARNING и выше проходит не больше `burst`
+    раз за `window` секунд. Окна хранятся в порядке открытия и удаляются
+    по истечении при следующей записи, поэтому память ограничена числом
+    разных сообщений за одно окно. Для удалённого окна с пропусками
+    выводится сводка о числе пропущенных.
+    """
+
+    def __init__(self, window=LOG_SAMPLE_WINDOW, burst=LOG_SAMPLE_BURST,
+                 clock=time.monotonic):
+        self.window = window
+        self.burst = burst
+        self.clock = clock
+        self._seen = OrderedDict()
+
+    def __len__(self):
+        return len(self._seen)
+
+    def filter(self, record):
+        """Записи, которые нужно вывести вместо `record`."""
+        if record.levelno < logging.WARNING or self.burst <= 0:
+            return [record]
+        now = self.clock()
+        records = self._expire(now)
+        key = (record.name, record.levelno, record.getMessage())
+        window = self._seen.get(key)
+        if window is None:
+            window = self._seen[key] = [now, 0, 0, None]
+        if window[1] < self.burst:
+            records.append(record)
+            window[1] += 1
+        else:
+            window[2] += 1
+            window[3] = record
+        return records
+
+    def _expire(self, now):
+        """Удаление истёкших окон и сводки по их пропускам."""
+        summaries = []
+        while self._seen:
+            key, (started, _, skipped, last) = next(iter(self._seen.items()))
+            if now - started < self.window:
+                break
+            self._seen.popitem(last=False)
+            if skipped:
+                summaries.append(self._summary(last, skipped))
+        return summaries
+
+    @staticmethod
+    def _summary(record, skipped):
+        summary = logging.makeLogRecord(record.__dict__)
+        summary.msg = (
+            f'Сообщение повторилось ещё {skipped} раз: {record.getMessage()}'
+        )
+        summary.args = None
+        summary.repeated = skipped
+        return summary
+
+
+class SamplingQueueListener(QueueListener):
+    """Фоновая запись лога с прореживанием повторов."""
+
+    def __init__(self, log_queue, *handlers, sampler=None):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.sampler = ErrorSampler() if sampler is None else sampler
+
+    def handle(self, record):
+        """Передача обработчикам записей, прошедших прореживание."""
+        for sampled in self.sampler.filter(record):
+            super().handle(sampled)
+
+    def stop(self):
+        """Дозапись очереди и остановка; повторный вызов ничего не делает."""
+        if self._thread is not None:
+            super().stop()
+
+
+def file_handler(path=LOG_FILE, rotate=LOG_ROTATE):
+    """Файловый обработчик с ротацией по размеру или по времени."""
+    if rotate == 'time':
+        return TimedRotatingFileHandler(
+            path, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUP_COUNT,
+            encoding='utf-8',
+        )
+    if rotate == 'size':
+        return RotatingFileHandler(
+            path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT,
+            encoding='utf-8',
+        )
+    return logging.FileHandler(path, encoding='utf-8')
+
+
+def configure(path=LOG_FILE, level=LOG_LEVEL, log_format=LOG_FORMAT,
+              rotate=LOG_ROTATE, stream=None):
+    """Логирование через очередь: вызывающий поток только ставит запись.
+
+    Запись в файл и stdout выполняет фоновый `QueueListener`, который
+    останавливается при выходе из процесса.
+    """
+    handlers = [file_handler(path, rotate), logging.StreamHandler(
+        sys.stdout if stream is None else stream
+    )]
+    if log_format == 'json':
+        for handler in handlers:
+            handler.setFormatter(JsonFormatter())
+    else:
+        handlers[0].setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+        handlers[1].setFormatter(logging.Formatter(STREAM_FORMAT))
+    log_queue = queue.SimpleQueue()
+    listener = SamplingQueueListener(log_queue, *handlers)
+    queue_handler = ContextQueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    logging.basicConfig(level=level, handlers=[queue_handler], force=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
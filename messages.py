@@ -0,0 +1,161 @@
+import html
+import json
+import os
+import re
+from functools import lru_cache
+from string import Formatter
+
+import exeptions
+import settings  # noqa: F401
+
+MESSAGES_FILE = os.getenv('MESSAGES_FILE')
+MESSAGES_LOCALE = os.getenv('MESSAGES_LOCALE', 'ru')
+MESSAGE_CACHE_SIZE = int(os.getenv('MESSAGE_CACHE_SIZE', 4096))
+
+TEXT = 'text'
+MARKDOWN = 'markdown'
+HTML = 'html'
+PARSE_MODES = {TEXT: None, MARKDOWN: 'MarkdownV2', HTML: 'HTML'}
+PLACEHOLDERS = frozenset({'homework_name', 'verdict'})
+
+MARKDOWN_SPECIAL = re.compile(r'([_*\[\]()~`>#+\-=|{}.!\\])')
+
+BUILTIN_LOCALES = {
+    'en': {
+        TEXT: 'Review status of "{homework_name}" has changed. {verdict}',
+        MARKDOWN: 'Review status of *{homework_name}* has changed\\. '
+                  '{verdict}',
+        HTML: 'Review status of <b>{homework_name}</b> has changed. '
+              '{verdict}',
+        'verdicts': {
+            'approved': 'The reviewer liked everything. Hooray!',
+            'reviewing': 'The homework is being reviewed.',
+            'rejected': 'The reviewer left some remarks.',
+        },
+    },
+}
+
+
+def escape_markdown(text):
+    """Экранирование текста для MarkdownV2."""
+    return MARKDOWN_SPECIAL.sub(r'\\\1', text)
+
+
+ESCAPE = {TEXT: str, MARKDOWN: escape_markdown, HTML: html.escape}
+
+
+class Template:
+    """Скомпилированный шаблон одного языка и формата."""
+
+    __slots__ = ('render',)
+
+    def __init__(self, template, verdicts, message_format, derived):
+        escape = ESCAPE[message_format]
+        verdicts = {status: escape(text) for status, text in verdicts.items()}
+        if derived:
+            template = escape(template)
+            for name in PLACEHOLDERS:
+                template = template.replace(
+                    escape('{' + name + '}'), '{' + name + '}'
+                )
+        fields = {
+            field for _, field, _, _ in Formatter().parse(template) if field
+        }
+        if not fields <= PLACEHOLDERS:
+            raise exeptions.MessageCatalogError(
+                f'Неизвестные поля шаблона: {sorted(fields - PLACEHOLDERS)}'
+            )
+        pattern = template.format
+
+        def render(homework_name, status):
+            return pattern(
+                homework_name=escape(homework_name),
+                verdict=verdicts[status],
+            )
+
+        self.render = render
+
+
+class MessageCatalog:
+    """Каталог шаблонов уведомлений по языкам и форматам.
+
+    Каждый язык задаётся словарём: шаблон `text` с полями
+    `{homework_name}` и `{verdict}`, необязательные варианты `markdown`
+    и `html` и словарь `verdicts` по статусам. Если задан `statuses`,
+    `verdicts` каждого языка должен покрывать все эти статусы. Если
+    варианта формата нет, он получается экранированием текстового
+    шаблона. Шаблоны компилируются один раз, готовые сообщения
+    кешируются по (язык, формат, название работы, статус).
+    """
+
+    def __init__(self, locales, default_locale=MESSAGES_LOCALE,
+                 cache_size=MESSAGE_CACHE_SIZE, statuses=()):
+        if default_locale not in locales:
+            raise exeptions.MessageCatalogError(
+                f'Язык по умолчанию {default_locale} отсутствует в каталоге'
+            )
+        self.default_locale = default_locale
+        self.statuses = frozenset(statuses)
+        self._templates = {}
+        for locale, catalog in locales.items():
+            self._compile(locale, catalog)
+        self.render = lru_cache(maxsize=cache_size)(self._render)
+
+    def _compile(self, locale, catalog):
+        try:
+            text = catalog[TEXT]
+            verdicts = catalog['verdicts']
+        except (KeyError, TypeError):
+            raise exeptions.MessageCatalogError(
+                f'Язык {locale}: нужны ключи "{TEXT}" и "verdicts"'
+            )
+        if not isinstance(verdicts, dict):
+            raise exeptions.MessageCatalogError(
+                f'Язык {locale}: "verdicts" должен быть словарём'
+            )
+        missing = self.statuses - verdicts.keys()
+        if missing:
+            raise exeptions.MessageCatalogError(
+                f'Язык {locale}: нет вердиктов для статусов {sorted(missing)}'
+            )
+        for message_format in PARSE_MODES:
+            template = catalog.get(message_format)
+            self._templates[locale, message_format] = Template(
+                text if template is None else template, verdicts,
+                message_format, derived=template is None,
+            )
+
+    @property
+    def locales(self):
+        """Языки каталога."""
+        return sorted({locale for locale, _ in self._templates})
+
+    def _render(self, locale, message_format, homework_name, status):
+        template = self._templates.get((locale, message_format))
+        if template is None:
+            template = self._templates[
+                self.default_locale, message_format or TEXT
+            ]
+        return template.render(homework_name, status)
+
+    @staticmethod
+    def parse_mode(message_format):
+        """Значение parse_mode Telegram для формата сообщения."""
+        return PARSE_MODES.get(message_format)
+
+
+def load_locales(path, base):
+    """Языки из JSON-файла поверх базового набора `base`."""
+    try:
+        with open(path, encoding='utf-8') as file:
+            data = json.load(file)
+    except (OSError, ValueError) as error:
+        raise exeptions.MessageCatalogError(
+            f'Не удалось прочитать каталог сообщений {path}: {error}'
+        )
+    if not isinstance(data, dict):
+        raise exeptions.MessageCatalogError(
+            f'Неверный тип данных. Type "messages": {type(data)}. '
+            f'Ожидаемый тип dict'
+        )
+    return {**base, **data}
@@ -0,0 +1,347 @@
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+import exeptions
+import settings  # noqa: F401
+
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0))
+METRICS_ADDR = os.getenv('METRICS_ADDR', '127.0.0.1')
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, math.inf,
+)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, math.inf)
+IMPORTED_AT = time.monotonic()
+
+
+def _escape(value):
+    return (
+        str(value).replace('\\', '\\\\')
+        .replace('"', '\\"').replace('\n', '\\n')
+    )
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    )
+    return '{' + pairs + '}'
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value))
+
+
+class Metric:
+    """Базовая метрика с именем, описанием и набором меток."""
+
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        (REGISTRY if registry is None else registry).register(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f'Метрика {self.name} ожидает метки {self.labelnames}'
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        """Пары (суффикс имени с метками, значение)."""
+        return []
+
+    def render(self):
+        """Метрика в текстовом формате Prometheus."""
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.kind}',
+        ]
+        for suffix, value in self.samples():
+            lines.append(f'{self.name}{suffix} {_format_value(value)}')
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    """Монотонно растущий счётчик."""
+
+    kind = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values = {} if self.labelnames else {(): 0.0}
+
+    def inc(self, amount=1, **labels):
+        """Увеличение счётчика."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels):
+        """Текущее значение счётчика."""
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        """Значения по наборам меток."""
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            (_format_labels(self.labelnames, key), value)
+            for key, value in items
+        ]
+
+
+class Gauge(Metric):
+    """Значение, которое задаётся явно или вычисляется при выдаче."""
+
+    kind = 'gauge'
+
+    def __init__(self, *args, function=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.function = function
+        self._value = 0.0
+
+    def set(self, value):
+        """Установка значения."""
+        self._value = value
+
+    def set_function(self, function):
+        """Вычисление значения функцией при каждой выдаче метрик."""
+        self.function = function
+
+    def samples(self):
+        """Текущее значение."""
+        value = self._value if self.function is None else self.function()
+        return [] if value is None else [('', value)]
+
+
+class Histogram(Metric):
+    """Гистограмма с фиксированными границами корзин."""
+
+    kind = 'histogram'
+
+    def __init__(self, *args, buckets=LATENCY_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(buckets)
+        if self.buckets[-1] != math.inf:
+            self.buckets += (math.inf,)
+        self._counts = [0] * len(self.buckets)
+        self._sum = 0.0
+
+    def observe(self, value):
+        """Учёт одного наблюдения."""
+        with self._lock:
+            self._sum += value
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self._counts[index] += 1
+                    break
+
+    @contextmanager
+    def time(self):
+        """Замер длительности блока кода."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    @property
+    def count(self):
+        """Число наблюдений."""
+        return sum(self._counts)
+
+    def samples(self):
+        """Кумулятивные корзины, сумма и число наблюдений."""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        samples = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            samples.append(
+                (f'_bucket{{le="{_format_value(bound)}"}}', cumulative)
+            )
+        samples.append(('_sum', total))
+        samples.append(('_count', cumulative))
+        return samples
+
+
+class Registry:
+    """Набор метрик, выдаваемых одной страницей."""
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """Добавление метрики."""
+        with self._lock:
+            self._metrics.append(metric)
+
+    def render(self):
+        """Все метрики в текстовом формате Prometheus."""
+        with self._lock:
+            metrics = list(self._metrics)
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+REGISTRY = Registry()
+
+API_REQUEST_SECONDS = Histogram(
+    'homework_bot_api_request_seconds',
+    'Длительность запроса get_api_answer к API Практикума',
+)
+SEND_MESSAGE_SECONDS = Histogram(
+    'homework_bot_send_message_seconds',
+    'Длительность вызова send_message',
+)
+TELEGRAM_DELIVERY_SECONDS = Histogram(
+    'homework_bot_telegram_delivery_seconds',
+    'Длительность отправки сообщения из очереди в Telegram',
+)
+ERRORS = Counter(
+    'homework_bot_errors_total',
+    'Сбои цикла опроса по типу исключения', ('type',),
+)
+for _error in (
+        exeptions.GetApiAnswerError, exeptions.ApiUnavailableError,
+        exeptions.CheckResponseError, exeptions.SendMessageError,
+):
+    ERRORS.inc(0, type=_error.__name__)
+API_RETRIES = Counter(
+    'homework_bot_api_retries_total',
+    'Повторные попытки запроса к API после сбоя',
+)
+API_HEDGES = Counter(
+    'homework_bot_api_hedged_requests_total',
+    'Дублирующие запросы к API при превышении p95 задержки',
+)
+UNCHANGED_RESPONSES = Counter(
+    'homework_bot_unchanged_responses_total',
+    'Ответы API, обработанные без разбора JSON',
+)
+HOMEWORKS_PER_CYCLE = Histogram(
+    'homework_bot_homeworks_per_cycle',
+    'Число работ в ответе API за цикл опроса', buckets=COUNT_BUCKETS,
+)
+SCHEDULER_LAG_SECONDS = Gauge(
+    'homework_bot_scheduler_lag_seconds',
+    'Опоздание последнего опроса относительно расписания',
+)
+QUEUE_DEPTH = Gauge(
+    'homework_bot_queue_depth',
+    'Сообщения, ожидающие отправки в Telegram',
+)
+OUTBOX_DEPTH = Gauge(
+    'homework_bot_outbox_depth',
+    'Уведомления в outbox, ещё не подтверждённые Telegram',
+)
+OUTBOX_REDELIVERIES = Counter(
+    'homework_bot_outbox_redeliveries_total',
+    'Повторные отправки уведомлений из outbox',
+)
+CHECKPOINT_AGE_SECONDS = Gauge(
+    'homework_bot_checkpoint_age_seconds',
+    'Возраст самой старой отметки, ещё не записанной на диск',
+)
+CHECKPOINT_CURRENT_DATE_AGE_SECONDS = Gauge(
+    'homework_bot_checkpoint_current_date_age_seconds',
+    'Время с current_date последней сохранённой отметки',
+)
+HTTP_OPEN_CONNECTIONS = Gauge(
+    'homework_bot_http_open_connections',
+    'Открытые keep-alive соединения с API Практикума',
+)
+HTTP_REUSE_RATIO = Gauge(
+    'homework_bot_http_connection_reuse_ratio',
+    'Доля запросов к API без нового рукопожатия',
+)
+FIRST_REQUEST_SECONDS = Gauge(
+    'homework_bot_first_request_seconds',
+    'Время от запуска процесса до первого запроса к API',
+)
+API_BREAKER_OPEN = Gauge(
+    'homework_bot_api_breaker_open',
+    'Предохранитель API разомкнут (1) или замкнут (0)',
+)
+INGEST_WAKEUPS = Counter(
+    'homework_bot_ingest_wakeups_total',
+    'Сигналы об изменениях, принятые через POST /wake',
+)
+
+
+_first_request_seen = False
+
+
+def process_uptime():
+    """Время с запуска процесса по /proc, иначе с импорта модуля."""
+    try:
+        with open('/proc/self/stat') as stat:
+            ticks = int(stat.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as uptime:
+            boot = float(uptime.read().split()[0])
+        return max(boot - ticks / os.sysconf('SC_CLK_TCK'), 0.0)
+    except (OSError, ValueError, IndexError):
+        return time.monotonic() - IMPORTED_AT
+
+
+def observe_first_request():
+    """Запоминание времени до первого запроса к API; дальше no-op."""
+    global _first_request_seen
+    if not _first_request_seen:
+        _first_request_seen = True
+        FIRST_REQUEST_SECONDS.set(process_uptime())
+
+
+@lru_cache(maxsize=None)
+def handler_class():
+    """Обработчик GET /metrics; http.server импортируется при первом вызове."""
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        """Выдача метрик по GET /metrics."""
+
+        registry = REGISTRY
+
+        def do_GET(self):
+            """Ответ с текстом метрик."""
+            if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+                self.send_error(404)
+                return
+            body = self.registry.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            """Запросы к метрикам не пишутся в лог."""
+
+    return MetricsHandler
+
+
+def start_http_server(port=METRICS_PORT, addr=METRICS_ADDR):
+    """Запуск сервера метрик в фоновом потоке; порт 0 — выключен."""
+    if not port:
+        return None
+    from http.server import ThreadingHTTPServer
+
+    httpd = ThreadingHTTPServer((addr, port), handler_class())
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
@@ -0,0 +1,200 @@
+import os
+import random
+import sqlite3
+import threading
+import time
+
+import checkpoints
+import settings  # noqa: F401
+
+OUTBOX_DB = os.getenv('OUTBOX_DB', checkpoints.CHECKPOINT_DB)
+OUTBOX_FLUSH_EVERY = int(os.getenv('OUTBOX_FLUSH_EVERY', 100))
+OUTBOX_FLUSH_INTERVAL = float(os.getenv('OUTBOX_FLUSH_INTERVAL', 5))
+OUTBOX_RETRY_BASE = float(os.getenv('OUTBOX_RETRY_BASE', 5))
+OUTBOX_RETRY_MAX = float(os.getenv('OUTBOX_RETRY_MAX', 600))
+OUTBOX_RETRY_INTERVAL = float(os.getenv('OUTBOX_RETRY_INTERVAL', 5))
+
+
+class Entry:
+    """Сообщение в outbox, ожидающее подтверждения доставки."""
+
+    __slots__ = (
+        'seq', 'rowid', 'tenant', 'chat_id', 'text', 'parse_mode',
+        'attempts', 'next_attempt', 'claimed',
+    )
+
+    def __init__(self, seq, tenant, chat_id, text, parse_mode=None,
+                 rowid=None):
+        self.seq = seq
+        self.rowid = rowid
+        self.tenant = tenant
+        self.chat_id = chat_id
+        self.text = text
+        self.parse_mode = parse_mode
+        self.attempts = 0
+        self.next_attempt = 0.0
+        self.claimed = False
+
+    def __repr__(self):
+        return f'Entry({self.seq}, chat={self.chat_id!r})'
+
+
+class Outbox:
+    """Журнал исходящих уведомлений с доставкой хотя бы один раз.
+
+    Сообщение попадает в outbox до отправки и удаляется после
+    подтверждения. Новые записи копятся в памяти и пишутся на диск одной
+    транзакцией каждые `flush_every` записей, `flush_interval` секунд
+    или перед сбросом отметок опроса (`CheckpointStore.before_flush`),
+    поэтому отметка не уходит на диск раньше несданных уведомлений.
+    Сообщение, подтверждённое до записи, на диск не попадает вовсе,
+    а доставленные записи удаляются пачкой при следующем сбросе.
+    Сообщения одного чата отправляются строго по порядку: пока в чате
+    есть неподтверждённое сообщение, следующие ждут повтора.
+    """
+
+    def __init__(self, path=None, tenants=None,
+                 flush_every=OUTBOX_FLUSH_EVERY,
+                 flush_interval=OUTBOX_FLUSH_INTERVAL,
+                 retry_base=OUTBOX_RETRY_BASE, retry_max=OUTBOX_RETRY_MAX):
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self._entries = {}
+        self._unsaved = {}
+        self._acked = []
+        self._seq = 0
+        self._flushed_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._conn = None
+        if path is not None:
+            self._conn = checkpoints.connect(path)
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS outbox ('
+                ' id INTEGER PRIMARY KEY,'
+                ' tenant TEXT NOT NULL,'
+                ' chat_id NOT NULL,'
+                ' text TEXT NOT NULL,'
+                ' parse_mode TEXT,'
+                ' created_at REAL NOT NULL)'
+            )
+            rows = self._conn.execute(
+                'SELECT id, tenant, chat_id, text, parse_mode FROM outbox '
+                'ORDER BY id'
+            ).fetchall()
+            for rowid, tenant, chat_id, text, parse_mode in rows:
+                if tenants is None or tenant in tenants:
+                    self._seq += 1
+                    self._entries[self._seq] = Entry(
+                        self._seq, tenant, chat_id, text, parse_mode, rowid
+                    )
+
+    def __len__(self):
+        return len(self._entries)
+
+    def put(self, tenant, chat_id, text, parse_mode=None):
+        """Запись сообщения в outbox.
+
+        У возвращённой записи `claimed` истинно, если её можно
+        отправлять сразу: в чате нет более ранних неподтверждённых.
+        """
+        with self._lock:
+            self._seq += 1
+            entry = Entry(self._seq, tenant, chat_id, text, parse_mode)
+            entry.claimed = not any(
+                other.chat_id == chat_id for other in self._entries.values()
+            )
+            self._entries[entry.seq] = entry
+            if self._conn is not None:
+                self._unsaved[entry.seq] = entry
+                if (
+                    len(self._unsaved) >= self.flush_every
+                    or time.monotonic() - self._flushed_at
+                    >= self.flush_interval
+                ):
+                    self._flush()
+        return entry
+
+    def settle(self, entry, delivered):
+        """Подтверждение доставки или перенос на повтор с растущей паузой."""
+        with self._lock:
+            entry.claimed = False
+            if not delivered:
+                entry.attempts += 1
+                entry.next_attempt = time.monotonic() + min(
+                    self.retry_max,
+                    self.retry_base * 2 ** (entry.attempts - 1),
+                ) * random.uniform(0.5, 1)
+                return
+            if self._entries.pop(entry.seq, None) is None:
+                return
+            if self._unsaved.pop(entry.seq, None) is None:
+                self._acked.append((entry.rowid,))
+
+    def release(self, entry):
+        """Возврат взятой записи без попытки отправки."""
+        with self._lock:
+            entry.claimed = False
+
+    def due(self, now=None):
+        """Записи, которые пора отправить, списками по чатам в порядке записи.
+
+        Чат пропускается целиком, если его первая запись ещё ждёт паузы
+        или уже отправляется. Возвращённые записи помечаются взятыми.
+        """
+        now = time.monotonic() if now is None else now
+        chats = {}
+        blocked = set()
+        with self._lock:
+            for entry in self._entries.values():
+                if entry.chat_id in blocked:
+                    continue
+                if entry.claimed or (
+                        entry.chat_id not in chats
+                        and entry.next_attempt > now
+                ):
+                    blocked.add(entry.chat_id)
+                    continue
+                entry.claimed = True
+                chats.setdefault(entry.chat_id, []).append(entry)
+        return list(chats.values())
+
+    def flush(self):
+        """Запись новых сообщений и удаление доставленных."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        self._flushed_at = time.monotonic()
+        if self._conn is None or not (self._unsaved or self._acked):
+            return
+        now = time.time()
+        self._conn.execute('BEGIN')
+        try:
+            for entry in self._unsaved.values():
+                entry.rowid = self._conn.execute(
+                    'INSERT INTO outbox '
+                    '(tenant, chat_id, text, parse_mode, created_at) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (entry.tenant, entry.chat_id, entry.text,
+                     entry.parse_mode, now),
+                ).lastrowid
+            self._conn.executemany(
+                'DELETE FROM outbox WHERE id = ?', self._acked
+            )
+        except sqlite3.Error:
+            self._conn.execute('ROLLBACK')
+            for entry in self._unsaved.values():
+                entry.rowid = None
+            raise
+        self._conn.execute('COMMIT')
+        self._unsaved.clear()
+        self._acked.clear()
+
+    def close(self):
+        """Сброс журнала и закрытие базы."""
+        with self._lock:
+            self._flush()
+            if self._conn is not None:
+                self._conn.close()
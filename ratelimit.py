@@ -0,0 +1,48 @@
+import time
+
+
+class TokenBucket:
+    """Токен-бакет: `rate` токенов в секунду, не более `burst` подряд.
+
+    Рассчитан на работу внутри одного event loop и не потокобезопасен.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def try_acquire(self, tokens=1):
+        """Взять токены, если они есть."""
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+    def delay(self, tokens=1):
+        """Через сколько секунд будут доступны токены."""
+        self._refill()
+        if self._tokens >= tokens:
+            return 0.0
+        return (tokens - self._tokens) / self.rate
+
+    def pause(self, seconds):
+        """Не выдавать токены ближайшие `seconds` секунд, например по 429."""
+        self._refill()
+        self._tokens = min(self._tokens, 1 - seconds * self.rate)
+
+    async def acquire(self, tokens=1):
+        """Дождаться и взять токены."""
+        import asyncio
+
+        while not self.try_acquire(tokens):
+            await asyncio.sleep(self.delay(tokens))
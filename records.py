@@ -0,0 +1,87 @@
+from enum import Enum
+
+
+class Status(str, Enum):
+    """Основа перечисления статусов проверки работы.
+
+    Члены сравниваются и хешируются как строки, поэтому подходят ключами
+    к словарям, заданным строковыми статусами.
+    """
+
+    __hash__ = str.__hash__
+
+    def __str__(self):
+        return self.value
+
+
+def status_enum(verdicts, name='HomeworkStatus', module=__name__):
+    """Перечисление статусов по ключам `verdicts`: `approved` -> APPROVED.
+
+    `module` — модуль, где перечисление сохранено под именем `name`;
+    по нему члены находятся при pickle.
+    """
+    return Status(
+        name, [(status.upper(), status) for status in verdicts],
+        module=module,
+    )
+
+
+class HomeworkRecord:
+    """Компактная запись о работе из ответа API."""
+
+    __slots__ = ('id', 'name', 'status', 'date_updated')
+
+    def __init__(self, homework_id, name, status, date_updated=None):
+        self.id = homework_id
+        self.name = name
+        self.status = status
+        self.date_updated = date_updated
+
+    def __repr__(self):
+        return (
+            f'HomeworkRecord({self.id!r}, {self.name!r}, '
+            f'{self.status.value!r}, {self.date_updated!r})'
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, HomeworkRecord):
+            return NotImplemented
+        return (
+            (self.id, self.name, self.status, self.date_updated)
+            == (other.id, other.name, other.status, other.date_updated)
+        )
+
+
+def compile_validator(status_type):
+    """Сборка функции, превращающей работу из ответа API в запись.
+
+    Допустимые статусы — члены перечисления `status_type`; строковый
+    статус сопоставляется члену один раз на работу. Функция бросает те
+    же KeyError, что и `parse_status`.
+    """
+    statuses = {member.value: member for member in status_type}
+    record = HomeworkRecord
+
+    def to_record(homework):
+        try:
+            status = homework['status']
+        except KeyError:
+            raise KeyError(
+                'В словаре homeworks отсутствует ключ "status"'
+            ) from None
+        try:
+            name = homework['homework_name']
+        except KeyError:
+            raise KeyError(
+                'В словаре homeworks отсутствует ключ "homework_name"'
+            ) from None
+        try:
+            status = statuses[status]
+        except (KeyError, TypeError):
+            raise KeyError(f'Статус {status} не существует') from None
+        return record(
+            homework.get('id', name), name, status,
+            homework.get('date_updated'),
+        )
+
+    return to_record
@@ -0,0 +1,118 @@
+import heapq
+import itertools
+import os
+import time
+
+import settings  # noqa: F401
+from ratelimit import TokenBucket
+
+POLL_MIN_INTERVAL = float(os.getenv('POLL_MIN_INTERVAL', 60))
+POLL_MAX_INTERVAL = float(os.getenv('POLL_MAX_INTERVAL', 1800))
+POLL_DEFAULT_INTERVAL = float(os.getenv('POLL_DEFAULT_INTERVAL', 600))
+POLL_IDLE_FACTOR = float(os.getenv('POLL_IDLE_FACTOR', 0.05))
+POLL_RATE_LIMIT = float(os.getenv('POLL_RATE_LIMIT', 10))
+
+ACTIVE_STATUSES = frozenset({'reviewing'})
+
+
+def poll_interval(tenant, now=None, min_interval=POLL_MIN_INTERVAL,
+                  max_interval=POLL_MAX_INTERVAL,
+                  idle_factor=POLL_IDLE_FACTOR,
+                  default_interval=POLL_DEFAULT_INTERVAL):
+    """Пауза до следующего опроса арендатора.
+
+    Пока работа на проверке, опрашиваем с минимальным интервалом.
+    Иначе интервал растёт пропорционально времени без изменений
+    и ограничен `max_interval`. Пока изменений не было, используется
+    `default_interval`.
+    """
+    if tenant.last_status in ACTIVE_STATUSES:
+        return min_interval
+    if tenant.last_change is None:
+        return min(max(default_interval, min_interval), max_interval)
+    now = time.time() if now is None else now
+    idle = max(now - tenant.last_change, 0)
+    return min(max(min_interval + idle * idle_factor, min_interval),
+               max_interval)
+
+
+class PollScheduler:
+    """Очередь опросов арендаторов на куче по времени следующего опроса.
+
+    Перепланирование не удаляет старую запись из кучи: она помечается
+    устаревшей и пропускается при извлечении. Выдача ограничена
+    глобальным бюджетом запросов в секунду.
+    """
+
+    def __init__(self, rate_limit=POLL_RATE_LIMIT, interval=poll_interval,
+                 burst=None):
+        self.interval = interval
+        self.lag = 0.0
+        self._heap = []
+        self._due = {}
+        self._counter = itertools.count()
+        self._budget = TokenBucket(rate_limit, burst)
+        self._changed = None
+
+    def __len__(self):
+        return len(self._due)
+
+    def schedule(self, tenant, due):
+        """Назначить опрос арендатора на момент `due` (time.monotonic)."""
+        self._due[tenant.name] = due
+        heapq.heappush(self._heap, (due, next(self._counter), tenant))
+        if self._changed is not None and self._heap[0][2] is tenant:
+            self._changed.set()
+
+    def reschedule(self, tenant):
+        """Назначить следующий опрос по состоянию арендатора.
+
+        Если опрос уже назначен раньше (например, через `wake` во время
+        текущего опроса), более раннее время сохраняется.
+        """
+        self.schedule_before(
+            tenant, time.monotonic() + self.interval(tenant)
+        )
+
+    def wake(self, tenant, delay=0.0):
+        """Опросить арендатора не позже, чем через `delay` секунд."""
+        self.schedule_before(tenant, time.monotonic() + delay)
+
+    def schedule_before(self, tenant, due):
+        """Назначить опрос на `due`, если он ещё не назначен раньше."""
+        if self._due.get(tenant.name, due + 1) > due:
+            self.schedule(tenant, due)
+
+    def discard(self, tenant):
+        """Снять арендатора с расписания."""
+        self._due.pop(tenant.name, None)
+
+    def _pop_stale(self):
+        while self._heap:
+            due, _, tenant = self._heap[0]
+            if self._due.get(tenant.name) == due:
+                return
+            heapq.heappop(self._heap)
+
+    async def next_due(self):
+        """Дождаться арендатора, чей опрос наступил, в рамках бюджета."""
+        import asyncio
+
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        while True:
+            self._pop_stale()
+            timeout = None
+            if self._heap:
+                timeout = self._heap[0][0] - time.monotonic()
+                if timeout <= 0:
+                    due, _, tenant = heapq.heappop(self._heap)
+                    del self._due[tenant.name]
+                    await self._budget.acquire()
+                    self.lag = time.monotonic() - due
+                    return tenant
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,9 @@
+"""Загрузка переменных из .env до того, как модули бота прочтут настройки.
+
+Каждый модуль, читающий `os.getenv` при импорте, импортирует этот модуль
+первым, поэтому настройки из .env действуют при любом порядке импорта и
+любой точке входа.
+"""
+from dotenv import load_dotenv
+
+load_dotenv()
@@ -0,0 +1,151 @@
+import codecs
+import json
+import os
+
+import settings  # noqa: F401
+
+STREAM_RESPONSES = os.getenv(
+    'STREAM_RESPONSES', ''
+).lower() in ('1', 'true', 'yes')
+STREAM_CHUNK_SIZE = int(os.getenv('STREAM_CHUNK_SIZE', 64 * 1024))
+WHITESPACE = ' \t\n\r'
+
+
+class StreamedAnswer:
+    """Ответ API, который разбирается по мере чтения тела.
+
+    Итерация выдаёт работы из массива `homeworks` по одной, как только
+    каждая прочитана целиком, поэтому в памяти держатся только текущий
+    кусок тела и текущая работа. Остальные ключи верхнего уровня
+    (`current_date` обычно идёт после массива) собираются в `fields`
+    и проверяются в `finish` так же, как в `check_response`.
+    """
+
+    def __init__(self, chunks, check=None, close=None):
+        self._chunks = iter(chunks)
+        self._close = close
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._check = check
+        self.fields = {}
+        self.count = 0
+        self._consumed = False
+
+    def _read(self):
+        """Дочитывание следующего куска тела; False — тело кончилось."""
+        if self._eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._eof = True
+            text = self._decoder.decode(b'', final=True)
+        else:
+            text = self._decoder.decode(chunk)
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+        return True
+
+    def _peek(self):
+        """Первый непробельный символ с текущей позиции или ''."""
+        while True:
+            while (
+                    self._pos < len(self._buffer)
+                    and self._buffer[self._pos] in WHITESPACE
+            ):
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read():
+                return ''
+
+    def _expect(self, chars):
+        char = self._peek()
+        if char not in chars or not char:
+            raise ValueError(
+                f'Ожидался один из символов {chars!r}, получен {char!r}'
+            )
+        self._pos += 1
+        return char
+
+    def _value(self):
+        """Разбор очередного значения JSON с дочитыванием тела.
+
+        Значение, упёршееся в конец прочитанного, разбирается заново
+        после следующего куска: иначе число `12` из `123` было бы
+        принято за целое значение.
+        """
+        self._peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._read():
+                    raise
+                continue
+            if end == len(self._buffer) and self._read():
+                continue
+            self._pos = end
+            return value
+
+    def _items(self):
+        self._expect('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            homework = self._value()
+            self.count += 1
+            yield homework
+            if self._expect(',]') == ']':
+                return
+
+    def __iter__(self):
+        if self._consumed:
+            raise RuntimeError('Ответ API уже прочитан')
+        self._consumed = True
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self._value()
+            if not isinstance(key, str):
+                raise ValueError(f'Ключ ответа API не строка: {key!r}')
+            self._expect(':')
+            if key == 'homeworks' and self._peek() == '[':
+                self.fields[key] = []
+                yield from self._items()
+            else:
+                self.fields[key] = self._value()
+            if self._expect(',}') == '}':
+                break
+        if self._peek():
+            raise ValueError('Лишние данные после ответа API')
+
+    def finish(self):
+        """Дочитывание ответа и проверка ключей верхнего уровня.
+
+        Возвращает `current_date`. Работы, не выданные итерацией,
+        пропускаются без накопления.
+        """
+        if not self._consumed:
+            for _ in self:
+                pass
+        if self._check is not None:
+            self._check(self.fields)
+        return self.fields.get('current_date')
+
+    def close(self):
+        """Освобождение соединения, даже если тело не дочитано."""
+        if self._close is not None:
+            self._close()
+
+
+def stream_answer(response, check=None, chunk_size=STREAM_CHUNK_SIZE):
+    """Потоковый разбор тела ответа requests, открытого с `stream=True`."""
+    return StreamedAnswer(
+        response.iter_content(chunk_size), check, response.close
+    )
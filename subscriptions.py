@@ -0,0 +1,110 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import exeptions
+import settings  # noqa: F401
+
+SUBSCRIPTIONS_FILE = os.getenv('SUBSCRIPTIONS_FILE')
+BROADCAST_CONCURRENCY = int(os.getenv('BROADCAST_CONCURRENCY', 16))
+
+
+class SubscriptionIndex:
+    """Подписки чатов на обновления арендатора или отдельной работы.
+
+    Для каждого арендатора заранее собран кортеж чатов, подписанных на
+    все его работы, и по кортежу для работ с отдельными подписчиками,
+    поэтому выбор получателей — один-два поиска в словаре.
+    """
+
+    def __init__(self, tenant_chats=None, homework_chats=None):
+        tenant_chats = tenant_chats or {}
+        homework_chats = homework_chats or {}
+        self._tenants = {
+            tenant: tuple(dict.fromkeys(chats))
+            for tenant, chats in tenant_chats.items()
+        }
+        self._homeworks = {
+            (tenant, name): tuple(dict.fromkeys(
+                (*self._tenants.get(tenant, ()), *chats)
+            ))
+            for (tenant, name), chats in homework_chats.items()
+        }
+
+    def chats_for(self, tenant, record):
+        """Чаты для уведомления о работе: основной чат и подписчики."""
+        chats = self._homeworks.get((tenant.name, record.name))
+        if chats is None:
+            chats = self._tenants.get(tenant.name, ())
+        if tenant.chat_id in chats:
+            return chats
+        return (tenant.chat_id, *chats)
+
+
+def load_subscriptions(path):
+    """Загрузка подписок из JSON-файла.
+
+    Формат: {"арендатор": {"chats": [...], "homeworks": {"работа": [...]}}}.
+    """
+    try:
+        with open(path, encoding='utf-8') as file:
+            data = json.load(file)
+    except (OSError, ValueError) as error:
+        raise exeptions.SubscriptionsConfigError(
+            f'Не удалось прочитать файл подписок {path}: {error}'
+        )
+    if not isinstance(data, dict):
+        raise exeptions.SubscriptionsConfigError(
+            f'Неверный тип данных. Type "subscriptions": {type(data)}. '
+            f'Ожидаемый тип dict'
+        )
+    tenant_chats = {}
+    homework_chats = {}
+    for tenant, item in data.items():
+        try:
+            tenant_chats[tenant] = list(item.get('chats', []))
+            for name, chats in item.get('homeworks', {}).items():
+                homework_chats[tenant, name] = list(chats)
+        except (AttributeError, TypeError):
+            raise exeptions.SubscriptionsConfigError(
+                f'Подписки арендатора {tenant}: ожидаются ключи "chats" '
+                f'и "homeworks" со списками чатов'
+            )
+    return SubscriptionIndex(tenant_chats, homework_chats)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _broadcast_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=BROADCAST_CONCURRENCY,
+                    thread_name_prefix='broadcast',
+                )
+    return _executor
+
+
+def broadcast(send, chats):
+    """Вызов `send(chat_id)` для всех чатов параллельно.
+
+    Число одновременных отправок ограничено BROADCAST_CONCURRENCY.
+    Возвращает пары (чат, исключение) для неудачных отправок.
+    """
+    def deliver(chat_id):
+        try:
+            send(chat_id)
+        except Exception as error:
+            return chat_id, error
+        return None
+
+    if len(chats) == 1:
+        results = [deliver(chats[0])]
+    else:
+        results = list(_broadcast_executor().map(deliver, chats))
+    return [result for result in results if result is not None]
@@ -0,0 +1,192 @@
+import bisect
+import hashlib
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import delivery
+import homework
+import logpipeline
+import scheduler
+import settings  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+SUPERVISOR_WORKERS = int(os.getenv('SUPERVISOR_WORKERS', os.cpu_count() or 1))
+SHARD_VNODES = int(os.getenv('SHARD_VNODES', 128))
+RESTART_MIN_DELAY = float(os.getenv('SUPERVISOR_RESTART_MIN_DELAY', 1))
+RESTART_MAX_DELAY = float(os.getenv('SUPERVISOR_RESTART_MAX_DELAY', 60))
+STABLE_UPTIME = float(os.getenv('SUPERVISOR_STABLE_UPTIME', 60))
+CHECK_INTERVAL = 1
+PORT_SETTINGS = ('METRICS_PORT', 'INGEST_PORT')
+SHARED_RATE_LIMITS = {
+    'POLL_RATE_LIMIT': scheduler.POLL_RATE_LIMIT,
+    'TELEGRAM_GLOBAL_RATE_LIMIT': delivery.GLOBAL_RATE_LIMIT,
+}
+ENGINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'engine.py')
+
+
+def _hash(key):
+    return int.from_bytes(
+        hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big'
+    )
+
+
+def worker_name(index):
+    """Имя рабочего процесса на кольце."""
+    return f'worker-{index}'
+
+
+class HashRing:
+    """Консистентное хеширование арендаторов по рабочим процессам.
+
+    Каждый процесс занимает `vnodes` точек на кольце, арендатор
+    достаётся первому процессу по часовой стрелке от хеша своего имени.
+    При добавлении N-го процесса переезжает около 1/N арендаторов.
+    """
+
+    def __init__(self, nodes, vnodes=SHARD_VNODES):
+        points = sorted(
+            (_hash(f'{node}#{replica}'), node)
+            for node in nodes for replica in range(vnodes)
+        )
+        if not points:
+            raise ValueError('Кольцо должно содержать хотя бы один узел')
+        self._hashes = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def node_for(self, key):
+        """Узел, которому принадлежит ключ."""
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._nodes[index]
+
+
+def shard_tenants(tenant_list, shard, shards, vnodes=SHARD_VNODES):
+    """Арендаторы, которые кольцо из `shards` процессов отдаёт `shard`."""
+    ring = HashRing(map(worker_name, range(shards)), vnodes)
+    name = worker_name(shard)
+    return [
+        tenant for tenant in tenant_list if ring.node_for(tenant.name) == name
+    ]
+
+
+def worker_environ(index, workers, environ=None):
+    """Окружение рабочего процесса.
+
+    Порты метрик и приёма сигналов сдвигаются на номер процесса, общие
+    для бота лимиты делятся между процессами, лог у каждого свой.
+    Базы отметок и доставленных уведомлений общие: SQLite в режиме WAL
+    допускает запись из нескольких процессов, а арендатор принадлежит
+    одному процессу, поэтому при изменении числа процессов отметки
+    переезжают вместе с ним.
+    """
+    environ = dict(os.environ if environ is None else environ)
+    for setting in PORT_SETTINGS:
+        port = int(environ.get(setting) or 0)
+        if port:
+            environ[setting] = str(port + index)
+    for setting, default in SHARED_RATE_LIMITS.items():
+        rate = float(environ.get(setting) or default)
+        environ[setting] = str(rate / workers)
+    stem, extension = os.path.splitext(logpipeline.LOG_FILE)
+    environ['LOG_FILE'] = f'{stem}.{worker_name(index)}{extension}'
+    return environ
+
+
+class Worker:
+    """Рабочий процесс `engine.py` для одного шарда."""
+
+    def __init__(self, index, workers):
+        self.index = index
+        self.workers = workers
+        self.process = None
+        self.started_at = None
+        self.restart_at = 0.0
+        self.delay = RESTART_MIN_DELAY
+
+    def start(self, now):
+        """Запуск процесса шарда."""
+        self.process = subprocess.Popen(
+            [sys.executable, ENGINE, '--shard', str(self.index),
+             '--shards', str(self.workers)],
+            env=worker_environ(self.index, self.workers),
+        )
+        self.started_at = now
+        logger.info(
+            f'Запущен {worker_name(self.index)}, pid {self.process.pid}'
+        )
+
+    def check(self, now):
+        """Перезапуск упавшего процесса с растущей паузой."""
+        if self.process is not None:
+            code = self.process.poll()
+            if code is None:
+                return
+            uptime = now - self.started_at
+            logger.error(
+                f'{worker_name(self.index)} завершился с кодом {code} '
+                f'через {uptime:.0f} с'
+            )
+            if uptime >= STABLE_UPTIME:
+                self.delay = RESTART_MIN_DELAY
+            self.process = None
+            self.restart_at = now + self.delay
+            self.delay = min(self.delay * 2, RESTART_MAX_DELAY)
+        if now >= self.restart_at:
+            self.start(now)
+
+    def stop(self):
+        """Остановка процесса с сохранением несброшенных отметок."""
+        if self.process is not None and self.process.poll() is None:
+            self.process.send_signal(signal.SIGINT)
+
+    def wait(self, timeout):
+        """Ожидание завершения с принудительной остановкой по таймауту."""
+        if self.process is None:
+            return
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+def supervise(workers=SUPERVISOR_WORKERS, check_interval=CHECK_INTERVAL):
+    """Запуск и перезапуск рабочих процессов до сигнала остановки."""
+    pool = [Worker(index, workers) for index in range(workers)]
+    stopping = []
+
+    def stop(signum, frame):
+        stopping.append(signum)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    logger.info(f'Запуск {workers} рабочих процессов')
+    try:
+        while not stopping:
+            now = time.monotonic()
+            for worker in pool:
+                worker.check(now)
+            time.sleep(check_interval)
+    finally:
+        for worker in pool:
+            worker.stop()
+        for worker in pool:
+            worker.wait(10)
+
+
+def main():
+    """Проверка настроек и запуск супервизора."""
+    if not homework.TELEGRAM_TOKEN:
+        sys.exit('Ошибка в получении токенов')
+    if SUPERVISOR_WORKERS < 1:
+        sys.exit('SUPERVISOR_WORKERS должно быть не меньше 1')
+    supervise()
+
+
+if __name__ == '__main__':
+    homework.configure_logging()
+    main()
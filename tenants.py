@@ -0,0 +1,79 @@
+import json
+import time
+
+import circuit
+import exeptions
+import messages
+
+
+class Tenant:
+    """Арендатор: токен Практикума, чат Telegram и метка опроса."""
+
+    __slots__ = (
+        'name', 'token', 'chat_id', 'headers', 'current_timestamp',
+        'last_status', 'last_change', 'alerts', 'locale', 'message_format',
+    )
+
+    def __init__(self, name, token, chat_id, current_timestamp=None,
+                 locale=None, message_format=messages.TEXT):
+        self.name = name
+        self.token = token
+        self.chat_id = chat_id
+        self.headers = {'Authorization': f'OAuth {token}'}
+        self.current_timestamp = current_timestamp
+        self.last_status = None
+        self.last_change = None
+        self.alerts = circuit.AlertDeduplicator()
+        self.locale = locale
+        self.message_format = message_format
+
+    def observe(self, homeworks):
+        """Запоминание последнего статуса из ответа API."""
+        if homeworks:
+            self.last_status = homeworks[0].get('status')
+            self.last_change = time.time()
+
+    def __repr__(self):
+        return f'Tenant({self.name!r})'
+
+
+def load_tenants(path):
+    """Загрузка списка арендаторов из JSON-файла."""
+    try:
+        with open(path, encoding='utf-8') as file:
+            data = json.load(file)
+    except (OSError, ValueError) as error:
+        raise exeptions.TenantsConfigError(
+            f'Не удалось прочитать файл арендаторов {path}: {error}'
+        )
+    if not isinstance(data, list):
+        raise exeptions.TenantsConfigError(
+            f'Неверный тип данных. Type "tenants": {type(data)}. '
+            f'Ожидаемый тип list'
+        )
+    tenants = []
+    for index, item in enumerate(data):
+        try:
+            token = item['practicum_token']
+            chat_id = item['telegram_chat_id']
+        except (KeyError, TypeError):
+            raise exeptions.TenantsConfigError(
+                f'Арендатор #{index}: нужны ключи '
+                f'"practicum_token" и "telegram_chat_id"'
+            )
+        message_format = item.get('format', messages.TEXT)
+        if message_format not in messages.PARSE_MODES:
+            raise exeptions.TenantsConfigError(
+                f'Арендатор #{index}: неизвестный формат {message_format}, '
+                f'допустимы {sorted(messages.PARSE_MODES)}'
+            )
+        tenants.append(Tenant(
+            item.get('name', str(index)), token, chat_id,
+            locale=item.get('locale'), message_format=message_format,
+        ))
+    names = {tenant.name for tenant in tenants}
+    if len(names) != len(tenants):
+        raise exeptions.TenantsConfigError(
+            'Имена арендаторов в файле должны быть уникальными'
+        )
+    return tenants
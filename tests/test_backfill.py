@@ -0,0 +1,144 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+import backfill
+import checkpoints
+import dedup
+import exeptions
+import history
+import homework
+import streaming
+import tenants
+
+
+@pytest.fixture
+def stores(tmp_path, monkeypatch):
+    path = str(tmp_path / 'state.sqlite3')
+    store = checkpoints.CheckpointStore(path)
+    delivered = dedup.DeliveredIndex()
+    statuses = history.HistoryStore(path)
+    monkeypatch.setattr(homework, 'CHECKPOINTS', store)
+    monkeypatch.setattr(homework, 'DELIVERED', delivered)
+    monkeypatch.setattr(homework, 'HISTORY', statuses)
+    yield store, delivered, statuses
+    store.close()
+    statuses.close()
+
+
+class TestBackfill:
+
+    def test_history_is_imported_without_notifications(
+            self, stores, monkeypatch):
+        store, delivered, statuses = stores
+        store.save('old', 50)
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def fetch(headers, from_date):
+            assert from_date == 0
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.pop()
+            token = headers['Authorization'].split()[-1]
+            if token == 'broken':
+                raise exeptions.GetApiAnswerError('Сбой при запросе к API')
+            return {
+                'homeworks': [
+                    {'homework_name': f'{token}-hw', 'status': 'approved',
+                     'date_updated': '2026-10-01T10:00:00Z'},
+                ],
+                'current_date': 100,
+            }
+
+        monkeypatch.setattr(homework, 'fetch_statuses', fetch)
+        tenant_list = [
+            tenants.Tenant(f't{index}', f'token{index}', index)
+            for index in range(6)
+        ]
+        tenant_list.append(tenants.Tenant('old', 'token-old', 7))
+        tenant_list.append(tenants.Tenant('bad', 'broken', 8))
+        results = backfill.run_backfill(
+            tenant_list, concurrency=2, rate_limit=1000
+        )
+        assert 'old' not in results
+        assert isinstance(results['bad'], exeptions.GetApiAnswerError)
+        assert max(peak) <= 2
+        assert tenant_list[0].current_timestamp == 100
+        assert store.load('t0') == 100
+        assert tenant_list[6].current_timestamp == 50
+        assert tenant_list[7].current_timestamp > 100
+        assert store.load('bad') is None
+        assert statuses.latest('t3', 'token3-hw')[0] == 'approved'
+
+        sent = []
+        monkeypatch.setattr(
+            homework, 'send_chat_message',
+            lambda *args, **kwargs: sent.append(args),
+        )
+        monkeypatch.setattr(homework, 'OUTBOX', None)
+        monkeypatch.setattr(homework, 'SUBSCRIPTIONS', None)
+        homework.process_answer(None, tenant_list[0], fetch(
+            tenant_list[0].headers, 0
+        ))
+        assert sent == []
+
+    def test_request_budget(self, stores, monkeypatch):
+        monkeypatch.setattr(
+            homework, 'fetch_statuses',
+            lambda headers, from_date: {'homeworks': [], 'current_date': 1},
+        )
+        tenant_list = [
+            tenants.Tenant(f't{index}', 'token', index) for index in range(5)
+        ]
+        started = time.monotonic()
+        asyncio.run(backfill.backfill(
+            tenant_list, concurrency=5, rate_limit=20
+        ))
+        assert time.monotonic() - started >= 0.15
+
+    def test_streamed_history_is_imported(self, stores, monkeypatch):
+        store, delivered, statuses = stores
+        homeworks = [
+            {'homework_name': f'hw{index}', 'status': 'approved',
+             'date_updated': '2026-10-01T10:00:00Z'}
+            for index in range(3)
+        ]
+        body = json.dumps({'homeworks': homeworks, 'current_date': 100})
+
+        class Response:
+            status_code = 200
+            closed = False
+
+            def iter_content(self, chunk_size):
+                data = body.encode()
+                for start in range(0, len(data), 16):
+                    yield data[start:start + 16]
+
+            def close(self):
+                self.closed = True
+
+        response = Response()
+
+        class Transport:
+            def get(self, url, **kwargs):
+                assert kwargs['stream'] is True
+                return response
+
+        monkeypatch.setattr(streaming, 'STREAM_RESPONSES', True)
+        monkeypatch.setattr(homework, 'TRANSPORT', Transport())
+        monkeypatch.setattr(homework, 'FINGERPRINTS', None)
+        tenant = tenants.Tenant('new', 'token', 1)
+        results = backfill.run_backfill([tenant], rate_limit=1000)
+        assert results == {'new': 3}
+        assert tenant.current_timestamp == 100
+        assert store.load('new') == 100
+        assert statuses.latest('new', 'hw2')[0] == 'approved'
+        assert response.closed
@@ -1,11 +1,24 @@
+import json
 import os
 from http import HTTPStatus
 
+import pytest
 import requests
 import telegram
 import utils
 
 
+@pytest.fixture(autouse=True)
+def transport_via_requests_get(monkeypatch):
+    """Направляет запросы общей сессии в подменяемый тестами requests.get"""
+    import homework
+
+    def session_get(*args, **kwargs):
+        return requests.get(*args, **kwargs)
+
+    monkeypatch.setattr(homework.TRANSPORT.session, 'get', session_get)
+
+
 class MockResponseGET:
 
     def __init__(self, url, params=None, random_timestamp=None,
@@ -52,6 +65,10 @@ class MockResponseGET:
         }
         return data
 
+    @property
+    def content(self):
+        return json.dumps(self.json()).encode()
+
 
 class MockTelegramBot:
 
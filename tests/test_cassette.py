@@ -0,0 +1,141 @@
+import json
+import time
+
+import pytest
+
+import cassette
+import exeptions
+import homework
+from benchmarks import bench_replay
+
+
+class MockResponse:
+
+    def __init__(self, status_code, body, headers=None):
+        self.status_code = status_code
+        self.content = body
+        self.headers = headers or {}
+
+
+class MockTransport:
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+
+    def get(self, url, **kwargs):
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def stats(self):
+        return {}
+
+    def close(self):
+        pass
+
+
+def answer(homeworks, current_date):
+    return json.dumps(
+        {'homeworks': homeworks, 'current_date': current_date}
+    ).encode()
+
+
+def record(path, responses):
+    writer = cassette.CassetteWriter(path)
+    transport = cassette.RecordingTransport(MockTransport(responses), writer)
+    for _ in responses:
+        try:
+            transport.get(
+                homework.ENDPOINT, headers={'Authorization': 'OAuth secret'},
+                params={'from_date': 0},
+            )
+        except OSError:
+            pass
+    transport.close()
+
+
+@pytest.fixture
+def replayed(monkeypatch):
+    def replay(path, speed=0.0):
+        monkeypatch.setattr(
+            homework, 'TRANSPORT', cassette.ReplayTransport(path, speed)
+        )
+        monkeypatch.setattr(homework, 'FINGERPRINTS', None)
+        return homework.TRANSPORT
+    return replay
+
+
+class TestCassette:
+
+    def test_record_and_read(self, tmp_path):
+        path = tmp_path / 'api.cassette'
+        record(path, [
+            MockResponse(200, answer([], 1), {'ETag': '"1"', 'X-Other': 'x'}),
+            OSError('reset'),
+        ])
+        with open(path, 'ab') as file:
+            file.write(b'\x00\x00\x01\x00truncated')
+        first, second = cassette.read_cassette(path)
+        assert first.status == 200
+        assert json.loads(first.body) == {'homeworks': [], 'current_date': 1}
+        assert first.headers == {'ETag': '"1"'}
+        assert first.params == {'from_date': 0}
+        assert first.tenant == cassette.tenant_key(
+            {'Authorization': 'OAuth secret'}
+        )
+        assert second.error == 'OSError'
+        assert b'secret' not in path.read_bytes()
+
+    def test_not_a_cassette(self, tmp_path):
+        path = tmp_path / 'api.cassette'
+        path.write_bytes(b'garbage')
+        with pytest.raises(exeptions.CassetteError):
+            list(cassette.read_cassette(path))
+
+    def test_replay_through_fetch_statuses(self, tmp_path, replayed):
+        path = tmp_path / 'api.cassette'
+        homeworks = [{'homework_name': 'hw', 'status': 'approved'}]
+        record(path, [
+            MockResponse(200, answer(homeworks, 5)),
+            MockResponse(500, b'{}'),
+            OSError('reset'),
+        ])
+        replayed(path)
+        assert homework.get_api_answer(0) == {
+            'homeworks': homeworks, 'current_date': 5
+        }
+        for _ in range(2):
+            with pytest.raises(exeptions.GetApiAnswerError):
+                homework.get_api_answer(0)
+        with pytest.raises(exeptions.CassetteExhausted):
+            homework.get_api_answer(0)
+
+    def test_replay_keeps_accelerated_pacing(self, tmp_path, replayed):
+        path = tmp_path / 'api.cassette'
+        writer = cassette.CassetteWriter(path)
+        for offset in (10.0, 10.2):
+            writer.write(cassette.Interaction(
+                offset, 'key', {}, 200, 0.0, body=answer([], 1)
+            ))
+        writer.close()
+        replay = replayed(path, speed=2)
+        started = time.monotonic()
+        replay.get(homework.ENDPOINT)
+        assert time.monotonic() - started < 0.05
+        replay.get(homework.ENDPOINT)
+        assert time.monotonic() - started >= 0.09
+
+    def test_bench_replay(self, tmp_path):
+        path = tmp_path / 'api.cassette'
+        record(path, [
+            MockResponse(200, answer([{
+                'id': index, 'homework_name': f'hw{index}',
+                'status': 'approved',
+            }], index))
+            for index in range(4)
+        ] + [MockResponse(500, b'{}')])
+        result = bench_replay.run(path, 0, 2, True)
+        assert result['interactions'] == 5
+        assert result['messages'] == 4
+        assert result['errors'] == 1
@@ -0,0 +1,84 @@
+import signal
+import time
+
+import pytest
+from utils import MockBot
+
+import checkpoints
+import homework
+import tenants
+
+
+class TestCheckpoints:
+
+    def test_resume_after_restart(self, tmp_path):
+        path = str(tmp_path / 'state.sqlite3')
+        store = checkpoints.CheckpointStore(path, flush_every=1000)
+        store.save('a', 100)
+        store.save('a', 150)
+        store.save('b', 200)
+        assert store.load('a') == 150
+        store.close()
+
+        store = checkpoints.CheckpointStore(path)
+        assert store.load('a') == 150
+        assert store.load('b') == 200
+        assert store.load('c', 7) == 7
+        store.close()
+
+    def test_batched_flush(self, tmp_path):
+        path = str(tmp_path / 'state.sqlite3')
+        store = checkpoints.CheckpointStore(
+            path, flush_every=2, flush_interval=3600
+        )
+        reader = checkpoints.CheckpointStore(path)
+        store.save('a', 1)
+        assert reader.load('a') is None
+        store.save('b', 2)
+        assert reader.load('a') == 1
+        store.close()
+        reader.close()
+
+    def test_flushed_by_timer_without_new_saves(self, tmp_path):
+        path = str(tmp_path / 'state.sqlite3')
+        store = checkpoints.CheckpointStore(path, flush_interval=0.05)
+        reader = checkpoints.CheckpointStore(path)
+        store.save('a', 1)
+        deadline = time.monotonic() + 5
+        while reader.load('a') is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert reader.load('a') == 1
+        store.close()
+        reader.close()
+
+    def test_sigterm_exits_through_cleanup(self, tmp_path):
+        path = str(tmp_path / 'state.sqlite3')
+        store = checkpoints.CheckpointStore(path, flush_interval=3600)
+        previous = signal.getsignal(signal.SIGTERM)
+        try:
+            homework.exit_on_sigterm()
+            with pytest.raises(SystemExit):
+                try:
+                    store.save('a', 1)
+                    signal.raise_signal(signal.SIGTERM)
+                finally:
+                    store.close()
+        finally:
+            signal.signal(signal.SIGTERM, previous)
+        reader = checkpoints.CheckpointStore(path)
+        assert reader.load('a') == 1
+        reader.close()
+
+    def test_poll_saves_acknowledged_date(self, tmp_path, monkeypatch):
+        store = checkpoints.CheckpointStore(
+            str(tmp_path / 'state.sqlite3'), flush_every=1
+        )
+        monkeypatch.setattr(homework, 'CHECKPOINTS', store)
+        monkeypatch.setattr(
+            homework, 'fetch_statuses',
+            lambda headers, ts: {'homeworks': [], 'current_date': ts + 5},
+        )
+        tenant = tenants.Tenant('a', 'token', 1, 10)
+        homework.poll_tenant(MockBot(), tenant)
+        assert store.load('a') == 15
+        store.close()
@@ -0,0 +1,143 @@
+from http import HTTPStatus
+
+import pytest
+import requests
+from utils import MockBot
+
+import circuit
+import exeptions
+import homework
+import tenants
+
+
+class TestCircuitBreaker:
+
+    def test_opens_after_threshold_and_probes(self, monkeypatch):
+        breaker = circuit.CircuitBreaker(
+            failure_threshold=2, base_delay=10, jitter=0
+        )
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == circuit.OPEN
+        assert not breaker.allow()
+        assert breaker.retry_after() > 9
+
+        monkeypatch.setattr(breaker, '_reopen_at', 0)
+        assert breaker.allow()
+        assert breaker.state == circuit.HALF_OPEN
+        assert not breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == circuit.OPEN
+        assert breaker.retry_after() > 19
+
+        monkeypatch.setattr(breaker, '_reopen_at', 0)
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == circuit.CLOSED
+        assert breaker.allow()
+
+    def test_backoff_is_capped_and_jittered(self, monkeypatch):
+        breaker = circuit.CircuitBreaker(
+            failure_threshold=1, base_delay=10, max_delay=15, jitter=0.5
+        )
+        breaker.record_failure()
+        assert 4.9 <= breaker.retry_after() <= 10
+        for _ in range(5):
+            monkeypatch.setattr(breaker, '_reopen_at', 0)
+            assert breaker.allow()
+            breaker.record_failure()
+            assert 7.4 <= breaker.retry_after() <= 15
+
+    def test_failures_while_open_are_ignored(self):
+        breaker = circuit.CircuitBreaker(
+            failure_threshold=3, base_delay=30, jitter=0
+        )
+        for _ in range(10):
+            breaker.record_failure()
+        assert breaker.state == circuit.OPEN
+        assert 29 < breaker.retry_after() <= 30
+
+
+class TestBreakerFailures:
+
+    @pytest.mark.parametrize('status, opens', [
+        (HTTPStatus.UNAUTHORIZED, False),
+        (HTTPStatus.FORBIDDEN, False),
+        (HTTPStatus.NOT_FOUND, False),
+        (HTTPStatus.TOO_MANY_REQUESTS, True),
+        (HTTPStatus.BAD_GATEWAY, True),
+    ])
+    def test_only_api_failures_open_breaker(self, monkeypatch, status, opens):
+        class Response:
+            status_code = status
+
+            def close(self):
+                pass
+
+        class Transport:
+            def get(self, url, **kwargs):
+                return Response()
+
+        breaker = circuit.CircuitBreaker(failure_threshold=3)
+        monkeypatch.setattr(homework, 'BREAKER', breaker)
+        monkeypatch.setattr(homework, 'TRANSPORT', Transport())
+        monkeypatch.setattr(homework, 'FINGERPRINTS', None)
+        bot = MockBot()
+        for name in 'abc':
+            homework.run_cycle(bot, tenants.Tenant(name, 'revoked', 1, 0))
+        assert (breaker.state == circuit.OPEN) is opens
+
+    def test_transport_errors_open_breaker(self, monkeypatch):
+        class Transport:
+            def get(self, url, **kwargs):
+                raise requests.ConnectionError('connection refused')
+
+        breaker = circuit.CircuitBreaker(failure_threshold=1)
+        monkeypatch.setattr(homework, 'BREAKER', breaker)
+        monkeypatch.setattr(homework, 'TRANSPORT', Transport())
+        monkeypatch.setattr(homework, 'FINGERPRINTS', None)
+        homework.run_cycle(MockBot(), tenants.Tenant('a', 't', 1, 0))
+        assert breaker.state == circuit.OPEN
+
+
+class TestAlerts:
+
+    def test_outage_alerts_once_and_recovers(self, monkeypatch):
+        breaker = circuit.CircuitBreaker(failure_threshold=100)
+        monkeypatch.setattr(homework, 'BREAKER', breaker)
+        calls = []
+
+        def failing(headers, current_timestamp):
+            calls.append(current_timestamp)
+            raise exeptions.GetApiAnswerError('Сбой при запросе к API')
+
+        monkeypatch.setattr(homework, 'fetch_statuses', failing)
+        bot = MockBot()
+        tenant = tenants.Tenant('a', 'token', 1, 0)
+        for _ in range(3):
+            homework.run_cycle(bot, tenant)
+        assert bot.texts == ['Сбой при запросе к API']
+
+        monkeypatch.setattr(
+            homework, 'fetch_statuses',
+            lambda headers, ts: {'homeworks': [], 'current_date': ts},
+        )
+        homework.run_cycle(bot, tenant)
+        homework.run_cycle(bot, tenant)
+        assert bot.texts == [
+            'Сбой при запросе к API', homework.RECOVERED_MESSAGE
+        ]
+
+    def test_open_breaker_skips_requests(self, monkeypatch):
+        breaker = circuit.CircuitBreaker(failure_threshold=1)
+        breaker.record_failure()
+        monkeypatch.setattr(homework, 'BREAKER', breaker)
+
+        def unexpected(headers, current_timestamp):
+            raise AssertionError('Запрос при разомкнутом предохранителе')
+
+        monkeypatch.setattr(homework, 'fetch_statuses', unexpected)
+        bot = MockBot()
+        homework.run_cycle(bot, tenants.Tenant('a', 'token', 1, 0))
+        assert bot.texts == []
@@ -0,0 +1,89 @@
+import time
+
+from utils import MockBot
+
+import checkpoints
+import dedup
+import homework
+import tenants
+
+HOMEWORK = {
+    'id': 123,
+    'status': 'approved',
+    'homework_name': 'hw123',
+    'date_updated': '2020-02-13T14:40:57Z',
+}
+
+
+class TestDedup:
+
+    def test_key_depends_on_transition(self):
+        record = homework.homework_record(HOMEWORK)
+        key = dedup.delivery_key('a', record)
+        assert key == dedup.delivery_key(
+            'a', homework.homework_record(dict(HOMEWORK))
+        )
+        assert key != dedup.delivery_key('b', record)
+        assert key != dedup.delivery_key(
+            'a', homework.homework_record(dict(HOMEWORK, status='rejected'))
+        )
+
+    def test_lru_eviction(self):
+        index = dedup.DeliveredIndex(max_size=2)
+        index.add(1)
+        index.add(2)
+        assert index.seen(1)
+        index.add(3)
+        assert len(index) == 2
+        assert index.seen(1)
+        assert not index.seen(2)
+
+    def test_ttl_expiry(self):
+        index = dedup.DeliveredIndex(ttl=0)
+        index.add(1)
+        assert not index.seen(1)
+        assert len(index) == 0
+
+    def test_persisted_between_restarts(self, tmp_path):
+        path = str(tmp_path / 'state.sqlite3')
+        index = dedup.DeliveredIndex(path, flush_every=10)
+        index.add(1)
+        index.close()
+        assert dedup.DeliveredIndex(path).seen(1)
+
+    def test_flushed_after_interval(self, tmp_path):
+        path = str(tmp_path / 'state.sqlite3')
+        index = dedup.DeliveredIndex(path, flush_interval=0.05)
+        index.add(1)
+        deadline = time.monotonic() + 5
+        while index._pending and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert dedup.DeliveredIndex(path).seen(1)
+        index.close()
+
+    def test_flushed_before_checkpoints(self, tmp_path, monkeypatch):
+        path = str(tmp_path / 'state.sqlite3')
+        monkeypatch.setattr(
+            homework, 'DELIVERED',
+            dedup.DeliveredIndex(path, flush_interval=60),
+        )
+        store = checkpoints.CheckpointStore(
+            path, flush_every=1, before_flush=homework.flush_journals
+        )
+        homework.DELIVERED.add(1)
+        store.save('a', 100)
+        assert dedup.DeliveredIndex(path).seen(1)
+        store.close()
+        homework.DELIVERED.close()
+
+    def test_poll_skips_duplicates(self, monkeypatch):
+        monkeypatch.setattr(homework, 'DELIVERED', dedup.DeliveredIndex())
+        monkeypatch.setattr(
+            homework, 'fetch_statuses',
+            lambda headers, ts: {'homeworks': [HOMEWORK], 'current_date': ts},
+        )
+        bot = MockBot()
+        tenant = tenants.Tenant('a', 'token', 1, 0)
+        homework.poll_tenant(bot, tenant)
+        homework.poll_tenant(bot, tenant)
+        assert bot.texts == [homework.parse_status(HOMEWORK)]
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+
+from utils import MockBot
+
+import delivery
+
+
+def run_queue(queue, produce, duration=0.3):
+    async def scenario():
+        runner = asyncio.create_task(queue.run())
+        await asyncio.sleep(0)
+        await produce()
+        await asyncio.sleep(duration)
+        runner.cancel()
+
+    asyncio.run(scenario())
+
+
+class TestMessageQueue:
+
+    def test_coalesce_respects_limit(self):
+        assert delivery.coalesce(['a', 'b']) == ['a\n\nb']
+        assert delivery.coalesce(['a' * 3, 'b' * 3], limit=5) == [
+            'aaa', 'bbb'
+        ]
+
+    def test_messages_for_chat_are_coalesced(self):
+        bot = MockBot()
+        queue = delivery.MessageQueue(bot, coalesce_window=0.05)
+
+        async def produce():
+            threads = [
+                threading.Thread(
+                    target=queue.send_message,
+                    kwargs={'chat_id': 1, 'text': str(i)},
+                )
+                for i in range(3)
+            ]
+            for thread in threads:
+                thread.start()
+                thread.join()
+            queue.send_message(chat_id=2, text='other')
+
+        run_queue(queue, produce)
+        assert sorted(bot.sent) == [(1, '0\n\n1\n\n2'), (2, 'other')]
+        assert queue.depth == 0
+
+    def test_depth_counts_pending_messages(self):
+        queue = delivery.MessageQueue(MockBot(), coalesce_window=60)
+        depths = []
+
+        async def produce():
+            queue.put(1, 'a')
+            queue.put(1, 'b')
+            queue.put(2, 'c', 'HTML')
+            depths.append(queue.depth)
+
+        run_queue(queue, produce, duration=0.05)
+        assert depths == [3]
+
+    def test_retry_after_is_honored(self):
+        bot = MockBot(retry_after=0.1)
+        queue = delivery.MessageQueue(bot, coalesce_window=0, chat_rate=100)
+
+        async def produce():
+            queue.send_message(chat_id=1, text='hello')
+
+        run_queue(queue, produce, duration=0.4)
+        assert bot.sent == [(1, 'hello')]
@@ -0,0 +1,102 @@
+import asyncio
+import json
+
+import pytest
+from utils import MockBot
+
+import engine
+import exeptions
+import homework
+import scheduler
+import tenants
+
+
+def make_fetch(answers):
+    def fetch_statuses(headers, current_timestamp):
+        return answers[headers['Authorization']](current_timestamp)
+    return fetch_statuses
+
+
+class TestEngine:
+
+    def test_load_tenants(self, tmp_path):
+        path = tmp_path / 'tenants.json'
+        path.write_text(json.dumps([
+            {'name': 'a', 'practicum_token': 't1', 'telegram_chat_id': 1},
+            {'practicum_token': 't2', 'telegram_chat_id': 2},
+        ]))
+        result = tenants.load_tenants(path)
+        assert [tenant.name for tenant in result] == ['a', '1']
+        assert result[0].headers == {'Authorization': 'OAuth t1'}
+
+    def test_load_tenants_invalid(self, tmp_path):
+        path = tmp_path / 'tenants.json'
+        path.write_text(json.dumps([{'name': 'a'}]))
+        with pytest.raises(exeptions.TenantsConfigError):
+            tenants.load_tenants(path)
+
+    def test_poll_tracks_timestamp_per_tenant(self, monkeypatch):
+        answers = {
+            'OAuth t1': lambda ts: {
+                'homeworks': [{'homework_name': 'hw1', 'status': 'approved'}],
+                'current_date': ts + 10,
+            },
+            'OAuth t2': lambda ts: {'homeworks': [], 'current_date': ts + 20},
+        }
+        monkeypatch.setattr(homework, 'fetch_statuses', make_fetch(answers))
+        bot = MockBot()
+        tenant_list = [
+            tenants.Tenant('a', 't1', 1, 100),
+            tenants.Tenant('b', 't2', 2, 200),
+        ]
+        polling = engine.PollingEngine(bot, tenant_list, concurrency=2)
+
+        async def poll_all():
+            await asyncio.gather(*map(polling.poll, tenant_list))
+
+        asyncio.run(poll_all())
+        assert [tenant.current_timestamp for tenant in tenant_list] == [
+            110, 220
+        ]
+        assert bot.sent == [(1, homework.parse_status(
+            {'homework_name': 'hw1', 'status': 'approved'}
+        ))]
+
+    def test_poll_reports_errors_to_tenant_chat(self, monkeypatch):
+        def fetch_statuses(headers, current_timestamp):
+            raise exeptions.GetApiAnswerError('Сбой при запросе к API')
+
+        monkeypatch.setattr(homework, 'fetch_statuses', fetch_statuses)
+        bot = MockBot()
+        tenant = tenants.Tenant('a', 't1', 1, 100)
+        asyncio.run(engine.PollingEngine(bot, [tenant]).poll(tenant))
+        assert bot.sent == [(1, 'Сбой при запросе к API')]
+        assert tenant.current_timestamp == 100
+
+    def test_run_reschedules_tenants(self, monkeypatch):
+        polled = []
+
+        def fetch_statuses(headers, current_timestamp):
+            polled.append(headers['Authorization'])
+            return {'homeworks': [], 'current_date': current_timestamp}
+
+        monkeypatch.setattr(homework, 'fetch_statuses', fetch_statuses)
+        tenant_list = [
+            tenants.Tenant('a', 't1', 1, 0), tenants.Tenant('b', 't2', 2, 0)
+        ]
+        polling = engine.PollingEngine(
+            MockBot(), tenant_list, retry_time=0.01,
+            poll_scheduler=scheduler.PollScheduler(
+                rate_limit=1000, interval=lambda tenant: 0.01
+            ),
+        )
+
+        async def run_briefly():
+            try:
+                await asyncio.wait_for(polling.run(), 0.2)
+            except asyncio.TimeoutError:
+                pass
+
+        asyncio.run(run_briefly())
+        assert polled.count('OAuth t1') > 1
+        assert polled.count('OAuth t2') > 1
@@ -0,0 +1,113 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from utils import MockBot
+
+import fingerprint
+import homework
+import tenants
+
+
+class MockResponse:
+
+    def __init__(self, body, status_code=HTTPStatus.OK, headers=None):
+        self.content = body if isinstance(body, bytes) else json.dumps(
+            body
+        ).encode()
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.decoded = 0
+
+    def json(self):
+        self.decoded += 1
+        return json.loads(self.content)
+
+
+class MockTransport:
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None, params=None):
+        self.requests.append(headers)
+        return self.responses.pop(0)
+
+
+HOMEWORK = {'id': 1, 'homework_name': 'hw1', 'status': 'approved'}
+
+
+class TestFingerprint:
+
+    def test_empty_body_is_not_decoded(self):
+        cache = fingerprint.FingerprintCache()
+        response = MockResponse(b'{"homeworks": [], "current_date": 42}')
+        assert cache.check('key', response) == 42
+
+    def test_same_body_with_new_date_is_unchanged(self):
+        cache = fingerprint.FingerprintCache()
+        first = MockResponse({'homeworks': [HOMEWORK], 'current_date': 1})
+        second = MockResponse({'homeworks': [HOMEWORK], 'current_date': 2})
+        other = MockResponse({'homeworks': [], 'current_date': 'x'})
+        assert cache.check('key', first) is None
+        assert cache.check('key', second) == 2
+        assert cache.check('key', other) is None
+
+    def test_conditional_headers(self):
+        cache = fingerprint.FingerprintCache()
+        cache.check('key', MockResponse(
+            {'homeworks': [HOMEWORK], 'current_date': 1},
+            headers={'ETag': '"v1"', 'Last-Modified': 'yesterday'},
+        ))
+        assert cache.conditional_headers('key') == {
+            'If-None-Match': '"v1"', 'If-Modified-Since': 'yesterday',
+        }
+        cache.forget('key')
+        assert cache.conditional_headers('key') == {}
+
+    @pytest.mark.parametrize('response', [
+        MockResponse({'homeworks': [HOMEWORK], 'current_date': 2}),
+        MockResponse(b'', status_code=HTTPStatus.NOT_MODIFIED),
+    ])
+    def test_poll_skips_unchanged(self, monkeypatch, response):
+        transport = MockTransport([
+            MockResponse({'homeworks': [HOMEWORK], 'current_date': 1},
+                         headers={'ETag': '"v1"'}),
+            response,
+        ])
+        monkeypatch.setattr(homework, 'TRANSPORT', transport)
+        monkeypatch.setattr(
+            homework, 'FINGERPRINTS', fingerprint.FingerprintCache()
+        )
+        bot = MockBot()
+        tenant = tenants.Tenant('a', 'token', 1, 0)
+        homework.poll_tenant(bot, tenant)
+        homework.poll_tenant(bot, tenant)
+        assert bot.texts == [homework.parse_status(HOMEWORK)]
+        assert transport.requests[1]['If-None-Match'] == '"v1"'
+        assert response.decoded == 0
+        assert tenant.current_timestamp == 1 + (
+            response.status_code == HTTPStatus.OK
+        )
+
+    def test_failed_cycle_forgets_fingerprint(self, monkeypatch):
+        body = {'homeworks': [HOMEWORK], 'current_date': 1}
+        transport = MockTransport([MockResponse(body), MockResponse(body)])
+        monkeypatch.setattr(homework, 'TRANSPORT', transport)
+        monkeypatch.setattr(
+            homework, 'FINGERPRINTS', fingerprint.FingerprintCache()
+        )
+        calls = []
+
+        def send_chat_message(bot, chat_id, message, parse_mode=None):
+            calls.append(message)
+            if len(calls) == 1:
+                raise RuntimeError('Сбой')
+
+        monkeypatch.setattr(homework, 'send_chat_message', send_chat_message)
+        tenant = tenants.Tenant('a', 'token', 1, 0)
+        with pytest.raises(RuntimeError):
+            homework.poll_tenant(MockBot(), tenant)
+        homework.poll_tenant(MockBot(), tenant)
+        assert len(calls) == 2
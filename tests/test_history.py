@@ -0,0 +1,132 @@
+import time
+
+import checkpoints
+import history
+import homework
+import records
+import tenants
+
+APPROVED = homework.HomeworkStatus.APPROVED
+REJECTED = homework.HomeworkStatus.REJECTED
+REVIEWING = homework.HomeworkStatus.REVIEWING
+
+
+def record(status, date_updated, name='hw1'):
+    return records.HomeworkRecord(name, name, status, date_updated)
+
+
+class TestHistory:
+
+    def test_timestamp(self):
+        assert history.timestamp('1970-01-01T01:00:00Z') == 3600
+        assert history.timestamp(None, 7) == 7
+        assert history.timestamp('вчера', 7) == 7
+
+    def test_latest_and_timeline(self, tmp_path):
+        path = str(tmp_path / 'state.sqlite3')
+        store = history.HistoryStore(path, flush_every=1000)
+        store.add('a', record(REVIEWING, '2026-10-01T10:00:00Z'))
+        store.add('a', record(REVIEWING, '2026-10-01T10:00:00Z'))
+        store.add('a', record(APPROVED, '2026-10-02T10:00:00Z'))
+        store.add('b', record(REJECTED, '2026-10-03T10:00:00Z'))
+        store.close()
+
+        store = history.HistoryStore(path)
+        assert store.latest('a', 'hw1') == (
+            'approved', history.timestamp('2026-10-02T10:00:00Z')
+        )
+        assert [status for _, status in store.timeline('a', 'hw1')] == [
+            'reviewing', 'approved'
+        ]
+        assert store.latest('a', 'hw2') is None
+        store.close()
+
+    def test_flushed_by_timer(self, tmp_path):
+        path = str(tmp_path / 'state.sqlite3')
+        store = history.HistoryStore(path, flush_interval=0.05)
+        reader = history.HistoryStore(path)
+        store.add('a', record(APPROVED, '2026-10-01T10:00:00Z'))
+        deadline = time.monotonic() + 5
+        while reader.latest('a', 'hw1') is None:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        store.close()
+        reader.close()
+
+    def test_flushed_before_checkpoints(self, tmp_path, monkeypatch):
+        path = str(tmp_path / 'state.sqlite3')
+        store = history.HistoryStore(path, flush_interval=3600)
+        monkeypatch.setattr(homework, 'HISTORY', store)
+        monkeypatch.setattr(homework, 'OUTBOX', None)
+        monkeypatch.setattr(homework, 'DELIVERED', None)
+        saved = checkpoints.CheckpointStore(
+            path, flush_every=1, before_flush=homework.flush_journals
+        )
+        store.add('a', record(APPROVED, '2026-10-01T10:00:00Z'))
+        saved.save('a', 100)
+        reader = history.HistoryStore(path)
+        assert reader.latest('a', 'hw1')[0] == 'approved'
+        reader.close()
+        saved.close()
+        store.close()
+
+    def test_review_durations(self, tmp_path):
+        store = history.HistoryStore(
+            str(tmp_path / 'state.sqlite3'), flush_every=2
+        )
+        hour = 3600
+        for status, at in (
+            (REVIEWING, 0), (REJECTED, 2 * hour),
+            (REVIEWING, 3 * hour), (REVIEWING, 4 * hour),
+            (APPROVED, 4 * hour + 1800),
+        ):
+            store.add('a', record(status, history.format_date(at) + 'Z'))
+        store.add('b', record(REVIEWING, '1970-01-01T00:00:00Z', 'hw2'))
+        # Статус, пришедший не по порядку, пересчитывает проверки.
+        store.add('b', record(APPROVED, '1970-01-01T05:00:00Z', 'hw2'))
+        assert store.review_durations() == [
+            1.5 * hour, 2 * hour, 5 * hour
+        ]
+        assert store.review_durations(tenant='a', since=3 * hour) == [
+            1.5 * hour
+        ]
+        assert store.review_durations(until=2 * hour) == []
+        store.close()
+
+    def test_poll_records_history(self, tmp_path, monkeypatch):
+        store = history.HistoryStore(str(tmp_path / 'state.sqlite3'))
+        monkeypatch.setattr(homework, 'HISTORY', store)
+        monkeypatch.setattr(homework, 'DELIVERED', None)
+        monkeypatch.setattr(homework, 'CHECKPOINTS', None)
+        monkeypatch.setattr(homework, 'OUTBOX', None)
+        monkeypatch.setattr(homework, 'SUBSCRIPTIONS', None)
+        monkeypatch.setattr(
+            homework, 'send_chat_message', lambda *args, **kwargs: None
+        )
+        answer = {
+            'homeworks': [{
+                'homework_name': 'hw1', 'status': 'approved',
+                'date_updated': '2026-10-02T10:00:00Z',
+            }],
+            'current_date': 1,
+        }
+        homework.process_answer(None, tenants.Tenant('a', 't', 1), answer)
+        assert store.latest('a', 'hw1')[0] == 'approved'
+        store.close()
+
+    def test_cli(self, tmp_path, capsys):
+        path = str(tmp_path / 'state.sqlite3')
+        store = history.HistoryStore(path)
+        store.add('default', record(REVIEWING, '2026-10-01T10:00:00Z'))
+        store.add('default', record(APPROVED, '2026-10-01T12:30:00Z'))
+        store.close()
+        assert history.main(['--db', path, 'latest', 'hw1']) == 0
+        assert 'approved' in capsys.readouterr().out
+        assert history.main([
+            '--db', path, 'reviews', '--since', '2026-10-01',
+            '--percentiles', '50',
+        ]) == 0
+        assert capsys.readouterr().out.splitlines() == [
+            'Проверок: 1', 'p50: 2 ч 30 мин'
+        ]
+        assert history.main(['--db', path, 'latest', 'hw9']) == 1
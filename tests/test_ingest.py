@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+from utils import MockBot
+
+import engine
+import homework
+import ingest
+import scheduler
+import tenants
+
+
+def post(httpd, path, headers=None):
+    host, port = httpd.server_address
+    request = urllib.request.Request(
+        f'http://{host}:{port}{path}', data=b'', headers=headers or {},
+        method='POST',
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status
+    except urllib.error.HTTPError as error:
+        return error.code
+
+
+@pytest.fixture
+def event_server():
+    waker = ingest.EventWaker(['default'], debounce=0)
+    httpd = ingest.start_http_server(waker, port=1)
+    yield waker, httpd
+    httpd.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def free_port(monkeypatch):
+    original = ingest.ThreadingHTTPServer
+
+    def server(address, handler):
+        return original((address[0], 0), handler)
+
+    monkeypatch.setattr(ingest, 'ThreadingHTTPServer', server)
+
+
+class TestIngest:
+
+    def test_disabled_without_port(self):
+        assert ingest.start_http_server(ingest.EventWaker([]), port=0) is None
+
+    def test_wake_interrupts_sleep(self, event_server):
+        waker, httpd = event_server
+        threading.Timer(0.05, post, (httpd, '/wake/default')).start()
+        started = time.monotonic()
+        waker.sleep(5)
+        assert time.monotonic() - started < 1
+        assert not waker.event.is_set()
+
+    def test_unknown_tenant_and_path(self, event_server):
+        _, httpd = event_server
+        assert post(httpd, '/wake/other') == 404
+        assert post(httpd, '/metrics') == 404
+
+    def test_secret_is_checked(self, event_server, monkeypatch):
+        waker, httpd = event_server
+        monkeypatch.setattr(ingest.IngestHandler, 'secret', 's3cret')
+        assert post(httpd, '/wake/default') == 403
+        assert not waker.event.is_set()
+        assert post(
+            httpd, '/wake/default', {'X-Ingest-Secret': 's3cret'}
+        ) == 202
+        assert waker.event.is_set()
+
+    def test_burst_of_wakeups_is_one_poll(self, monkeypatch):
+        polled = []
+
+        def fetch_statuses(headers, current_timestamp):
+            polled.append(time.monotonic())
+            return {'homeworks': [], 'current_date': current_timestamp}
+
+        monkeypatch.setattr(homework, 'fetch_statuses', fetch_statuses)
+        tenant = tenants.Tenant('a b', 't', 1, 0)
+        polling = engine.PollingEngine(
+            MockBot(), [tenant], retry_time=0,
+            poll_scheduler=scheduler.PollScheduler(
+                rate_limit=1000, interval=lambda tenant: 60
+            ),
+        )
+
+        async def scenario():
+            waker = ingest.SchedulerWaker(
+                polling.scheduler, [tenant], asyncio.get_running_loop(),
+                debounce=0.1,
+            )
+            httpd = ingest.start_http_server(waker, port=1)
+            runner = asyncio.create_task(polling.run())
+            await asyncio.sleep(0.05)
+            loop = asyncio.get_running_loop()
+            statuses = await asyncio.gather(*(
+                loop.run_in_executor(None, post, httpd, '/wake/a%20b')
+                for _ in range(10)
+            ))
+            await asyncio.sleep(0.3)
+            runner.cancel()
+            httpd.shutdown()
+            return statuses
+
+        statuses = asyncio.run(scenario())
+        assert statuses == [202] * 10
+        assert len(polled) == 2
+
+    def test_wake_during_poll_is_not_concurrent(self, monkeypatch):
+        calls = []
+        active = []
+
+        def run_cycle(bot, tenant):
+            active.append(tenant.name)
+            calls.append(len(active))
+            time.sleep(0.1)
+            active.remove(tenant.name)
+
+        monkeypatch.setattr(homework, 'run_cycle', run_cycle)
+        tenant = tenants.Tenant('a', 't', 1, 0)
+        polling = engine.PollingEngine(
+            MockBot(), [tenant], retry_time=0,
+            poll_scheduler=scheduler.PollScheduler(
+                rate_limit=1000, interval=lambda tenant: 60
+            ),
+        )
+
+        async def scenario():
+            runner = asyncio.create_task(polling.run())
+            await asyncio.sleep(0.02)
+            polling.scheduler.wake(tenant)
+            await asyncio.sleep(0.35)
+            runner.cancel()
+
+        asyncio.run(scenario())
+        assert calls == [1, 1]
@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+import exeptions
+import homework
+import jsonbackend
+
+ANSWER = {
+    'homeworks': [{'homework_name': 'проект', 'status': 'approved'}],
+    'current_date': 1,
+}
+
+
+class Response:
+
+    status_code = 200
+
+    def __init__(self, content):
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def available():
+    backends = []
+    for name in jsonbackend.FACTORIES:
+        try:
+            backends.append(jsonbackend.load_backend(name))
+        except exeptions.JsonBackendError:
+            pass
+    return backends
+
+
+@pytest.fixture(params=available(), ids=lambda backend: backend.name)
+def backend(request, monkeypatch):
+    monkeypatch.setattr(jsonbackend, 'backend', lambda: request.param)
+    return request.param
+
+
+class TestJsonBackend:
+
+    def test_decode(self, backend):
+        body = json.dumps(ANSWER, ensure_ascii=False).encode()
+        assert backend.decode(Response(body)) == ANSWER
+
+    @pytest.mark.parametrize('body', [b'', b'<html>', b'{"homeworks": ['])
+    def test_decode_errors_are_value_errors(self, backend, body):
+        with pytest.raises(ValueError):
+            backend.decode(Response(body))
+
+    def test_fetch_maps_decode_errors(self, backend, monkeypatch):
+        class Transport:
+            def get(self, url, **kwargs):
+                return Response(b'<html>502</html>')
+
+        monkeypatch.setattr(homework, 'TRANSPORT', Transport())
+        monkeypatch.setattr(homework, 'FINGERPRINTS', None)
+        with pytest.raises(exeptions.GetApiAnswerError, match='JSON'):
+            homework.fetch_statuses({'Authorization': 'OAuth t'}, 0)
+
+    def test_unknown_backend_stops_startup(self, monkeypatch):
+        monkeypatch.setattr(jsonbackend, 'JSON_BACKEND', 'orjzon')
+        jsonbackend.backend.cache_clear()
+        try:
+            with pytest.raises(SystemExit, match='orjzon'):
+                homework.load_json_backend()
+        finally:
+            jsonbackend.backend.cache_clear()
+
+    def test_load_backend(self, monkeypatch):
+        def missing():
+            raise ImportError('No module named fastjson')
+
+        monkeypatch.setattr(jsonbackend, 'FACTORIES', {
+            **jsonbackend.FACTORIES, 'fastjson': missing,
+        })
+        monkeypatch.setattr(
+            jsonbackend, 'AUTO_ORDER', ('fastjson', 'stdlib')
+        )
+        assert jsonbackend.load_backend('auto').name == 'stdlib'
+        with pytest.raises(exeptions.JsonBackendError):
+            jsonbackend.load_backend('fastjson')
+        with pytest.raises(exeptions.JsonBackendError):
+            jsonbackend.load_backend('simdjson')
@@ -0,0 +1,56 @@
+import random
+
+import requests
+
+from benchmarks import loadgen
+
+
+class TestLoadGenerator:
+
+    def test_homeworks_move_through_statuses(self):
+        profile = loadgen.Profile(
+            submit_rate=3600, review_delay=10, resubmit_delay=10,
+            approve_share=0.5, distribution='fixed',
+        )
+        sim = loadgen.TenantSim(profile, random.Random(1), 0.0)
+        sim.advance(1000)
+        statuses = {
+            homework['status'] for _, homework in sim.homeworks.values()
+        }
+        assert statuses <= {'reviewing', 'approved', 'rejected'}
+        assert {'approved', 'rejected'} <= statuses
+        recent = sim.changed_since(995)
+        assert recent and len(recent) < len(sim.homeworks)
+        assert all(
+            sim.homeworks[homework['id']][0] >= 995 for homework in recent
+        )
+
+    def test_from_date_and_injected_errors(self):
+        with loadgen.PracticumLoad(
+            profile=loadgen.Profile(submit_rate=0), history=3,
+            comment_bytes=100, errors={'throttle': 0.5}, seed=3,
+        ) as practicum:
+            headers = {'Authorization': 'OAuth token'}
+            responses = [
+                requests.get(
+                    practicum.url, headers=headers, params={'from_date': 0}
+                )
+                for _ in range(20)
+            ]
+            ok = [r for r in responses if r.status_code == 200]
+            throttled = [r for r in responses if r.status_code == 429]
+            assert ok and throttled
+            assert throttled[0].headers['Retry-After'] == '1'
+            data = ok[0].json()
+            assert len(data['homeworks']) == 3
+            assert len(data['homeworks'][0]['reviewer_comment']) == 100
+            later = requests.get(
+                practicum.url, headers=headers,
+                params={'from_date': data['current_date']},
+            )
+            while later.status_code != 200:
+                later = requests.get(
+                    practicum.url, headers=headers,
+                    params={'from_date': data['current_date']},
+                )
+            assert later.json()['homeworks'] == []
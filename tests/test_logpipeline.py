@@ -0,0 +1,98 @@
+import io
+import json
+import logging
+from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
+
+import pytest
+
+import logpipeline
+
+
+@pytest.fixture
+def root_logger():
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield root
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def make_record(message, level=logging.ERROR):
+    return logging.makeLogRecord(
+        {'name': 'homework', 'levelno': level, 'msg': message}
+    )
+
+
+class TestLogPipeline:
+
+    def test_json_lines_with_cycle_context(self, tmp_path, root_logger):
+        stream = io.StringIO()
+        path = tmp_path / 'bot.log'
+        listener = logpipeline.configure(
+            path, log_format='json', stream=stream
+        )
+        logger = logging.getLogger('homework')
+        with logpipeline.cycle_context('a'):
+            logger.info('внутри цикла')
+        logger.warning('вне цикла')
+        listener.stop()
+        first, second = map(json.loads, path.read_text().splitlines())
+        assert first['message'] == 'внутри цикла'
+        assert first['tenant'] == 'a'
+        assert isinstance(first['cycle'], int)
+        assert second['level'] == 'WARNING'
+        assert 'tenant' not in second
+        assert stream.getvalue().splitlines()[0].startswith('{')
+
+    def test_text_format_appends_to_log(self, tmp_path, root_logger):
+        path = tmp_path / 'bot.log'
+        path.write_text('до перезапуска\n')
+        listener = logpipeline.configure(path, stream=io.StringIO())
+        logging.getLogger('homework').info('после')
+        listener.stop()
+        assert path.read_text() == (
+            'до перезапуска\nINFO:homework:после\n'
+        )
+
+    def test_rotation_handlers(self, tmp_path):
+        path = tmp_path / 'bot.log'
+        for rotate, handler_class in (
+                ('size', RotatingFileHandler),
+                ('time', TimedRotatingFileHandler),
+        ):
+            handler = logpipeline.file_handler(path, rotate)
+            assert isinstance(handler, handler_class)
+            handler.close()
+
+    def test_repeated_errors_are_sampled(self):
+        now = [0.0]
+        sampler = logpipeline.ErrorSampler(
+            window=10, burst=2, clock=lambda: now[0]
+        )
+        passed = [
+            len(sampler.filter(make_record('Сбой'))) for _ in range(5)
+        ]
+        assert passed == [1, 1, 0, 0, 0]
+        assert sampler.filter(make_record('Другой сбой'))
+        assert len(sampler.filter(make_record('Сбой', logging.INFO))) == 1
+        now[0] = 10
+        summary, record = sampler.filter(make_record('Сбой'))
+        assert summary.repeated == 3
+        assert 'ещё 3 раз' in summary.getMessage()
+        assert record.getMessage() == 'Сбой'
+
+    def test_expired_windows_are_dropped(self):
+        now = [0.0]
+        sampler = logpipeline.ErrorSampler(
+            window=10, burst=1, clock=lambda: now[0]
+        )
+        for chat_id in range(1000):
+            sampler.filter(make_record(f'Чат {chat_id} недоступен'))
+        sampler.filter(make_record('Сбой'))
+        sampler.filter(make_record('Сбой'))
+        assert len(sampler) == 1001
+        now[0] = 10
+        summary, record = sampler.filter(make_record('Новый сбой'))
+        assert summary.repeated == 1
+        assert record.getMessage() == 'Новый сбой'
+        assert len(sampler) == 1
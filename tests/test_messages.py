@@ -0,0 +1,115 @@
+import json
+
+import pytest
+from utils import MockBot
+
+import exeptions
+import homework
+import messages
+import tenants
+
+APPROVED = homework.HomeworkStatus.APPROVED
+
+
+class TestMessages:
+
+    def test_default_text_matches_parse_status(self):
+        message = homework.MESSAGES.render(None, messages.TEXT, 'hw', APPROVED)
+        assert message == homework.parse_status(
+            {'homework_name': 'hw', 'status': 'approved'}
+        )
+
+    def test_markdown_escapes_name_and_verdict(self):
+        message = homework.MESSAGES.render(
+            'ru', messages.MARKDOWN, 'hw_1.zip', APPROVED
+        )
+        assert message == (
+            'Изменился статус проверки работы *hw\\_1\\.zip*\\. '
+            'Работа проверена: ревьюеру всё понравилось\\. Ура\\!'
+        )
+
+    def test_derived_html_variant(self):
+        catalog = messages.MessageCatalog({
+            'ru': {'text': '<{homework_name}> {verdict}',
+                   'verdicts': {'approved': 'a & b'}},
+        })
+        assert catalog.render('ru', messages.HTML, 'x<y', 'approved') == (
+            '&lt;x&lt;y&gt; a &amp; b'
+        )
+
+    def test_unknown_locale_falls_back_to_default(self):
+        assert homework.MESSAGES.render(
+            'de', messages.TEXT, 'hw', APPROVED
+        ) == homework.MESSAGES.render('ru', messages.TEXT, 'hw', APPROVED)
+        assert 'en' in homework.MESSAGES.locales
+
+    def test_rendered_messages_are_cached(self):
+        catalog = messages.MessageCatalog(
+            homework.MESSAGE_LOCALES, cache_size=2
+        )
+        for _ in range(3):
+            catalog.render('en', messages.TEXT, 'hw', APPROVED)
+        info = catalog.render.cache_info()
+        assert (info.hits, info.misses, info.maxsize) == (2, 1, 2)
+
+    @pytest.mark.parametrize('locales', [
+        {'ru': {'text': '{homework_name} {reviewer}', 'verdicts': {}}},
+        {'ru': {'verdicts': {}}},
+        {'en': {'text': '{verdict}', 'verdicts': {}}},
+    ])
+    def test_invalid_catalog(self, locales):
+        with pytest.raises(exeptions.MessageCatalogError):
+            messages.MessageCatalog(locales, default_locale='ru')
+
+    def test_locale_must_cover_every_status(self, tmp_path, monkeypatch):
+        path = tmp_path / 'messages.json'
+        path.write_text(json.dumps({
+            'acme': {'text': '{homework_name}: {verdict}',
+                     'verdicts': {'approved': 'ok', 'reviewing': 'wait'}},
+        }))
+        monkeypatch.setattr(messages, 'MESSAGES_FILE', str(path))
+        with pytest.raises(exeptions.MessageCatalogError, match='rejected'):
+            homework.load_messages()
+
+    def test_load_locales_from_file(self, tmp_path):
+        path = tmp_path / 'messages.json'
+        path.write_text(json.dumps({
+            'acme': {'text': 'ACME: {homework_name} — {verdict}',
+                     'verdicts': {'approved': 'ok'}},
+        }))
+        catalog = messages.MessageCatalog(
+            messages.load_locales(path, homework.MESSAGE_LOCALES)
+        )
+        assert catalog.render('acme', messages.TEXT, 'hw', APPROVED) == (
+            'ACME: hw — ok'
+        )
+        assert catalog.locales == ['acme', 'en', 'ru']
+
+    def test_tenant_format_and_locale(self, tmp_path, monkeypatch):
+        path = tmp_path / 'tenants.json'
+        path.write_text(json.dumps([{
+            'practicum_token': 't', 'telegram_chat_id': 1,
+            'locale': 'en', 'format': 'html',
+        }]))
+        tenant, = tenants.load_tenants(path)
+        monkeypatch.setattr(homework, 'DELIVERED', None)
+        monkeypatch.setattr(homework, 'CHECKPOINTS', None)
+        bot = MockBot()
+        homework.process_answer(bot, tenant, {
+            'homeworks': [{'homework_name': 'a&b', 'status': 'approved'}],
+            'current_date': 1,
+        })
+        assert bot.calls == [(
+            1,
+            'Review status of <b>a&amp;b</b> has changed. '
+            'The reviewer liked everything. Hooray!',
+            'HTML',
+        )]
+
+    def test_tenant_unknown_format(self, tmp_path):
+        path = tmp_path / 'tenants.json'
+        path.write_text(json.dumps([{
+            'practicum_token': 't', 'telegram_chat_id': 1, 'format': 'rtf',
+        }]))
+        with pytest.raises(exeptions.TenantsConfigError):
+            tenants.load_tenants(path)
@@ -0,0 +1,78 @@
+import threading
+import time
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+from utils import MockBot
+
+import checkpoints
+import exeptions
+import homework
+import metrics
+import tenants
+
+
+class TestMetrics:
+
+    def test_text_exposition(self):
+        registry = metrics.Registry()
+        counter = metrics.Counter(
+            'test_total', 'Счётчик', ('type',), registry=registry
+        )
+        histogram = metrics.Histogram(
+            'test_seconds', 'Гистограмма', buckets=(0.1, 1),
+            registry=registry,
+        )
+        metrics.Gauge(
+            'test_depth', 'Глубина', function=lambda: 3, registry=registry
+        )
+        counter.inc(type='Error"1')
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        text = registry.render()
+        assert '# TYPE test_total counter' in text
+        assert 'test_total{type="Error\\"1"} 1.0' in text
+        assert 'test_seconds_bucket{le="0.1"} 1.0' in text
+        assert 'test_seconds_bucket{le="+Inf"} 2.0' in text
+        assert 'test_seconds_count 2.0' in text
+        assert 'test_depth 3.0' in text
+
+    def test_pipeline_is_instrumented(self, monkeypatch):
+        monkeypatch.setattr(
+            homework, 'fetch_statuses',
+            lambda headers, ts: {'homeworks': [], 'current_date': ts},
+        )
+        cycles = metrics.HOMEWORKS_PER_CYCLE.count
+        homework.poll_tenant(MockBot(), tenants.Tenant('a', 'token', 1, 0))
+        assert metrics.HOMEWORKS_PER_CYCLE.count == cycles + 1
+
+        errors = metrics.ERRORS.value(type='CheckResponseError')
+        homework.report_error(
+            MockBot(), tenants.Tenant('a', 'token', 1, 0),
+            exeptions.CheckResponseError('Сбой'),
+        )
+        assert metrics.ERRORS.value(type='CheckResponseError') == errors + 1
+
+    def test_checkpoint_current_date_age(self, tmp_path):
+        path = str(tmp_path / 'state.sqlite3')
+        store = checkpoints.CheckpointStore(path)
+        assert store.current_age() == 0
+        store.save('a', int(time.time()) - 600)
+        assert 599 <= store.current_age() < 610
+        store.close()
+        reopened = checkpoints.CheckpointStore(path)
+        assert 599 <= reopened.current_age() < 610
+        reopened.close()
+
+    def test_http_endpoint(self):
+        httpd = ThreadingHTTPServer(('127.0.0.1', 0), metrics.handler_class())
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        try:
+            url = f'http://127.0.0.1:{httpd.server_port}/metrics'
+            with urllib.request.urlopen(url) as response:
+                body = response.read().decode()
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+        assert 'homework_bot_api_request_seconds_bucket' in body
+        assert 'homework_bot_errors_total{type="GetApiAnswerError"}' in body
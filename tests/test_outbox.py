@@ -0,0 +1,155 @@
+import asyncio
+import sqlite3
+import time
+
+import pytest
+from utils import MockBot
+
+import checkpoints
+import dedup
+import delivery
+import homework
+import outbox
+import tenants
+
+
+def stored(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(
+            'SELECT tenant, chat_id, text FROM outbox ORDER BY id'
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def box(tmp_path, monkeypatch):
+    path = str(tmp_path / 'state.sqlite3')
+    store = outbox.Outbox(path, flush_every=1000, flush_interval=3600)
+    monkeypatch.setattr(homework, 'OUTBOX', store)
+    monkeypatch.setattr(homework, 'SUBSCRIPTIONS', None)
+    monkeypatch.setattr(homework, 'DELIVERED', None)
+    monkeypatch.setattr(homework, 'CHECKPOINTS', None)
+    yield store
+    store.close()
+
+
+class TestOutbox:
+
+    def test_entries_survive_restart_in_order(self, tmp_path):
+        path = str(tmp_path / 'state.sqlite3')
+        store = outbox.Outbox(path, flush_every=1000, flush_interval=3600)
+        for text in ('one', 'two'):
+            store.put('a', 1, text)
+        store.put('b', 2, 'other')
+        store.close()
+
+        store = outbox.Outbox(path, tenants={'a'})
+        assert [
+            [entry.text for entry in entries] for entries in store.due()
+        ] == [['one', 'two']]
+        store.close()
+
+    def test_acked_entries_are_compacted(self, tmp_path):
+        path = str(tmp_path / 'state.sqlite3')
+        store = outbox.Outbox(path, flush_every=1000, flush_interval=3600)
+        quick = store.put('a', 1, 'quick')
+        store.settle(quick, True)
+        slow = store.put('a', 2, 'slow')
+        store.flush()
+        assert stored(path) == [('a', 2, 'slow')]
+        store.settle(slow, True)
+        assert len(store) == 0
+        store.flush()
+        assert stored(path) == []
+        store.close()
+
+    def test_chat_order_is_kept_on_retry(self):
+        store = outbox.Outbox(retry_base=10)
+        first = store.put('a', 1, 'first')
+        second = store.put('a', 1, 'second')
+        other = store.put('a', 2, 'other')
+        assert first.claimed and not second.claimed and other.claimed
+        store.settle(first, False)
+        store.settle(other, True)
+        assert store.due() == []
+        assert store.due(first.next_attempt) == [[first, second]]
+
+    def test_failed_send_is_redelivered(self, box):
+        bot = MockBot(failing={1})
+        tenant = tenants.Tenant('a', 'token', 1, 0)
+        answer = {
+            'homeworks': [
+                {'homework_name': 'hw1', 'status': 'reviewing'},
+                {'homework_name': 'hw1', 'status': 'approved'},
+            ],
+            'current_date': 5,
+        }
+        homework.process_answer(bot, tenant, answer)
+        assert tenant.current_timestamp == 5
+        assert bot.sent == []
+        assert len(box) == 2
+
+        bot.failing.clear()
+        homework.redeliver(bot)
+        assert bot.sent == []
+        for entries in box.due(float('inf')):
+            for entry in entries:
+                homework.deliver(bot, entry)
+        assert [text for _, text in bot.sent] == [
+            homework.render_status(homework.homework_record(item))
+            for item in answer['homeworks']
+        ]
+        assert len(box) == 0
+
+    def test_outbox_is_flushed_before_checkpoint(self, box, tmp_path):
+        path = str(tmp_path / 'state.sqlite3')
+        store = checkpoints.CheckpointStore(
+            path, flush_every=1, before_flush=box.flush
+        )
+        box.put('a', 1, 'pending')
+        store.save('a', 10)
+        assert stored(path) == [('a', 1, 'pending')]
+        store.close()
+
+    def test_outbox_is_flushed_before_delivered_keys(self, box, tmp_path):
+        path = str(tmp_path / 'state.sqlite3')
+        index = dedup.DeliveredIndex(
+            path, flush_interval=0.05, before_flush=box.flush
+        )
+        box.put('a', 1, 'pending')
+        index.add(1)
+        deadline = time.monotonic() + 5
+        while index._pending and time.monotonic() < deadline:
+            time.sleep(0.01)
+        conn = sqlite3.connect(path)
+        try:
+            delivered, = conn.execute(
+                'SELECT COUNT(*) FROM delivered'
+            ).fetchone()
+        finally:
+            conn.close()
+        assert delivered == 1
+        assert stored(path) == [('a', 1, 'pending')]
+        index.close()
+
+    def test_queue_reports_delivery(self):
+        bot = MockBot(failing={2})
+        queue = delivery.MessageQueue(bot, coalesce_window=0.01)
+        results = []
+
+        async def scenario():
+            runner = asyncio.create_task(queue.run())
+            await asyncio.sleep(0)
+            for chat_id in (1, 2):
+                queue.send_tracked(
+                    chat_id, 'text', None,
+                    lambda delivered, chat_id=chat_id:
+                        results.append((chat_id, delivered)),
+                )
+            await asyncio.sleep(0.2)
+            runner.cancel()
+
+        asyncio.run(scenario())
+        assert sorted(results) == [(1, True), (2, False)]
@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import homework
+import records
+
+
+class TestRecords:
+
+    def test_record_from_api_homework(self):
+        record = homework.homework_record({
+            'id': 123,
+            'status': 'approved',
+            'homework_name': 'hw123',
+            'date_updated': '2020-02-13T14:40:57Z',
+            'reviewer_comment': 'Всё нравится',
+        })
+        assert record == records.HomeworkRecord(
+            123, 'hw123', homework.HomeworkStatus.APPROVED,
+            '2020-02-13T14:40:57Z',
+        )
+        assert record.status is homework.HomeworkStatus.APPROVED
+        assert record.status == 'approved'
+        assert not hasattr(record, '__dict__')
+
+    @pytest.mark.parametrize('data, message', [
+        ({'homework_name': 'hw'}, 'отсутствует ключ "status"'),
+        ({'status': 'approved'}, 'отсутствует ключ "homework_name"'),
+        ({'homework_name': 'hw', 'status': 'unknown'},
+         'unknown не существует'),
+        ({'homework_name': 'hw', 'status': []}, 'не существует'),
+    ])
+    def test_invalid_homework(self, data, message):
+        with pytest.raises(KeyError, match=message):
+            homework.homework_record(data)
+
+    def test_only_verdict_statuses_are_accepted(self):
+        to_record = records.compile_validator(
+            records.status_enum({'approved': 'Ура!'})
+        )
+        assert to_record({'homework_name': 'hw', 'status': 'approved'})
+        with pytest.raises(KeyError):
+            to_record({'homework_name': 'hw', 'status': 'rejected'})
+
+    def test_statuses_follow_verdicts(self):
+        assert [str(status) for status in homework.HomeworkStatus] == list(
+            homework.HOMEWORK_VERDICT
+        )
+        statuses = records.status_enum(
+            {**homework.HOMEWORK_VERDICT, 'lost': 'Работа потеряна.'}
+        )
+        to_record = records.compile_validator(statuses)
+        record = to_record({'homework_name': 'hw', 'status': 'lost'})
+        assert record.status is statuses.LOST
+        assert record.status == 'lost'
+
+    def test_new_verdict_does_not_break_import(self, tmp_path):
+        source = open(homework.__file__, encoding='utf-8').read().replace(
+            "'rejected': 'Работа проверена: у ревьюера есть замечания.'",
+            "'rejected': 'Работа проверена: у ревьюера есть замечания.',"
+            "'lost': 'Работа потеряна.'",
+        )
+        (tmp_path / 'homework.py').write_text(source, encoding='utf-8')
+        result = subprocess.run(
+            [sys.executable, '-c',
+             'import homework; print(homework.HomeworkStatus.LOST)'],
+            cwd=tmp_path, capture_output=True, text=True, timeout=60,
+            env={**os.environ, 'PYTHONPATH': os.pathsep.join(
+                [str(tmp_path), os.path.dirname(records.__file__)]
+            )},
+        )
+        assert result.stdout.strip() == 'lost', result.stderr
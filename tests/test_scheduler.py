@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+import pytest
+
+import scheduler
+import tenants
+
+
+def make_tenant(name='a', status=None, changed_ago=None):
+    tenant = tenants.Tenant(name, 'token', 1, 0)
+    tenant.last_status = status
+    if changed_ago is not None:
+        tenant.last_change = time.time() - changed_ago
+    return tenant
+
+
+class TestPollInterval:
+
+    def test_reviewing_polls_fast(self):
+        tenant = make_tenant(status='reviewing', changed_ago=10 ** 6)
+        assert scheduler.poll_interval(
+            tenant, min_interval=60, max_interval=1800
+        ) == 60
+
+    def test_idle_backs_off(self):
+        recent = make_tenant(status='approved', changed_ago=60)
+        idle = make_tenant(status='approved', changed_ago=10 ** 6)
+        kwargs = {'min_interval': 60, 'max_interval': 1800}
+        assert 60 < scheduler.poll_interval(recent, **kwargs) < 1800
+        assert scheduler.poll_interval(idle, **kwargs) == 1800
+
+    def test_unknown_state_uses_default(self):
+        assert scheduler.poll_interval(
+            make_tenant(), default_interval=600
+        ) == 600
+
+
+class TestPollScheduler:
+
+    def test_order_and_reschedule(self):
+        first, second = make_tenant('a'), make_tenant('b')
+        queue = scheduler.PollScheduler(rate_limit=1000)
+        now = time.monotonic()
+        queue.schedule(first, now + 0.02)
+        queue.schedule(second, now + 0.01)
+        queue.schedule(second, now + 0.03)
+
+        async def take_two():
+            return [await queue.next_due(), await queue.next_due()]
+
+        assert asyncio.run(take_two()) == [first, second]
+        assert len(queue) == 0
+
+    def test_wake_keeps_earliest(self):
+        tenant = make_tenant()
+        queue = scheduler.PollScheduler(
+            rate_limit=1000, interval=lambda tenant: 3600
+        )
+        queue.schedule(tenant, time.monotonic() + 3600)
+        queue.wake(tenant)
+        queue.reschedule(tenant)
+
+        async def take():
+            return await asyncio.wait_for(queue.next_due(), 1)
+
+        assert asyncio.run(take()) is tenant
+
+    def test_rate_limit(self):
+        tenant_list = [make_tenant(str(i)) for i in range(5)]
+        queue = scheduler.PollScheduler(rate_limit=50, burst=1)
+        for tenant in tenant_list:
+            queue.schedule(tenant, 0)
+
+        async def take_all():
+            for _ in tenant_list:
+                await queue.next_due()
+
+        started = time.monotonic()
+        asyncio.run(take_all())
+        assert time.monotonic() - started == pytest.approx(0.08, abs=0.05)
@@ -0,0 +1,63 @@
+import os
+import re
+import subprocess
+import sys
+
+import metrics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOKEN_VARS = ('PRACTICUM_TOKEN', 'TELEGRAM_TOKEN', 'TELEGRAM_CHAT_ID')
+
+
+def run_python(args, tmp_path, tokens):
+    env = {key: value for key, value in os.environ.items()
+           if key not in TOKEN_VARS}
+    if tokens:
+        env.update(dict.fromkeys(TOKEN_VARS, 'token'))
+    env['PYTHONPATH'] = ROOT
+    return subprocess.run(
+        [sys.executable, *args], cwd=tmp_path, env=env,
+        capture_output=True, text=True, timeout=60,
+    )
+
+
+class TestStartup:
+
+    def test_import_defers_heavy_modules(self, tmp_path):
+        result = run_python([
+            '-c',
+            'import sys, homework; '
+            'print(sorted(m for m in ("telegram", "requests", "asyncio", '
+            '"http.server") if m in sys.modules))',
+        ], tmp_path, tokens=True)
+        assert result.stdout.strip() == '[]', result.stderr
+
+    def test_missing_tokens_fail_before_telegram_import(self, tmp_path):
+        result = run_python(
+            ['-X', 'importtime', os.path.join(ROOT, 'homework.py')],
+            tmp_path, tokens=False,
+        )
+        assert result.returncode != 0
+        assert 'Ошибка в получении токенов' in result.stderr
+        assert not re.search(r'\|\s+telegram$', result.stderr, re.M)
+
+    def test_dotenv_configures_every_module(self, tmp_path):
+        (tmp_path / '.env').write_text(
+            'CHECKPOINT_DB=from_env.sqlite3\nMETRICS_PORT=9911\n'
+        )
+        result = run_python([
+            '-c',
+            'import homework, checkpoints, metrics; '
+            'print(checkpoints.CHECKPOINT_DB, metrics.METRICS_PORT)',
+        ], tmp_path, tokens=True)
+        assert result.stdout.split() == ['from_env.sqlite3', '9911'], (
+            result.stderr
+        )
+
+    def test_first_request_is_observed_once(self, monkeypatch):
+        monkeypatch.setattr(metrics, '_first_request_seen', False)
+        monkeypatch.setattr(metrics, 'process_uptime', lambda: 1.5)
+        metrics.observe_first_request()
+        monkeypatch.setattr(metrics, 'process_uptime', lambda: 9.0)
+        metrics.observe_first_request()
+        assert metrics.FIRST_REQUEST_SECONDS.samples() == [('', 1.5)]
@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+import exeptions
+import homework
+import streaming
+import tenants
+
+HOMEWORKS = [
+    {'id': 123, 'homework_name': 'проект_1', 'status': 'approved',
+     'reviewer_comment': 'Всё 👍', 'lesson': {'id': 7, 'tags': []}},
+    {'id': 124, 'homework_name': 'hw2', 'status': 'reviewing'},
+]
+
+
+def chunked(body, size=1):
+    data = body.encode() if isinstance(body, str) else body
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def answer(body, size=1):
+    return streaming.StreamedAnswer(
+        chunked(body, size), homework.check_response
+    )
+
+
+class StreamedResponse:
+
+    status_code = 200
+
+    def __init__(self, body):
+        self.body = body
+        self.closed = False
+
+    def iter_content(self, chunk_size=1):
+        return chunked(self.body, chunk_size)
+
+    def close(self):
+        self.closed = True
+
+
+class TestStreaming:
+
+    def test_items_and_fields(self):
+        body = json.dumps(
+            {'homeworks': HOMEWORKS, 'current_date': 1581604970},
+            ensure_ascii=False, indent=1,
+        )
+        for size in (1, 3, 1024):
+            streamed = answer(body, size)
+            assert list(streamed) == HOMEWORKS
+            assert streamed.finish() == 1581604970
+            assert streamed.count == 2
+
+    def test_items_are_yielded_before_body_is_read(self):
+        chunks = []
+
+        def source():
+            for chunk in chunked(json.dumps(
+                    {'homeworks': HOMEWORKS * 100, 'current_date': 1}
+            ), 64):
+                chunks.append(chunk)
+                yield chunk
+
+        streamed = streaming.StreamedAnswer(source())
+        assert next(iter(streamed)) == HOMEWORKS[0]
+        assert len(chunks) < 10
+
+    @pytest.mark.parametrize('body, error', [
+        ('{"homeworks": []}', exeptions.CheckResponseError),
+        ('{"homeworks": [], "current_date": "1"}',
+         exeptions.CheckResponseError),
+        ('{"homeworks": {}, "current_date": 1}', TypeError),
+        ('{"current_date": 1}', KeyError),
+    ])
+    def test_checks_are_enforced(self, body, error):
+        with pytest.raises(error):
+            answer(body).finish()
+
+    @pytest.mark.parametrize('body', [
+        '', '[]', '{"homeworks": [{"id": 1}', '{"homeworks": [] 1}',
+        '{"homeworks": [], "current_date": 1} []', '{1: 2}',
+    ])
+    def test_malformed_body(self, body):
+        with pytest.raises(ValueError):
+            answer(body).finish()
+
+    def test_fetch_and_process_stream(self, monkeypatch):
+        body = json.dumps({'homeworks': HOMEWORKS, 'current_date': 42})
+        response = StreamedResponse(body)
+        sent = []
+
+        class Transport:
+            def get(self, url, **kwargs):
+                assert kwargs['stream'] is True
+                return response
+
+        monkeypatch.setattr(streaming, 'STREAM_RESPONSES', True)
+        monkeypatch.setattr(homework, 'TRANSPORT', Transport())
+        for name in ('FINGERPRINTS', 'DELIVERED', 'CHECKPOINTS', 'HISTORY',
+                     'OUTBOX', 'SUBSCRIPTIONS'):
+            monkeypatch.setattr(homework, name, None)
+        monkeypatch.setattr(
+            homework, 'send_chat_message',
+            lambda bot, chat_id, text, parse_mode=None: sent.append(text),
+        )
+        tenant = tenants.Tenant('a', 'token', 1, 0)
+        homework.poll_tenant(None, tenant)
+        assert len(sent) == 2
+        assert tenant.current_timestamp == 42
+        assert tenant.last_status == 'approved'
+        assert response.closed
+
+        response.body = body[:-10]
+        with pytest.raises(exeptions.GetApiAnswerError):
+            homework.poll_tenant(None, tenant)
+        assert tenant.current_timestamp == 42
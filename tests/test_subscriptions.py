@@ -0,0 +1,88 @@
+import json
+import time
+
+import pytest
+from utils import MockBot
+
+import exeptions
+import homework
+import records
+import subscriptions
+import tenants
+
+HOMEWORK = {'homework_name': 'hw1', 'status': 'approved'}
+
+
+@pytest.fixture
+def subscribed(monkeypatch):
+    def subscribe(index):
+        monkeypatch.setattr(homework, 'SUBSCRIPTIONS', index)
+        monkeypatch.setattr(homework, 'DELIVERED', None)
+        monkeypatch.setattr(homework, 'CHECKPOINTS', None)
+    return subscribe
+
+
+def answer():
+    return {'homeworks': [HOMEWORK], 'current_date': 1}
+
+
+class TestSubscriptions:
+
+    def test_chats_for_tenant_and_homework(self):
+        index = subscriptions.SubscriptionIndex(
+            {'a': [2, 3, 2]}, {('a', 'hw1'): [4, 1]},
+        )
+        tenant = tenants.Tenant('a', 't', 1)
+        approved = homework.HomeworkStatus.APPROVED
+        hw1 = records.HomeworkRecord(1, 'hw1', approved)
+        hw2 = records.HomeworkRecord(2, 'hw2', approved)
+        assert index.chats_for(tenant, hw1) == (2, 3, 4, 1)
+        assert index.chats_for(tenant, hw2) == (1, 2, 3)
+        other = tenants.Tenant('b', 't', 5)
+        assert index.chats_for(other, hw1) == (5,)
+
+    def test_load_subscriptions(self, tmp_path):
+        path = tmp_path / 'subscriptions.json'
+        path.write_text(json.dumps({
+            'default': {'chats': [10], 'homeworks': {'hw1': [11]}},
+        }))
+        index = subscriptions.load_subscriptions(path)
+        tenant = tenants.Tenant('default', 't', 1)
+        record = homework.homework_record(HOMEWORK)
+        assert index.chats_for(tenant, record) == (1, 10, 11)
+        path.write_text(json.dumps({'default': {'chats': 10}}))
+        with pytest.raises(exeptions.SubscriptionsConfigError):
+            subscriptions.load_subscriptions(path)
+
+    def test_status_is_rendered_once(self, subscribed, monkeypatch):
+        subscribed(subscriptions.SubscriptionIndex({'a': range(2, 6)}))
+        rendered = []
+        render_status = homework.render_status
+
+        def counting_render(*args):
+            rendered.append(args)
+            return render_status(*args)
+
+        monkeypatch.setattr(homework, 'render_status', counting_render)
+        bot = MockBot()
+        homework.process_answer(bot, tenants.Tenant('a', 't', 1), answer())
+        assert len(rendered) == 1
+        assert sorted(chat for chat, _ in bot.sent) == [1, 2, 3, 4, 5]
+        assert len({text for _, text in bot.sent}) == 1
+
+    def test_broadcast_is_parallel(self, subscribed):
+        subscribed(subscriptions.SubscriptionIndex({'a': range(2, 101)}))
+        bot = MockBot(delay=0.02)
+        started = time.monotonic()
+        homework.process_answer(bot, tenants.Tenant('a', 't', 1), answer())
+        assert len(bot.sent) == 100
+        assert time.monotonic() - started < 100 * 0.02 / 4
+
+    def test_failed_chats_are_reported(self, subscribed):
+        subscribed(subscriptions.SubscriptionIndex({'a': [2, 3]}))
+        bot = MockBot(failing=(3,))
+        with pytest.raises(exeptions.SendMessageError, match='чаты 3'):
+            homework.process_answer(
+                bot, tenants.Tenant('a', 't', 1), answer()
+            )
+        assert sorted(chat for chat, _ in bot.sent) == [1, 2]
@@ -0,0 +1,80 @@
+import sys
+
+import pytest
+
+import supervisor
+import tenants
+
+
+def make_tenants(count):
+    return [
+        tenants.Tenant(f't{index}', 'token', index) for index in range(count)
+    ]
+
+
+class TestSupervisor:
+
+    def test_shards_partition_tenants(self):
+        tenant_list = make_tenants(3000)
+        shards = [
+            supervisor.shard_tenants(tenant_list, shard, 4)
+            for shard in range(4)
+        ]
+        names = [tenant.name for shard in shards for tenant in shard]
+        assert sorted(names) == sorted(tenant.name for tenant in tenant_list)
+        for shard in shards:
+            assert 500 < len(shard) < 1000
+
+    def test_adding_worker_moves_few_tenants(self):
+        keys = [f't{index}' for index in range(5000)]
+        before = supervisor.HashRing(map(supervisor.worker_name, range(4)))
+        after = supervisor.HashRing(map(supervisor.worker_name, range(5)))
+        moved = sum(
+            before.node_for(key) != after.node_for(key) for key in keys
+        )
+        assert moved / len(keys) < 0.3
+        assert all(
+            after.node_for(key) == 'worker-4'
+            for key in keys if before.node_for(key) != after.node_for(key)
+        )
+
+    def test_empty_ring(self):
+        with pytest.raises(ValueError):
+            supervisor.HashRing([])
+
+    def test_worker_environ(self):
+        environ = supervisor.worker_environ(2, 4, {
+            'METRICS_PORT': '9100', 'POLL_RATE_LIMIT': '20',
+        })
+        assert environ['METRICS_PORT'] == '9102'
+        assert 'INGEST_PORT' not in environ
+        assert float(environ['POLL_RATE_LIMIT']) == 5
+        assert float(environ['TELEGRAM_GLOBAL_RATE_LIMIT']) == 7.5
+        assert environ['LOG_FILE'].endswith('.worker-2.log')
+
+    def test_rate_limit_defaults_follow_modules(self):
+        environ = supervisor.worker_environ(0, 2, {})
+        assert float(environ['POLL_RATE_LIMIT']) == (
+            supervisor.scheduler.POLL_RATE_LIMIT / 2
+        )
+        assert float(environ['TELEGRAM_GLOBAL_RATE_LIMIT']) == (
+            supervisor.delivery.GLOBAL_RATE_LIMIT / 2
+        )
+
+    def test_crashed_worker_is_restarted(self, tmp_path, monkeypatch):
+        script = tmp_path / 'engine.py'
+        script.write_text('import sys\nsys.exit(3)\n')
+        monkeypatch.setattr(supervisor, 'ENGINE', str(script))
+        monkeypatch.setattr(supervisor, 'RESTART_MIN_DELAY', 1)
+        worker = supervisor.Worker(0, 1)
+        worker.check(0)
+        assert worker.process.args[0] == sys.executable
+        assert worker.process.args[-4:] == ['--shard', '0', '--shards', '1']
+        worker.process.wait()
+        worker.check(10)
+        assert worker.process is None
+        worker.check(11)
+        worker.process.wait()
+        worker.check(12)
+        assert worker.process is None
+        assert worker.restart_at == 14
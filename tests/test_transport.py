@@ -0,0 +1,128 @@
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import exeptions
+import homework
+import transport
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    delay = 0
+    script = []
+
+    def do_GET(self):
+        status, delay = Handler.script.pop(0) if Handler.script else (
+            200, self.delay
+        )
+        time.sleep(delay)
+        if status is None:
+            self.connection.shutdown(socket.SHUT_RDWR)
+            self.close_connection = True
+            return
+        body = b'{"homeworks": [], "current_date": 1}'
+        self.send_response(status)
+        if status == 429:
+            self.send_header('Retry-After', '0')
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_port}/'
+    httpd.shutdown()
+    httpd.server_close()
+    Handler.delay = 0
+    Handler.script = []
+
+
+class TestTransport:
+
+    def test_connections_are_reused(self, server):
+        client = transport.Transport(pool_size=2)
+        for _ in range(5):
+            assert client.get(server).json()['current_date'] == 1
+        stats = client.stats()
+        assert stats['requests'] == 5
+        assert stats['handshakes'] == 1
+        assert stats['open_connections'] == 1
+        assert stats['reuse_rate'] == pytest.approx(0.8)
+        client.close()
+
+    def test_read_timeout(self, server):
+        Handler.delay = 0.5
+        client = transport.Transport(read_timeout=0.1)
+        with pytest.raises(requests.Timeout):
+            client.get(server)
+        client.close()
+
+    def test_deadline_maps_to_api_error(self, server, monkeypatch):
+        Handler.delay = 0.2
+        monkeypatch.setattr(homework, 'ENDPOINT', server)
+        monkeypatch.setattr(
+            homework, 'TRANSPORT', transport.Transport(deadline=0.1)
+        )
+        with pytest.raises(exeptions.GetApiAnswerError):
+            homework.get_api_answer(0)
+
+    def test_retries_transient_failures(self, server):
+        Handler.script = [(500, 0), (None, 0), (429, 0)]
+        client = transport.Transport(backoff_base=0.01)
+        response = client.get(server)
+        assert response.status_code == 200
+        assert client.stats()['retries'] == 3
+        client.close()
+
+    def test_gives_up_after_retries(self, server):
+        Handler.script = [(503, 0)] * 3
+        client = transport.Transport(retries=2, backoff_base=0.01)
+        assert client.get(server).status_code == 503
+        assert Handler.script == []
+        client.close()
+
+    def test_client_errors_are_not_retried(self, server):
+        Handler.script = [(404, 0), (200, 0)]
+        client = transport.Transport(backoff_base=0.01)
+        assert client.get(server).status_code == 404
+        assert client.stats()['retries'] == 0
+        client.close()
+
+    def test_backoff_stays_within_deadline(self, server):
+        Handler.script = [(500, 0)] * 5
+        client = transport.Transport(backoff_base=1, deadline=0.5)
+        started = time.monotonic()
+        assert client.get(server).status_code == 500
+        assert time.monotonic() - started < 0.5
+        client.close()
+
+    def test_slow_attempt_is_hedged(self, server):
+        Handler.script = [(200, 1), (200, 0)]
+        client = transport.Transport(
+            pool_size=2, hedge=True, hedge_after=0.05, hedge_max_ratio=1,
+        )
+        started = time.monotonic()
+        assert client.get(server).status_code == 200
+        assert time.monotonic() - started < 0.5
+        assert client.stats()['hedges'] == 1
+        client.close()
+
+    def test_hedge_delay_from_p95(self):
+        client = transport.Transport(hedge=True)
+        assert client.hedge_delay() is None
+        client._latencies.extend(i / 100 for i in range(100))
+        assert client.hedge_delay() == pytest.approx(0.95)
+        assert transport.Transport().hedge_delay() is None
@@ -1,6 +1,10 @@
+import threading
+import time
 from inspect import signature
 from types import ModuleType
 
+import telegram
+
 
 def check_function(scope: ModuleType, func_name: str, params_qty: int = 0):
     """Checks if scope has a function with specific name and params with qty"""
@@ -37,3 +41,38 @@ def check_default_var_exists(scope: ModuleType, var_name: str) -> None:
         f'{var_name} должна быть переменной, а не функцией.'
     )
 
+
+class MockBot:
+    """
+    Telegram bot stub that records sent messages.
+    :param failing: chat ids whose sends raise NetworkError
+    :param delay: seconds each send takes
+    :param retry_after: the first send raises RetryAfter with this delay
+    """
+
+    def __init__(self, failing=(), delay=0, retry_after=None):
+        self.calls = []
+        self.failing = set(failing)
+        self.delay = delay
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        time.sleep(self.delay)
+        if self.retry_after is not None:
+            retry_after, self.retry_after = self.retry_after, None
+            raise telegram.error.RetryAfter(retry_after)
+        if chat_id in self.failing:
+            raise telegram.error.NetworkError('Timed out')
+        with self.lock:
+            self.calls.append((chat_id, text, kwargs.get('parse_mode')))
+
+    @property
+    def sent(self):
+        """Sent messages as (chat_id, text) pairs."""
+        return [(chat_id, text) for chat_id, text, _ in self.calls]
+
+    @property
+    def texts(self):
+        """Texts of sent messages."""
+        return [text for _, text, _ in self.calls]
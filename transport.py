@@ -0,0 +1,250 @@
+import collections
+import os
+import random
+import threading
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED, ThreadPoolExecutor, wait,
+)
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from http import HTTPStatus
+
+import metrics
+import settings  # noqa: F401
+
+POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', 10))
+CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 3.05))
+READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 10))
+DEADLINE = float(os.getenv('HTTP_DEADLINE', 15))
+RETRIES = int(os.getenv('HTTP_RETRIES', 3))
+BACKOFF_BASE = float(os.getenv('HTTP_BACKOFF_BASE', 0.2))
+BACKOFF_MAX = float(os.getenv('HTTP_BACKOFF_MAX', 2))
+HEDGE = os.getenv('HTTP_HEDGE', '').lower() in ('1', 'true', 'yes')
+HEDGE_AFTER = float(os.getenv('HTTP_HEDGE_AFTER', 0))
+HEDGE_MAX_RATIO = float(os.getenv('HTTP_HEDGE_MAX_RATIO', 0.1))
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 200
+RETRY_STATUSES = frozenset({
+    HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.INTERNAL_SERVER_ERROR,
+    HTTPStatus.BAD_GATEWAY, HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+})
+
+
+def _close_result(future):
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+class Transport:
+    """Общая HTTP-сессия с пулом keep-alive соединений и таймаутами.
+
+    Сессия создаётся при первом запросе, тогда же импортируется
+    requests. Каждый вызов `get` ограничен таймаутами на соединение
+    и чтение, а также общим дедлайном. GET идемпотентен, поэтому сбросы
+    соединения, таймауты и ответы из RETRY_STATUSES повторяются с
+    экспоненциальной паузой со случайным разбросом, пока не кончится
+    дедлайн. При `hedge` попытка, не уложившаяся в p95 задержки
+    (или `hedge_after` секунд), дублируется параллельным запросом,
+    и берётся первый ответ; дублей не больше `hedge_max_ratio` от
+    числа запросов.
+    """
+
+    def __init__(self, pool_size=POOL_SIZE, connect_timeout=CONNECT_TIMEOUT,
+                 read_timeout=READ_TIMEOUT, deadline=DEADLINE,
+                 retries=RETRIES, backoff_base=BACKOFF_BASE,
+                 backoff_max=BACKOFF_MAX, hedge=HEDGE,
+                 hedge_after=HEDGE_AFTER, hedge_max_ratio=HEDGE_MAX_RATIO):
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.deadline = deadline
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        self.hedge_after = hedge_after
+        self.hedge_max_ratio = hedge_max_ratio
+        self.calls = 0
+        self.retried = 0
+        self.hedged = 0
+        self._latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self._session = None
+        self._adapter = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """Сессия requests, создаваемая при первом обращении."""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._create_session()
+        return self._session
+
+    def _create_session(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        self._adapter = HTTPAdapter(
+            pool_connections=self.pool_size, pool_maxsize=self.pool_size,
+        )
+        session.mount('https://', self._adapter)
+        session.mount('http://', self._adapter)
+        return session
+
+    def get(self, url, **kwargs):
+        """GET-запрос с повторами и дублированием в пределах дедлайна."""
+        import requests
+
+        self.calls += 1
+        started = time.monotonic()
+        deadline_at = started + self.deadline
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            response = retry_after = None
+            try:
+                response = self._hedged(url, deadline_at, kwargs)
+            except (
+                    requests.ConnectionError, requests.Timeout,
+                    requests.exceptions.ChunkedEncodingError,
+            ):
+                if last or time.monotonic() >= deadline_at:
+                    raise
+            else:
+                if last or response.status_code not in RETRY_STATUSES:
+                    break
+                retry_after = response.headers.get('Retry-After')
+            delay = self._backoff(attempt, retry_after)
+            if time.monotonic() + delay >= deadline_at:
+                if response is not None:
+                    break
+                raise requests.Timeout(
+                    f'Дедлайн {self.deadline} с запроса к {url} истёк'
+                )
+            if response is not None:
+                response.close()
+            self.retried += 1
+            metrics.API_RETRIES.inc()
+            time.sleep(delay)
+        elapsed = time.monotonic() - started
+        if elapsed > self.deadline:
+            response.close()
+            raise requests.Timeout(
+                f'Запрос к {url} занял {elapsed:.2f} с, '
+                f'дедлайн {self.deadline} с'
+            )
+        return response
+
+    def _backoff(self, attempt, retry_after=None):
+        try:
+            if retry_after is not None:
+                return float(retry_after)
+        except ValueError:
+            pass
+        delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        return delay * random.uniform(0.5, 1)
+
+    def _attempt(self, url, deadline_at, kwargs):
+        import requests
+
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0:
+            raise requests.Timeout(f'Дедлайн запроса к {url} истёк')
+        started = time.monotonic()
+        response = self.session.get(
+            url,
+            timeout=(
+                min(self.connect_timeout, remaining),
+                min(self.read_timeout, remaining),
+            ),
+            **kwargs,
+        )
+        if response.status_code < HTTPStatus.INTERNAL_SERVER_ERROR:
+            self._latencies.append(time.monotonic() - started)
+        return response
+
+    def hedge_delay(self):
+        """Через сколько секунд дублировать попытку; None — не дублировать."""
+        if not self.hedge:
+            return None
+        if self.hedge_after:
+            return self.hedge_after
+        latencies = sorted(self._latencies)
+        if len(latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        return latencies[int(len(latencies) * 0.95)]
+
+    def _hedge_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.pool_size,
+                        thread_name_prefix='hedge',
+                    )
+        return self._executor
+
+    def _hedged(self, url, deadline_at, kwargs):
+        hedge_after = self.hedge_delay()
+        if hedge_after is None:
+            return self._attempt(url, deadline_at, kwargs)
+        primary = self._hedge_executor().submit(
+            self._attempt, url, deadline_at, kwargs
+        )
+        try:
+            return primary.result(timeout=hedge_after)
+        except FutureTimeoutError:
+            pass
+        if self.hedged >= self.hedge_max_ratio * self.calls:
+            return primary.result()
+        self.hedged += 1
+        metrics.API_HEDGES.inc()
+        pending = {primary, self._executor.submit(
+            self._attempt, url, deadline_at, kwargs
+        )}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                for other in pending:
+                    other.add_done_callback(_close_result)
+                return future.result()
+        raise error
+
+    def stats(self):
+        """Статистика пула: запросы, рукопожатия и открытые соединения."""
+        requests_total = handshakes = open_connections = 0
+        if self._adapter is not None:
+            pools = self._adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools[key]
+                if pool is None:
+                    continue
+                requests_total += pool.num_requests
+                handshakes += pool.num_connections
+                open_connections += sum(
+                    1 for conn in list(pool.pool.queue)
+                    if conn is not None and conn.sock is not None
+                )
+        reused = max(requests_total - handshakes, 0)
+        return {
+            'requests': requests_total,
+            'handshakes': handshakes,
+            'open_connections': open_connections,
+            'reuse_rate': reused / requests_total if requests_total else 0.0,
+            'retries': self.retried,
+            'hedges': self.hedged,
+        }
+
+    def close(self):
+        """Закрытие всех соединений пула."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        if self._session is not None:
+            self._session.close()